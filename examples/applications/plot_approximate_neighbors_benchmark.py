@@ -0,0 +1,88 @@
+"""
+=====================================================
+Benchmark exact and approximate nearest neighbours
+=====================================================
+
+This example compares the exact nearest neighbours search of scikit-learn with
+the approximate search of
+:class:`imblearn.neighbors.ApproximateNearestNeighbors` for an increasing
+number of random projection trees. The quality of the approximate search is
+reported using the recall@k, i.e. the fraction of the exact k nearest
+neighbours which are retrieved. The approximate search is finally used to
+over-sample a data set with SMOTE.
+
+"""
+
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+from time import time
+
+import matplotlib.pyplot as plt
+from sklearn.datasets import make_classification
+from sklearn.neighbors import NearestNeighbors
+
+from imblearn.neighbors import ApproximateNearestNeighbors
+from imblearn.neighbors import neighbors_recall_score
+from imblearn.over_sampling import SMOTE
+
+print(__doc__)
+
+RANDOM_STATE = 42
+N_NEIGHBORS = 6
+
+X, y = make_classification(n_samples=20000, n_features=50, n_informative=20,
+                           weights=[0.1, 0.9], random_state=RANDOM_STATE)
+
+###############################################################################
+# Exact search used as ground truth
+###############################################################################
+
+tic = time()
+nn = NearestNeighbors(n_neighbors=N_NEIGHBORS).fit(X)
+ind_exact = nn.kneighbors(X, return_distance=False)
+time_exact = time() - tic
+print('Exact search: {:.2f} s'.format(time_exact))
+
+###############################################################################
+# Approximate search for an increasing number of trees
+###############################################################################
+
+n_trees_range = [1, 2, 5, 10, 20]
+recalls, times = [], []
+for n_trees in n_trees_range:
+    tic = time()
+    ann = ApproximateNearestNeighbors(n_neighbors=N_NEIGHBORS, n_trees=n_trees,
+                                      random_state=RANDOM_STATE).fit(X)
+    ind_approx = ann.kneighbors(X, return_distance=False)
+    times.append(time() - tic)
+    recalls.append(neighbors_recall_score(ind_exact, ind_approx))
+    print('{} trees: recall@{} = {:.3f} in {:.2f} s'.format(
+        n_trees, N_NEIGHBORS, recalls[-1], times[-1]))
+
+fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(10, 4))
+ax1.plot(n_trees_range, recalls, marker='o')
+ax1.set_xlabel('Number of trees')
+ax1.set_ylabel('Recall@{}'.format(N_NEIGHBORS))
+ax1.set_title('Quality of the approximate search')
+ax2.plot(n_trees_range, times, marker='o', label='Approximate')
+ax2.axhline(time_exact, color='k', linestyle='--', label='Exact')
+ax2.set_xlabel('Number of trees')
+ax2.set_ylabel('Time (s)')
+ax2.set_title('Time to fit and query')
+ax2.legend(loc='best')
+plt.tight_layout()
+
+###############################################################################
+# Over-sampling using the approximate search
+###############################################################################
+
+for name, k_neighbors in (
+        ('exact', N_NEIGHBORS - 1),
+        ('approximate', ApproximateNearestNeighbors(
+            n_neighbors=N_NEIGHBORS, random_state=RANDOM_STATE))):
+    tic = time()
+    SMOTE(k_neighbors=k_neighbors, random_state=RANDOM_STATE).fit_sample(X, y)
+    print('SMOTE with the {} search: {:.2f} s'.format(name, time() - tic))
+
+plt.show()
@@ -16,6 +16,8 @@ exceptions
 metrics
     Module which provides metrics to quantified the classification performance
     with imbalanced dataset.
+neighbors
+    Module which provides nearest neighbours search methods.
 over_sampling
     Module which provides methods to under-sample a dataset.
 under-sampling
@@ -26,10 +28,12 @@ pipeline
     Module which allowing to create pipeline with scikit-learn estimators.
 """
 
+from ._config import config_context, get_config, set_config
 from ._version import __version__
 
 # list all submodules available in imblearn and version
 __all__ = [
-    'combine', 'ensemble', 'exceptions', 'metrics', 'over_sampling',
-    'under_sampling', 'utils', 'pipeline', '__version__'
+    'combine', 'ensemble', 'exceptions', 'metrics', 'neighbors',
+    'over_sampling', 'under_sampling', 'utils', 'pipeline', 'config_context',
+    'get_config', 'set_config', '__version__'
 ]
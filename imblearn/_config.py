@@ -0,0 +1,84 @@
+"""Global configuration of imbalanced-learn."""
+
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+from contextlib import contextmanager
+
+FINGERPRINT_KIND = ('strided', 'address', 'full')
+
+_global_config = {'fingerprint': 'strided'}
+
+
+def get_config():
+    """Retrieve current values for configuration set by :func:`set_config`.
+
+    Returns
+    -------
+    config : dict
+        Keys are parameter names that can be passed to :func:`set_config`.
+
+    """
+    return _global_config.copy()
+
+
+def set_config(fingerprint=None):
+    """Set global imbalanced-learn configuration.
+
+    Parameters
+    ----------
+    fingerprint : str, optional
+        Method used by :func:`imblearn.utils.hash_X_y` to fingerprint the data
+        given to ``fit`` such that ``sample`` can check that it is given the
+        same data:
+
+        - If ``'strided'``, a strided subset of the data is hashed;
+        - If ``'address'``, the memory address, shape, strides and type of the
+          buffers are used without reading the data. Modifying the data in
+          place is then not detected. This method requires the data to be
+          given as arrays or sparse matrices which are not copied by the
+          validation, e.g. not as lists; otherwise ``'strided'`` is used;
+        - If ``'full'``, all the data are hashed.
+
+    """
+    if fingerprint is not None:
+        if fingerprint not in FINGERPRINT_KIND:
+            raise ValueError("'fingerprint' should be one of {}. Got '{}'"
+                             " instead.".format(FINGERPRINT_KIND,
+                                                fingerprint))
+        _global_config['fingerprint'] = fingerprint
+
+
+@contextmanager
+def config_context(**new_config):
+    """Context manager for global imbalanced-learn configuration.
+
+    Parameters
+    ----------
+    fingerprint : str, optional
+        Method used to fingerprint the data given to ``fit``. See
+        :func:`set_config`.
+
+    Notes
+    -----
+    All settings, not just those presently modified, will be returned to
+    their previous values when the context manager is exited. This is not
+    thread-safe.
+
+    Examples
+    --------
+    >>> import imblearn
+    >>> with imblearn.config_context(fingerprint='full'):
+    ...     imblearn.get_config()['fingerprint']
+    'full'
+    >>> imblearn.get_config()['fingerprint']
+    'strided'
+
+    """
+    old_config = get_config()
+    set_config(**new_config)
+
+    try:
+        yield
+    finally:
+        set_config(**old_config)
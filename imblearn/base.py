@@ -9,12 +9,20 @@ from __future__ import division
 import logging
 from abc import ABCMeta, abstractmethod
 
+import numpy as np
+
 from sklearn.base import BaseEstimator
 from sklearn.externals import six
-from sklearn.utils import check_X_y
-from sklearn.utils.validation import check_is_fitted
+from sklearn.utils import check_X_y, safe_indexing
+from sklearn.utils.validation import _num_samples, check_is_fitted
 
-from .utils import check_ratio, check_target_type, hash_X_y
+from ._config import get_config
+from .neighbors.cache import _graph_kneighbors, _kneighbors
+from .utils import check_neighbors_graph, check_target_type
+from .utils import hash_X_y
+from .utils.validation import _is_same_buffer
+from .utils._class_index import ClassIndex
+from .utils.validation import _check_ratio
 
 
 class SamplerMixin(six.with_metaclass(ABCMeta, BaseEstimator)):
@@ -29,10 +37,43 @@ class SamplerMixin(six.with_metaclass(ABCMeta, BaseEstimator)):
     def _check_X_y(self, X, y):
         """Private function to check that the X and y in fitting are the same
         than in sampling."""
-        X_hash, y_hash = hash_X_y(X, y)
+        if self.X_hash_ is None:
+            raise RuntimeError("The data resampled with 'fit_sample' are not"
+                               " recorded. Call 'fit' before 'sample'.")
+        X_hash, y_hash = hash_X_y(X, y,
+                                  method=getattr(self, '_fingerprint', None))
         if self.X_hash_ != X_hash or self.y_hash_ != y_hash:
             raise RuntimeError("X and y need to be same array earlier fitted.")
 
+    def fit(self, X, y):
+        """Find the classes statistics before to perform sampling.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        Returns
+        -------
+        self : object,
+            Return self.
+
+        """
+        X_input, y_input = X, y
+        X, y = check_X_y(X, y, accept_sparse=['csr', 'csc'])
+        self._fingerprint = get_config()['fingerprint']
+        if self._fingerprint == 'address' and not (
+                _is_same_buffer(X, X_input) and _is_same_buffer(y, y_input)):
+            # the validation copied the data which are then copied at a
+            # different address by the validation in sample
+            self._fingerprint = 'strided'
+        self.X_hash_, self.y_hash_ = hash_X_y(X, y, method=self._fingerprint)
+
+        return self._fit(X, y)
+
     def sample(self, X, y):
         """Resample the dataset.
 
@@ -83,9 +124,43 @@ class SamplerMixin(six.with_metaclass(ABCMeta, BaseEstimator)):
         y_resampled : array-like, shape (n_samples_new,)
             The corresponding label of `X_resampled`
 
+        Notes
+        -----
+        The data are validated once and are not fingerprinted since they are
+        resampled right away. Thus, :meth:`sample` cannot be called
+        afterwards without calling :meth:`fit` first.
+
         """
+        X, y = check_X_y(X, y, accept_sparse=['csr', 'csc'])
+        self.X_hash_ = self.y_hash_ = None
 
-        return self.fit(X, y).sample(X, y)
+        return self._fit(X, y)._sample(X, y)
+
+    def _fit(self, X, y):
+        """Find the classes statistics of validated data.
+
+        The samplers overriding :meth:`fit` instead of this method are fitted
+        with :meth:`fit`.
+
+        Parameters
+        ----------
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : ndarray, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        Returns
+        -------
+        self : object,
+            Return self.
+
+        """
+        if six.get_unbound_function(type(self).fit) is \
+                six.get_unbound_function(SamplerMixin.fit):
+            raise NotImplementedError("The sampler {} should implement '_fit'"
+                                      " or 'fit'.".format(type(self).__name__))
+        return self.fit(X, y)
 
     @abstractmethod
     def _sample(self, X, y):
@@ -135,7 +210,30 @@ class BaseSampler(SamplerMixin):
         self.ratio = ratio
         self.logger = logging.getLogger(self.__module__)
 
-    def fit(self, X, y):
+    def _fit(self, X, y):
+        y = check_target_type(y)
+        # the samples of each class are indexed once and reused by the
+        # samplers when sampling the same data
+        self._class_index = ClassIndex(y)
+        # self.sampling_type is already checked in check_ratio
+        self.ratio_ = _check_ratio(self.ratio, y, self._target_stats(),
+                                   self._sampling_type)
+
+        return self
+
+    def _target_stats(self):
+        """Number of samples of each class used to compute ``ratio_``."""
+        return self._class_index.target_stats()
+
+
+class NeighborsGraphMixin(object):
+    """Mixin class for samplers accepting a precomputed neighbours graph.
+
+    Warning: This class should not be used directly. Use the derive classes
+    instead.
+    """
+
+    def fit(self, X, y, neighbors_graph=None):
         """Find the classes statistics before to perform sampling.
 
         Parameters
@@ -146,16 +244,156 @@ class BaseSampler(SamplerMixin):
         y : array-like, shape (n_samples,)
             Corresponding label for each sample in X.
 
+        neighbors_graph : sparse matrix, shape (n_samples, n_samples), \
+optional (default=None)
+            Precomputed nearest neighbours graph of ``X`` where the entries of
+            a row are the distances to the nearest neighbours of the sample,
+            e.g. computed with :func:`sklearn.neighbors.kneighbors_graph` and
+            ``mode='distance'``. If given, the nearest neighbours are read
+            from the graph instead of being searched. The neighbours of the
+            samples for which the graph does not contain enough neighbours,
+            e.g. from the same class, are searched.
+
         Returns
         -------
         self : object,
             Return self.
 
         """
-        X, y = check_X_y(X, y, accept_sparse=['csr', 'csc'])
-        y = check_target_type(y)
-        self.X_hash_, self.y_hash_ = hash_X_y(X, y)
-        # self.sampling_type is already checked in check_ratio
-        self.ratio_ = check_ratio(self.ratio, y, self._sampling_type)
+        super(NeighborsGraphMixin, self).fit(X, y)
+        self.neighbors_graph_ = check_neighbors_graph(neighbors_graph,
+                                                      _num_samples(X))
 
         return self
+
+    def fit_sample(self, X, y, neighbors_graph=None):
+        """Fit the statistics and resample the data directly.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        neighbors_graph : sparse matrix, shape (n_samples, n_samples), \
+optional (default=None)
+            Precomputed nearest neighbours graph of ``X``. See :meth:`fit`.
+
+        Returns
+        -------
+        X_resampled : {array-like, sparse matrix}, shape \
+(n_samples_new, n_features)
+            The array containing the resampled data.
+
+        y_resampled : array-like, shape (n_samples_new,)
+            The corresponding label of `X_resampled`
+
+        """
+
+        self.neighbors_graph_ = check_neighbors_graph(neighbors_graph,
+                                                      _num_samples(X))
+
+        return super(NeighborsGraphMixin, self).fit_sample(X, y)
+
+    def _fit_sample_indices(self, X, y, neighbors_graph=None):
+        """Fit the statistics and find the samples to keep.
+
+        Only available for the cleaning samplers. See :meth:`fit` for the
+        parameters.
+        """
+        self.neighbors_graph_ = check_neighbors_graph(neighbors_graph,
+                                                      _num_samples(X))
+
+        return super(NeighborsGraphMixin, self)._fit_sample_indices(X, y)
+
+    def _kneighbors(self, estimator, X, fit_indices=None, query_indices=None,
+                    n_neighbors=None, return_distance=True):
+        """Find the nearest neighbours of some samples among others.
+
+        The neighbours are read from the precomputed graph given at ``fit``
+        if any. Otherwise, or for the queries lacking neighbours among the
+        samples ``fit_indices`` in the graph, ``estimator`` is fitted on the
+        samples ``fit_indices`` and queried with the samples
+        ``query_indices``.
+
+        Parameters
+        ----------
+        estimator : KNeighborsMixin
+            The nearest neighbours estimator.
+
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        fit_indices : ndarray, shape (n_samples_fit,), optional (default=None)
+            The indices of the samples among which the neighbours are
+            searched, sorted if a precomputed graph is used or if
+            ``query_indices`` is given. By default, all the samples.
+
+        query_indices : ndarray, shape (n_queries,), optional (default=None)
+            The indices of the samples whose neighbours are searched. By
+            default, the samples ``fit_indices``.
+
+        n_neighbors : int, optional (default=None)
+            Number of neighbours to find. By default, the number of neighbours
+            of the estimator is used.
+
+        return_distance : bool, optional (default=True)
+            Whether or not to return the distances.
+
+        Returns
+        -------
+        dist : ndarray, shape (n_queries, n_neighbors)
+            The distances to the neighbours, only present if
+            ``return_distance=True``.
+
+        ind : ndarray, shape (n_queries, n_neighbors)
+            The indices of the neighbours in the samples ``fit_indices``.
+
+        """
+        if n_neighbors is None:
+            n_neighbors = estimator.n_neighbors
+        graph = getattr(self, 'neighbors_graph_', None)
+        if graph is None:
+            return _search_kneighbors(estimator, X, fit_indices,
+                                      query_indices, n_neighbors,
+                                      return_distance)
+
+        dist, ind = _graph_kneighbors(graph, fit_indices, query_indices,
+                                      n_neighbors)
+        lacking = np.flatnonzero(ind[:, -1] < 0)
+        if lacking.size:
+            # a global graph rarely stores enough neighbours from a small
+            # class: these neighbours are searched among the fitted samples
+            if query_indices is None:
+                query_indices = (np.arange(graph.shape[0])
+                                 if fit_indices is None else fit_indices)
+            dist[lacking], ind[lacking] = _search_kneighbors(
+                estimator, X, fit_indices,
+                np.asarray(query_indices)[lacking], n_neighbors)
+        if return_distance:
+            return dist, ind
+        return ind
+
+
+def _search_kneighbors(estimator, X, fit_indices, query_indices, n_neighbors,
+                       return_distance=True):
+    """Fit ``estimator`` on some samples and query it with others.
+
+    See :meth:`NeighborsGraphMixin._kneighbors` for the parameters.
+    """
+    X_fit = X if fit_indices is None else safe_indexing(X, fit_indices)
+    if query_indices is None:
+        rows = X_query = None
+    elif fit_indices is None:
+        rows, X_query = query_indices, None
+    else:
+        rows = np.searchsorted(fit_indices, query_indices)
+        if np.all(fit_indices.take(rows, mode='clip') == query_indices):
+            X_query = None
+        else:
+            rows, X_query = None, safe_indexing(X, query_indices)
+    return _kneighbors(estimator, X_fit, rows=rows, X_query=X_query,
+                       n_neighbors=n_neighbors,
+                       return_distance=return_distance)
@@ -8,12 +8,10 @@ from __future__ import division
 
 import logging
 
-from sklearn.utils import check_X_y
-
 from ..base import SamplerMixin
 from ..over_sampling import SMOTE
 from ..under_sampling import EditedNearestNeighbours
-from ..utils import check_target_type, hash_X_y
+from ..utils import check_target_type
 
 
 class SMOTEENN(SamplerMixin):
@@ -127,27 +125,9 @@ class SMOTEENN(SamplerMixin):
         else:
             self.enn_ = EditedNearestNeighbours(ratio='all')
 
-    def fit(self, X, y):
-        """Find the classes statistics before to perform sampling.
-
-        Parameters
-        ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
-            Matrix containing the data which have to be sampled.
-
-        y : array-like, shape (n_samples,)
-            Corresponding label for each sample in X.
-
-        Returns
-        -------
-        self : object,
-            Return self.
-
-        """
-        X, y = check_X_y(X, y, accept_sparse=['csr', 'csc'])
+    def _fit(self, X, y):
         y = check_target_type(y)
         self.ratio_ = self.ratio
-        self.X_hash_, self.y_hash_ = hash_X_y(X, y)
 
         return self
 
@@ -7,12 +7,12 @@
 # License: MIT
 
 import logging
-from collections import Counter
 
 from sklearn.utils import check_X_y
 
 from ..under_sampling.prototype_selection import RandomUnderSampler
-from ..utils import check_ratio
+from ..utils._class_index import ClassIndex
+from ..utils.validation import _check_ratio
 
 LOGGER = logging.getLogger(__name__)
 
@@ -27,11 +27,16 @@ def make_imbalance(X, y, ratio, random_state=None, **kwargs):
 
     Parameters
     ----------
-    X : ndarray, shape (n_samples, n_features)
-        Matrix containing the data to be imbalanced.
+    X : ndarray, shape (n_samples, n_features) or iterable of tuple
+        Matrix containing the data to be imbalanced. If ``y`` is None, an
+        iterable yielding the tuples ``(X_chunk, y_chunk)`` of a dataset too
+        large to be loaded in memory. The chunks are then read once and only
+        the selected samples are kept in memory. In this case, ``ratio`` has
+        to be a ``dict``.
 
-    y : ndarray, shape (n_samples, )
-        Corresponding label for each sample in X.
+    y : ndarray, shape (n_samples, ) or None
+        Corresponding label for each sample in X. None when ``X`` is an
+        iterable of chunks.
 
     ratio : str, dict, or callable, optional (default='auto')
         Ratio to use for resampling the data set.
@@ -82,12 +87,33 @@ def make_imbalance(X, y, ratio, random_state=None, **kwargs):
     >>> print('Distribution after imbalancing: {}'.format(Counter(y_res)))
     Distribution after imbalancing: Counter({2: 30, 1: 20, 0: 10})
 
+    The data can be given by chunks:
+
+    >>> chunks = ((X[i:i + 50], y[i:i + 50]) for i in range(0, 150, 50))
+    >>> X_res, y_res = make_imbalance(chunks, None, ratio={0: 10, 1: 20},
+    ...                               random_state=42)
+    >>> print('Distribution after imbalancing: {}'.format(Counter(y_res)))
+    Distribution after imbalancing: Counter({2: 50, 1: 20, 0: 10})
+
     """
+    if y is None:
+        if not isinstance(ratio, dict):
+            raise ValueError("'ratio' has to be a dictionary when 'X' is an"
+                             " iterable of chunks. Got {} instead.".format(
+                                 type(ratio)))
+        rus = RandomUnderSampler(ratio=ratio, replacement=False,
+                                 random_state=random_state)
+        X_resampled, y_resampled = rus.fit_sample_chunks(X)
+        LOGGER.info('Make the dataset imbalanced: %s',
+                    ClassIndex(y_resampled).target_stats())
+        return X_resampled, y_resampled
+
     X, y = check_X_y(X, y)
-    target_stats = Counter(y)
+    target_stats = ClassIndex(y).target_stats()
     # restrict ratio to be a dict or a callable
     if isinstance(ratio, dict) or callable(ratio):
-        ratio_ = check_ratio(ratio, y, 'under-sampling', **kwargs)
+        ratio_ = _check_ratio(ratio, y, target_stats, 'under-sampling',
+                              **kwargs)
     else:
         raise ValueError("'ratio' has to be a dictionary or a function"
                          " returning a dictionary. Got {} instead.".format(
@@ -98,6 +124,7 @@ def make_imbalance(X, y, ratio, random_state=None, **kwargs):
     rus = RandomUnderSampler(ratio=ratio_, replacement=False,
                              random_state=random_state)
     X_resampled, y_resampled = rus.fit_sample(X, y)
-    LOGGER.info('Make the dataset imbalanced: %s', Counter(y_resampled))
+    LOGGER.info('Make the dataset imbalanced: %s',
+                ClassIndex(y_resampled).target_stats())
 
     return X_resampled, y_resampled
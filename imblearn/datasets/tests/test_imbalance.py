@@ -46,3 +46,12 @@ def test_make_imbalance_dict():
     ratio = {0: 10, 1: 20}
     X_, y_ = make_imbalance(X, Y, ratio=ratio)
     assert Counter(y_) == {0: 10, 1: 20, 2: 50}
+
+
+def test_make_imbalance_chunks():
+    chunks = ((X[i:i + 20], Y[i:i + 20]) for i in range(0, Y.size, 20))
+    X_, y_ = make_imbalance(chunks, None, ratio={0: 10, 1: 20},
+                            random_state=0)
+    assert Counter(y_) == {0: 10, 1: 20, 2: 50}
+    with raises(ValueError, match="has to be a dictionary when 'X'"):
+        make_imbalance(iter([]), None, ratio=lambda y: {0: 10})
@@ -4,8 +4,6 @@
 #          Christos Aridas
 # License: MIT
 
-from collections import Counter
-
 import numpy as np
 
 from sklearn.base import ClassifierMixin
@@ -14,7 +12,7 @@ from sklearn.utils import check_random_state, safe_indexing
 from sklearn.model_selection import cross_val_predict
 
 from .base import BaseEnsembleSampler
-from ..utils import check_ratio
+from ..utils.validation import _check_ratio
 
 
 class BalanceCascade(BaseEnsembleSampler):
@@ -119,25 +117,11 @@ BalanceCascade # doctest: +NORMALIZE_WHITESPACE
         self.estimator = estimator
         self.n_max_subset = n_max_subset
 
-    def fit(self, X, y):
-        """Find the classes statistics before to perform sampling.
-
-        Parameters
-        ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
-            Matrix containing the data which have to be sampled.
-
-        y : array-like, shape (n_samples,)
-            Corresponding label for each sample in X.
-
-        Returns
-        -------
-        self : object,
-            Return self.
-
-        """
-        super(BalanceCascade, self).fit(X, y)
-        self.ratio_ = check_ratio(self.ratio, y, 'under-sampling')
+    def _fit(self, X, y):
+        super(BalanceCascade, self)._fit(X, y)
+        self.ratio_ = _check_ratio(self.ratio, y,
+                                   self._class_index.target_stats(),
+                                   'under-sampling')
         return self
 
     def _validate_estimator(self):
@@ -183,6 +167,7 @@ BalanceCascade # doctest: +NORMALIZE_WHITESPACE
         self._validate_estimator()
 
         random_state = check_random_state(self.random_state)
+        class_index = self._class_index
 
         # array to know which samples are available to be taken
         samples_mask = np.ones(y.shape, dtype=bool)
@@ -193,33 +178,37 @@ BalanceCascade # doctest: +NORMALIZE_WHITESPACE
         n_subsets = 0
         b_subset_search = True
         while b_subset_search:
-            target_stats = Counter(safe_indexing(
-                y, np.flatnonzero(samples_mask)))
+            # the samples still available in each class, with the classes
+            # ordered by first available sample
+            available_indices = []
+            for target_class in class_index.classes:
+                index_class = class_index.indices(target_class)
+                index_class_interest = index_class[samples_mask[index_class]]
+                if index_class_interest.size:
+                    available_indices.append((target_class,
+                                              index_class_interest))
+            available_indices.sort(
+                key=lambda class_indices: class_indices[1][0])
             # store the index of the data to under-sample
-            index_under_sample = np.empty((0, ), dtype=y.dtype)
+            index_under_sample = []
             # value which will be picked at each round
-            index_constant = np.empty((0, ), dtype=y.dtype)
-            for target_class in target_stats.keys():
+            index_constant = []
+            for target_class, index_class_interest in available_indices:
                 if target_class in self.ratio_.keys():
                     n_samples = self.ratio_[target_class]
-                    # extract the data of interest for this round from the
-                    # current class
-                    index_class = np.flatnonzero(y == target_class)
-                    index_class_interest = index_class[samples_mask[
-                        y == target_class]]
-                    y_class = safe_indexing(y, index_class_interest)
-                    # select randomly the desired features
+                    # select randomly the desired features from the data of
+                    # interest for this round from the current class
                     index_target_class = random_state.choice(
-                        range(y_class.size), size=n_samples, replace=False)
-                    index_under_sample = np.concatenate(
-                        (index_under_sample,
-                         index_class_interest[index_target_class]),
-                        axis=0)
+                        range(index_class_interest.size), size=n_samples,
+                        replace=False)
+                    index_under_sample.append(
+                        index_class_interest[index_target_class])
                 else:
-                    index_constant = np.concatenate(
-                        (index_constant,
-                         np.flatnonzero(y == target_class)),
-                        axis=0)
+                    index_constant.append(class_index.indices(target_class))
+            index_under_sample = np.concatenate(
+                index_under_sample or [np.empty((0, ), dtype=int)])
+            index_constant = np.concatenate(
+                index_constant or [np.empty((0, ), dtype=int)])
 
             # store the set created
             n_subsets += 1
@@ -243,10 +232,9 @@ BalanceCascade # doctest: +NORMALIZE_WHITESPACE
                 if n_subsets == self.n_max_subset:
                     b_subset_search = False
             # check that there is enough samples for another round
-            target_stats = Counter(safe_indexing(
-                y, np.flatnonzero(samples_mask)))
             for target_class in self.ratio_.keys():
-                if target_stats[target_class] < self.ratio_[target_class]:
+                if (np.count_nonzero(samples_mask[class_index.indices(
+                        target_class)]) < self.ratio_[target_class]):
                     b_subset_search = False
 
         X_resampled, y_resampled = [], []
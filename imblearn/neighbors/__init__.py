@@ -0,0 +1,11 @@
+"""
+The :mod:`imblearn.neighbors` provides nearest neighbours search methods
+which can be used by the samplers relying on nearest neighbours.
+"""
+
+from .approximate import ApproximateNearestNeighbors
+from .approximate import neighbors_recall_score
+from .cache import NeighborGraphCache
+
+__all__ = ['ApproximateNearestNeighbors', 'NeighborGraphCache',
+           'neighbors_recall_score']
@@ -0,0 +1,429 @@
+"""Approximate nearest neighbours search using random projection trees."""
+
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+from __future__ import division
+
+from numbers import Integral
+
+import numpy as np
+from scipy import sparse
+
+from sklearn.base import BaseEstimator
+from sklearn.externals.joblib import Parallel, delayed
+from sklearn.neighbors.base import KNeighborsMixin
+from sklearn.utils import check_array, check_random_state, gen_batches
+from sklearn.utils.validation import check_is_fitted
+
+from ..utils._chunk import get_chunk_n_rows
+
+MAX_INT = np.iinfo(np.int32).max
+
+
+def _segments_positions(starts, sizes):
+    """Positions covered by contiguous segments and the segment of each
+    position."""
+    segments = np.repeat(np.arange(sizes.size), sizes)
+    offsets = np.cumsum(sizes) - sizes
+    positions = (np.arange(sizes.sum(), dtype=np.intp) +
+                 np.repeat(starts - offsets, sizes))
+    return positions, segments
+
+
+def _project(X, rows, directions, nodes):
+    """Dot product between the samples ``rows`` of ``X`` and the directions
+    of the nodes ``nodes``.
+
+    The samples and their directions are gathered by chunks of bounded
+    memory.
+    """
+    projections = np.empty(rows.size, dtype=X.dtype)
+    chunk_n_rows = get_chunk_n_rows(
+        row_bytes=2 * X.shape[1] * X.dtype.itemsize, max_n_rows=rows.size)
+    for batch in gen_batches(rows.size, chunk_n_rows):
+        X_batch, nodes_batch = X[rows[batch]], nodes[batch]
+        if sparse.issparse(X):
+            # only the non-zero entries of X contribute to the products
+            batch_rows = np.repeat(np.arange(X_batch.shape[0]),
+                                   np.diff(X_batch.indptr))
+            projections[batch] = np.bincount(
+                batch_rows, minlength=X_batch.shape[0],
+                weights=X_batch.data * directions[nodes_batch[batch_rows],
+                                                  X_batch.indices])
+        else:
+            projections[batch] = np.einsum('ij,ij->i', X_batch,
+                                           directions[nodes_batch])
+    return projections
+
+
+def _build_tree(X, leaf_size, random_state):
+    """Build a random projection tree.
+
+    The tree is grown level by level: all the nodes of a level containing
+    more than ``leaf_size`` samples are split at the median of the
+    projection of their samples on a random direction.
+
+    Returns
+    -------
+    tree : tuple
+        ``(node_refs, directions, thresholds, children, leaf_starts,
+        leaf_sizes, indices)`` where ``node_refs`` gives for each node its
+        index in ``directions``, ``thresholds`` and ``children`` if it is
+        an internal node or ``-(leaf + 1)`` if it is a leaf. The samples of
+        a leaf are ``indices[leaf_starts[leaf]:leaf_starts[leaf] +
+        leaf_sizes[leaf]]``.
+
+    """
+    random_state = check_random_state(random_state)
+    n_samples, n_features = X.shape
+    indices = np.arange(n_samples)
+    starts = np.array([0], dtype=np.intp)
+    sizes = np.array([n_samples], dtype=np.intp)
+
+    node_refs, directions, thresholds, children = [], [], [], []
+    leaf_starts, leaf_sizes = [], []
+    n_internals, n_leaves, n_nodes = 0, 0, 1
+    while starts.size:
+        is_split = sizes > leaf_size
+        n_splits = np.count_nonzero(is_split)
+        refs = np.empty(starts.size, dtype=np.intp)
+        refs[is_split] = n_internals + np.arange(n_splits)
+        refs[~is_split] = -(n_leaves + np.arange(starts.size - n_splits)) - 1
+        node_refs.append(refs)
+        leaf_starts.append(starts[~is_split])
+        leaf_sizes.append(sizes[~is_split])
+        n_internals += n_splits
+        n_leaves += starts.size - n_splits
+
+        starts, sizes = starts[is_split], sizes[is_split]
+        if not n_splits:
+            break
+        direction = random_state.normal(
+            size=(n_splits, n_features)).astype(X.dtype)
+        positions, segments = _segments_positions(starts, sizes)
+        projections = _project(X, indices[positions], direction, segments)
+
+        # sort the samples of each node by projection and split at the median
+        order = np.lexsort((projections, segments))
+        indices[positions] = indices[positions[order]]
+        projections = projections[order]
+        offsets = np.cumsum(sizes) - sizes
+        half = sizes // 2
+        directions.append(direction)
+        thresholds.append((projections[offsets + half - 1] +
+                           projections[offsets + half]) / 2)
+        children.append(n_nodes + np.arange(2 * n_splits).reshape(-1, 2))
+        n_nodes += 2 * n_splits
+
+        starts = np.column_stack((starts, starts + half)).ravel()
+        sizes = np.column_stack((half, sizes - half)).ravel()
+
+    if directions:
+        directions = np.concatenate(directions)
+        thresholds = np.concatenate(thresholds)
+        children = np.concatenate(children)
+    else:
+        directions = np.zeros((0, n_features), dtype=X.dtype)
+        thresholds = np.zeros(0, dtype=X.dtype)
+        children = np.zeros((0, 2), dtype=np.intp)
+    return (np.concatenate(node_refs), directions, thresholds, children,
+            np.concatenate(leaf_starts), np.concatenate(leaf_sizes), indices)
+
+
+def _query_tree(tree, X, leaf_size):
+    """Find the candidate neighbours of ``X`` in the leaves of a tree.
+
+    Returns an array of shape (n_queries, leaf_size) where missing candidates
+    are marked with -1.
+    """
+    (node_refs, directions, thresholds, children, leaf_starts, leaf_sizes,
+     indices) = tree
+    refs = np.repeat(node_refs[0], X.shape[0])
+    active = np.flatnonzero(refs >= 0)
+    while active.size:
+        internal = refs[active]
+        go_right = (_project(X, active, directions, internal) >
+                    thresholds[internal])
+        refs[active] = node_refs[children[internal, go_right.astype(int)]]
+        active = active[refs[active] >= 0]
+
+    leaves = -refs - 1
+    positions = leaf_starts[leaves, np.newaxis] + np.arange(leaf_size)
+    is_valid = np.arange(leaf_size) < leaf_sizes[leaves, np.newaxis]
+    return np.where(is_valid,
+                    indices[np.minimum(positions, indices.size - 1)], -1)
+
+
+def _squared_distances(X, X_fit, candidates):
+    """Squared euclidean distances between each row of ``X`` and the rows of
+    ``X_fit`` given by ``candidates`` of shape (n_queries, n_candidates)."""
+    if sparse.issparse(X):
+        diff = (X[np.repeat(np.arange(X.shape[0]), candidates.shape[1])] -
+                X_fit[candidates.ravel()])
+        return np.asarray(diff.multiply(diff).sum(axis=1),
+                          dtype=X.dtype).reshape(candidates.shape)
+    diff = X_fit[candidates] - X[:, np.newaxis, :]
+    return np.einsum('ijk,ijk->ij', diff, diff)
+
+
+class ApproximateNearestNeighbors(KNeighborsMixin, BaseEstimator):
+    """Approximate nearest neighbours search using random projection trees.
+
+    A forest of random projection trees is built on the training data. Each
+    tree recursively splits the samples at the median of their projection on
+    a random direction until the leaves contain at most ``leaf_size``
+    samples. The neighbours of a query are searched among the samples
+    sharing one of its leaves using the euclidean distance.
+
+    This object can be used in place of
+    :class:`sklearn.neighbors.NearestNeighbors` in the samplers relying on
+    nearest neighbours, e.g. ``SMOTE(k_neighbors=ApproximateNearestNeighbors(
+    n_neighbors=6))``.
+
+    Read more in the :ref:`User Guide <approximate_neighbors>`.
+
+    Parameters
+    ----------
+    n_neighbors : int, optional (default=5)
+        Number of neighbours to use by default for :meth:`kneighbors` queries.
+
+    n_trees : int, optional (default=10)
+        Number of random projection trees. More trees increase the recall of
+        the search at the cost of a slower query.
+
+    leaf_size : int, optional (default=30)
+        Maximum number of samples in a leaf. Larger leaves increase the
+        recall of the search at the cost of a slower query.
+
+    random_state : int, RandomState instance or None, optional (default=None)
+        If int, ``random_state`` is the seed used by the random number
+        generator; If ``RandomState`` instance, random_state is the random
+        number generator; If ``None``, the random number generator is the
+        ``RandomState`` instance used by ``np.random``.
+
+    n_jobs : int, optional (default=1)
+        The number of threads to open to build the trees.
+
+    Attributes
+    ----------
+    trees_ : list of tuple
+        The random projection trees.
+
+    See also
+    --------
+    neighbors_recall_score : Recall of an approximate neighbours search.
+
+    Examples
+    --------
+
+    >>> import numpy as np
+    >>> from imblearn.neighbors import ApproximateNearestNeighbors
+    >>> X = np.random.RandomState(0).randn(1000, 10)
+    >>> nn = ApproximateNearestNeighbors(n_neighbors=3, random_state=0)
+    >>> ind = nn.fit(X).kneighbors(X[:2], return_distance=False)
+    >>> ind.shape
+    (2, 3)
+    >>> ind[:, 0]
+    array([0, 1])
+
+    """
+
+    def __init__(self, n_neighbors=5, n_trees=10, leaf_size=30,
+                 random_state=None, n_jobs=1):
+        self.n_neighbors = n_neighbors
+        self.n_trees = n_trees
+        self.leaf_size = leaf_size
+        self.random_state = random_state
+        self.n_jobs = n_jobs
+
+    def fit(self, X, y=None):
+        """Build the random projection trees.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Training data.
+
+        y : Ignored
+
+        Returns
+        -------
+        self : object,
+            Return self.
+
+        """
+        X = check_array(X, accept_sparse='csr',
+                        dtype=[np.float64, np.float32])
+        for name in ('n_trees', 'leaf_size'):
+            value = getattr(self, name)
+            if not isinstance(value, Integral) or value < 1:
+                raise ValueError("'{}' should be a positive integer. Got {}"
+                                 " instead.".format(name, value))
+        random_state = check_random_state(self.random_state)
+        seeds = random_state.randint(MAX_INT, size=self.n_trees)
+
+        self._fit_X = X
+        self.trees_ = Parallel(n_jobs=self.n_jobs, backend='threading')(
+            delayed(_build_tree)(X, self.leaf_size, seed) for seed in seeds)
+
+        return self
+
+    def kneighbors(self, X=None, n_neighbors=None, return_distance=True):
+        """Find the approximate K-neighbors of a point.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_query, n_features) or None
+            The query points. If not provided, neighbors of each indexed
+            point are returned. In this case, the query point is not
+            considered its own neighbor.
+
+        n_neighbors : int or None, optional (default=None)
+            Number of neighbors to get (default is the value passed to the
+            constructor).
+
+        return_distance : bool, optional (default=True)
+            If False, distances will not be returned
+
+        Returns
+        -------
+        dist : ndarray, shape (n_query, n_neighbors)
+            Array representing the lengths to points, only present if
+            return_distance=True
+
+        ind : ndarray, shape (n_query, n_neighbors)
+            Indices of the nearest points in the population matrix.
+
+        """
+        check_is_fitted(self, 'trees_')
+
+        if n_neighbors is None:
+            n_neighbors = self.n_neighbors
+        query_is_train = X is None
+        if query_is_train:
+            X = self._fit_X
+            n_neighbors += 1
+        else:
+            X = check_array(X, accept_sparse='csr', dtype=self._fit_X.dtype)
+            # the queries are searched in the format of the fitted data
+            if sparse.issparse(self._fit_X) and not sparse.issparse(X):
+                X = sparse.csr_matrix(X)
+            elif not sparse.issparse(self._fit_X) and sparse.issparse(X):
+                X = X.toarray()
+        n_samples_fit = self._fit_X.shape[0]
+        if n_neighbors > n_samples_fit:
+            raise ValueError("Expected n_neighbors <= n_samples, but"
+                             " n_samples = {}, n_neighbors = {}".format(
+                                 n_samples_fit, n_neighbors))
+
+        n_candidates = self.n_trees * min(self.leaf_size, n_samples_fit)
+        chunk_n_rows = get_chunk_n_rows(
+            row_bytes=2 * n_candidates * (X.shape[1] + 2) * X.dtype.itemsize,
+            max_n_rows=X.shape[0])
+        dist = np.empty((X.shape[0], n_neighbors), dtype=X.dtype)
+        ind = np.empty((X.shape[0], n_neighbors), dtype=np.intp)
+        for batch in gen_batches(X.shape[0], chunk_n_rows):
+            dist[batch], ind[batch] = self._kneighbors_chunk(X[batch],
+                                                             n_neighbors)
+        np.sqrt(dist, out=dist)
+
+        if query_is_train:
+            # remove the query point from its own neighbors or, if it was not
+            # found, the furthest neighbor
+            sample_mask = ind != np.arange(X.shape[0])[:, np.newaxis]
+            sample_mask[np.all(sample_mask, axis=1), -1] = False
+            dist = dist[sample_mask].reshape(X.shape[0], n_neighbors - 1)
+            ind = ind[sample_mask].reshape(X.shape[0], n_neighbors - 1)
+
+        if return_distance:
+            return dist, ind
+        return ind
+
+    def _kneighbors_chunk(self, X, n_neighbors):
+        """Squared distances and indices of the neighbours of a chunk."""
+        leaf_size = min(self.leaf_size, self._fit_X.shape[0])
+        candidates = np.hstack([_query_tree(tree, X, leaf_size)
+                                for tree in self.trees_])
+        # a sample can be found in several trees
+        candidates.sort(axis=1)
+        candidates[:, 1:][candidates[:, 1:] == candidates[:, :-1]] = -1
+        is_valid = candidates >= 0
+
+        dist = _squared_distances(X, self._fit_X, np.maximum(candidates, 0))
+        dist[~is_valid] = np.inf
+
+        # fall back on an exhaustive search when not enough candidates were
+        # found
+        is_short = np.count_nonzero(is_valid, axis=1) < n_neighbors
+        if np.any(is_short):
+            n_samples_fit = self._fit_X.shape[0]
+            candidates_short = np.tile(np.arange(n_samples_fit),
+                                       (np.count_nonzero(is_short), 1))
+            dist_short = _squared_distances(X[np.flatnonzero(is_short)],
+                                            self._fit_X,
+                                            candidates_short)
+            padding = candidates.shape[1] - n_samples_fit
+            if padding > 0:
+                candidates_short = np.pad(candidates_short, ((0, 0),
+                                                             (0, padding)),
+                                          mode='constant', constant_values=-1)
+                dist_short = np.pad(dist_short, ((0, 0), (0, padding)),
+                                    mode='constant', constant_values=np.inf)
+            elif padding < 0:
+                candidates = np.pad(candidates, ((0, 0), (0, -padding)),
+                                    mode='constant', constant_values=-1)
+                dist = np.pad(dist, ((0, 0), (0, -padding)),
+                              mode='constant', constant_values=np.inf)
+            candidates[is_short] = candidates_short
+            dist[is_short] = dist_short
+
+        if n_neighbors < candidates.shape[1]:
+            nearest = np.argpartition(dist, n_neighbors - 1,
+                                      axis=1)[:, :n_neighbors]
+        else:
+            nearest = np.tile(np.arange(candidates.shape[1]),
+                              (X.shape[0], 1))
+        rows = np.arange(X.shape[0])[:, np.newaxis]
+        nearest = nearest[rows, np.argsort(dist[rows, nearest], axis=1)]
+        return dist[rows, nearest], candidates[rows, nearest]
+
+
+def neighbors_recall_score(ind_true, ind_pred):
+    """Compute the recall of an approximate nearest neighbours search.
+
+    The recall@k is the fraction of the exact k nearest neighbours of the
+    queries which are retrieved by the approximate search.
+
+    Parameters
+    ----------
+    ind_true : array-like, shape (n_queries, n_neighbors)
+        Indices of the exact nearest neighbours.
+
+    ind_pred : array-like, shape (n_queries, n_neighbors_pred)
+        Indices of the approximate nearest neighbours.
+
+    Returns
+    -------
+    recall : float
+        The fraction of the exact neighbours found.
+
+    Examples
+    --------
+
+    >>> from imblearn.neighbors import neighbors_recall_score
+    >>> neighbors_recall_score([[0, 1], [1, 2]], [[0, 2], [1, 2]])
+    0.75
+
+    """
+    ind_true = check_array(ind_true, dtype=None)
+    ind_pred = check_array(ind_pred, dtype=None)
+    if ind_true.shape[0] != ind_pred.shape[0]:
+        raise ValueError("'ind_true' and 'ind_pred' should have the same"
+                         " number of queries. Got {} and {} instead.".format(
+                             ind_true.shape[0], ind_pred.shape[0]))
+    # make the indices unique across queries
+    offsets = (np.arange(ind_true.shape[0])[:, np.newaxis] *
+               (max(ind_true.max(), ind_pred.max()) + 1))
+    is_found = np.in1d(ind_true + offsets, ind_pred + offsets)
+    return np.count_nonzero(is_found) / ind_true.size
@@ -0,0 +1,330 @@
+"""Cache of nearest neighbours graphs shared across samplers."""
+
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+from collections import OrderedDict
+from threading import RLock
+
+import numpy as np
+
+from sklearn.externals import joblib
+from sklearn.neighbors.base import NeighborsBase
+from sklearn.utils import safe_indexing
+
+# stack of the caches activated with a ``with`` statement
+_ACTIVE_CACHES = []
+
+
+def _estimator_key(estimator):
+    """Part of the key of a graph depending on the neighbours estimator.
+
+    The number of neighbours and of jobs do not change the neighbours found.
+    The exact scikit-learn estimators are only identified by their metric.
+    """
+    params = estimator.get_params(deep=False)
+    if isinstance(estimator, NeighborsBase):
+        name = 'exact'
+        params = {key: params.get(key)
+                  for key in ('metric', 'p', 'metric_params')}
+    else:
+        name = type(estimator).__name__
+        params = {key: value for key, value in params.items()
+                  if key not in ('n_neighbors', 'n_jobs')}
+    return name, tuple(sorted((key, repr(value))
+                              for key, value in params.items()))
+
+
+def _effective_metric(estimator):
+    """Metric and parameters of the distance of an exact neighbours estimator.
+
+    The metric is given such that :func:`sklearn.metrics.pairwise_distances`
+    computes the distances used by the estimator.
+    """
+    metric = estimator.metric
+    metric_params = dict(estimator.metric_params or {})
+    if metric == 'minkowski':
+        p = metric_params.pop('p', estimator.p)
+        if p == 1:
+            metric = 'manhattan'
+        elif p == 2:
+            metric = 'euclidean'
+        else:
+            metric_params['p'] = p
+    return metric, metric_params
+
+
+class NeighborGraphCache(object):
+    """Cache of the nearest neighbours graphs computed by the samplers.
+
+    While the cache is active, i.e. within a ``with`` statement, the samplers
+    relying on nearest neighbours look up the neighbours of their data in the
+    cache before fitting their nearest neighbours estimator. A graph is
+    identified by a fingerprint of the fitted data (and of the queried data
+    if it differs), the metric and the parameters of the estimator. It is
+    stored for the largest number of neighbours requested and served as a
+    prefix for a smaller number of neighbours.
+
+    The least recently used graphs are evicted when the memory used by the
+    cache exceeds ``max_bytes``.
+
+    Read more in the :ref:`User Guide <neighbor_graph_cache>`.
+
+    Parameters
+    ----------
+    max_bytes : int, optional (default=268435456)
+        Maximum memory, in bytes, used by the stored graphs. Graphs larger
+        than this limit are not stored.
+
+    Attributes
+    ----------
+    n_hits : int
+        Number of queries served from the cache.
+
+    n_misses : int
+        Number of queries which required to fit the estimator.
+
+    Notes
+    -----
+    With an exact nearest neighbours search, the neighbours served from the
+    cache are identical to the ones found by the estimator, up to the order of
+    neighbours at equal distance.
+
+    :class:`imblearn.under_sampling.CondensedNearestNeighbour` searches the
+    neighbours among a store of samples growing at each addition, which
+    cannot be shared, and does not use the cache. Neither does
+    :class:`imblearn.under_sampling.OneSidedSelection` when its
+    ``n_neighbors`` classifier weights the neighbours with their distance or
+    is a subclass of :class:`sklearn.neighbors.KNeighborsClassifier`, whose
+    ``predict`` is then used.
+
+    Examples
+    --------
+
+    >>> from sklearn.datasets import make_classification
+    >>> from imblearn.neighbors import NeighborGraphCache
+    >>> from imblearn.under_sampling import (EditedNearestNeighbours,
+    ...                                      NeighbourhoodCleaningRule)
+    >>> X, y = make_classification(n_classes=2, weights=[0.1, 0.9],
+    ...                            n_samples=1000, random_state=10)
+    >>> with NeighborGraphCache() as cache:
+    ...     X_res, y_res = EditedNearestNeighbours().fit_sample(X, y)
+    ...     X_res, y_res = NeighbourhoodCleaningRule().fit_sample(X, y)
+    >>> cache.n_hits
+    1
+
+    """
+
+    def __init__(self, max_bytes=256 * 2 ** 20):
+        self.max_bytes = max_bytes
+        self._graphs = OrderedDict()
+        self._lock = RLock()
+        self.n_hits = 0
+        self.n_misses = 0
+
+    def __enter__(self):
+        _ACTIVE_CACHES.append(self)
+        return self
+
+    def __exit__(self, *exc_info):
+        _ACTIVE_CACHES.remove(self)
+
+    def __len__(self):
+        return len(self._graphs)
+
+    @property
+    def nbytes(self):
+        """Memory, in bytes, used by the stored graphs."""
+        return sum(dist.nbytes + ind.nbytes
+                   for dist, ind in self._graphs.values())
+
+    def clear(self):
+        """Remove all the stored graphs."""
+        self._graphs.clear()
+
+    def _fingerprint(self, X):
+        """Fingerprint of the data used in the key of a graph."""
+        return joblib.hash(X)
+
+    def _key(self, estimator, X, X_query=None):
+        return (_estimator_key(estimator), self._fingerprint(X),
+                None if X_query is None else self._fingerprint(X_query))
+
+    def _get(self, key, n_neighbors):
+        """Get a graph with at least ``n_neighbors`` or None."""
+        with self._lock:
+            graph = self._graphs.get(key)
+            if graph is None or graph[1].shape[1] < n_neighbors:
+                self.n_misses += 1
+                return None
+            # mark the graph as the most recently used
+            self._graphs[key] = self._graphs.pop(key)
+            self.n_hits += 1
+            return graph
+
+    def _put(self, key, graph):
+        """Store a graph and evict the least recently used ones."""
+        with self._lock:
+            self._graphs.pop(key, None)
+            nbytes = graph[0].nbytes + graph[1].nbytes
+            if nbytes > self.max_bytes:
+                return
+            self._graphs[key] = graph
+            while self.nbytes > self.max_bytes:
+                self._graphs.popitem(last=False)
+
+
+def _kneighbors(estimator, X, rows=None, X_query=None, n_neighbors=None,
+                return_distance=True):
+    """Fit a nearest neighbours estimator and find the neighbours of queries.
+
+    The neighbours are looked up in the active :class:`NeighborGraphCache`,
+    if any, in which case the estimator is only fitted when the graph is not
+    stored.
+
+    Parameters
+    ----------
+    estimator : KNeighborsMixin
+        The nearest neighbours estimator.
+
+    X : {array-like, sparse matrix}, shape (n_samples, n_features)
+        The data to fit the estimator with.
+
+    rows : ndarray, shape (n_queries,), optional (default=None)
+        The indices of the queries in ``X``, or in ``X_query`` if given. By
+        default, all the samples are queried.
+
+    X_query : {array-like, sparse matrix}, shape (n_samples_query, \
+n_features), optional (default=None)
+        The queried data. By default, the samples of ``X`` are queried.
+
+    n_neighbors : int, optional (default=None)
+        Number of neighbours to find. By default, the number of neighbours of
+        the estimator is used.
+
+    return_distance : bool, optional (default=True)
+        Whether or not to return the distances.
+
+    Returns
+    -------
+    dist : ndarray, shape (n_queries, n_neighbors)
+        The distances to the neighbours, only present if
+        ``return_distance=True``.
+
+    ind : ndarray, shape (n_queries, n_neighbors)
+        The indices of the neighbours in ``X``.
+
+    """
+    if n_neighbors is None:
+        n_neighbors = estimator.n_neighbors
+    queries = X if X_query is None else X_query
+    cache = _ACTIVE_CACHES[-1] if _ACTIVE_CACHES else None
+
+    if cache is None:
+        estimator.fit(X)
+        if rows is not None:
+            queries = safe_indexing(queries, rows)
+        return estimator.kneighbors(queries, n_neighbors=n_neighbors,
+                                    return_distance=return_distance)
+
+    key = cache._key(estimator, X, X_query)
+    graph = cache._get(key, n_neighbors)
+    if graph is None:
+        # the graph of all the queries is stored to serve other subsets
+        estimator.fit(X)
+        graph = estimator.kneighbors(queries, n_neighbors=n_neighbors)
+        cache._put(key, graph)
+    dist, ind = graph
+    if rows is None:
+        dist = dist[:, :n_neighbors].copy()
+        ind = ind[:, :n_neighbors].copy()
+    else:
+        dist, ind = dist[rows, :n_neighbors], ind[rows, :n_neighbors]
+    if return_distance:
+        return dist, ind
+    return ind
+
+
+def _graph_kneighbors(graph, fit_indices=None, query_indices=None,
+                      n_neighbors=1, return_distance=True):
+    """Read the neighbours of queries from a precomputed neighbours graph.
+
+    The neighbours are searched among the samples ``fit_indices`` of the
+    graph. As :meth:`kneighbors` of an estimator fitted and queried with the
+    same samples, a query which belongs to the fitted samples is its own
+    nearest neighbour, whether or not the graph stores its self-loop. The
+    queries for which the graph does not store enough neighbours among the
+    fitted samples get the index -1 and an infinite distance in their last
+    columns.
+
+    Parameters
+    ----------
+    graph : csr_matrix, shape (n_samples, n_samples)
+        The distances from each sample to its nearest neighbours.
+
+    fit_indices : ndarray, shape (n_samples_fit,), optional (default=None)
+        The indices of the fitted samples. By default, all the samples.
+
+    query_indices : ndarray, shape (n_queries,), optional (default=None)
+        The indices of the queries. By default, the fitted samples.
+
+    n_neighbors : int, optional (default=1)
+        Number of neighbours to find.
+
+    return_distance : bool, optional (default=True)
+        Whether or not to return the distances.
+
+    Returns
+    -------
+    dist : ndarray, shape (n_queries, n_neighbors)
+        The distances to the neighbours, only present if
+        ``return_distance=True``.
+
+    ind : ndarray, shape (n_queries, n_neighbors)
+        The indices of the neighbours in the fitted samples, -1 for the
+        neighbours missing from the graph.
+
+    """
+    n_samples = graph.shape[0]
+    position = np.full(n_samples, -1, dtype=np.intp)
+    if fit_indices is None:
+        position[:] = np.arange(n_samples)
+    else:
+        position[fit_indices] = np.arange(len(fit_indices))
+    if query_indices is None:
+        query_indices = (np.arange(n_samples) if fit_indices is None
+                         else fit_indices)
+    query_indices = np.asarray(query_indices)
+    n_queries = query_indices.size
+
+    query_graph = graph[query_indices]
+    query_row = np.repeat(np.arange(n_queries), np.diff(query_graph.indptr))
+    neighbors = query_graph.indices
+    is_kept = np.logical_and(position[neighbors] >= 0,
+                             neighbors != query_indices[query_row])
+    query_row, neighbors = query_row[is_kept], neighbors[is_kept]
+    dist = query_graph.data[is_kept]
+
+    # rank the neighbours of each query by distance
+    order = np.lexsort((neighbors, dist, query_row))
+    query_row, neighbors = query_row[order], neighbors[order]
+    dist = dist[order]
+    n_stored = np.bincount(query_row, minlength=n_queries)
+    rank = np.arange(query_row.size) - np.repeat(np.cumsum(n_stored) -
+                                                 n_stored, n_stored)
+
+    is_self = position[query_indices] >= 0
+    n_required = n_neighbors - is_self
+    is_selected = rank < n_required[query_row]
+    query_row = query_row[is_selected]
+    column = rank[is_selected] + is_self[query_row]
+
+    ind = np.full((n_queries, n_neighbors), -1, dtype=np.intp)
+    ind[query_row, column] = position[neighbors[is_selected]]
+    ind[is_self, 0] = position[query_indices[is_self]]
+    if not return_distance:
+        return ind
+    dist_out = np.full((n_queries, n_neighbors), np.inf, dtype=np.float64)
+    dist_out[query_row, column] = dist[is_selected]
+    dist_out[is_self, 0] = 0
+    return dist_out, ind
@@ -0,0 +1,159 @@
+"""Test the module approximate nearest neighbours."""
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+from __future__ import division
+
+import numpy as np
+import pytest
+from scipy import sparse
+
+from sklearn.datasets import make_blobs, make_classification
+from sklearn.neighbors import NearestNeighbors
+from sklearn.utils.testing import assert_allclose, assert_array_equal
+
+from imblearn.neighbors import ApproximateNearestNeighbors
+from imblearn.neighbors import neighbors_recall_score
+from imblearn.over_sampling import ADASYN, SMOTE
+from imblearn.under_sampling import EditedNearestNeighbours
+
+X, _ = make_blobs(n_samples=2000, n_features=8, centers=10, random_state=0)
+
+
+def test_ann_recall():
+    nn = NearestNeighbors(n_neighbors=10).fit(X)
+    ind_true = nn.kneighbors(X[:200], return_distance=False)
+    ann = ApproximateNearestNeighbors(n_neighbors=10, n_trees=10,
+                                      random_state=0).fit(X)
+    ind_pred = ann.kneighbors(X[:200], return_distance=False)
+    assert neighbors_recall_score(ind_true, ind_pred) > 0.9
+
+
+def test_ann_recall_increases_with_n_trees():
+    nn = NearestNeighbors(n_neighbors=5).fit(X)
+    ind_true = nn.kneighbors(X[:200], return_distance=False)
+    recalls = []
+    for n_trees in (1, 5, 20):
+        ann = ApproximateNearestNeighbors(n_neighbors=5, n_trees=n_trees,
+                                          leaf_size=20, random_state=0)
+        ind_pred = ann.fit(X).kneighbors(X[:200], return_distance=False)
+        recalls.append(neighbors_recall_score(ind_true, ind_pred))
+    assert recalls == sorted(recalls)
+
+
+def test_ann_distances():
+    ann = ApproximateNearestNeighbors(n_neighbors=5, random_state=0).fit(X)
+    dist, ind = ann.kneighbors(X[:100])
+    assert_array_equal(ind[:, 0], np.arange(100))
+    assert_allclose(dist, np.sqrt(((X[ind] - X[:100, np.newaxis]) ** 2)
+                                  .sum(axis=2)), rtol=1e-6)
+    assert np.all(np.diff(dist, axis=1) >= 0)
+    assert ind.shape == (100, 5)
+    assert len(np.unique(ind[0])) == 5
+
+
+def test_ann_training_query_excludes_self():
+    ann = ApproximateNearestNeighbors(n_neighbors=3, random_state=0).fit(X)
+    ind = ann.kneighbors(return_distance=False)
+    assert ind.shape == (X.shape[0], 3)
+    assert not np.any(ind == np.arange(X.shape[0])[:, np.newaxis])
+
+
+def test_ann_exhaustive_fallback():
+    # with a single small leaf, not enough candidates are found and the
+    # search becomes exact
+    X_small = X[:50]
+    ann = ApproximateNearestNeighbors(n_neighbors=20, n_trees=1, leaf_size=5,
+                                      random_state=0).fit(X_small)
+    nn = NearestNeighbors(n_neighbors=20).fit(X_small)
+    dist_ann, ind_ann = ann.kneighbors(X_small)
+    dist_nn, _ = nn.kneighbors(X_small)
+    assert_allclose(dist_ann, dist_nn)
+
+
+def test_ann_sparse():
+    X_csr = sparse.csr_matrix(X)
+    for n_trees, leaf_size in ((10, 30), (1, 5)):
+        ann = ApproximateNearestNeighbors(n_neighbors=5, n_trees=n_trees,
+                                          leaf_size=leaf_size, random_state=0)
+        dist, ind = ann.fit(X).kneighbors(X[:100])
+        ind_train = ann.kneighbors(return_distance=False)
+        dist_csr, ind_csr = ann.fit(X_csr).kneighbors(X_csr[:100])
+        assert_array_equal(ind_csr, ind)
+        assert_allclose(dist_csr, dist, rtol=1e-6)
+        assert_array_equal(ann.kneighbors(return_distance=False), ind_train)
+        # the dense queries are searched in the sparse data
+        assert_array_equal(ann.kneighbors(X[:100], return_distance=False),
+                           ind)
+
+
+def test_ann_chunked_projections(monkeypatch):
+    X_small = X[:300]
+    X_csr = sparse.csr_matrix(X_small)
+    ann = ApproximateNearestNeighbors(n_trees=3, random_state=0)
+    ind = ann.fit(X_small).kneighbors(X_small[:20], return_distance=False)
+    ind_csr = ann.fit(X_csr).kneighbors(X_csr[:20], return_distance=False)
+    # project a few samples at once while building and querying the trees
+    monkeypatch.setattr('imblearn.utils._chunk.WORKING_MEMORY',
+                        X.shape[1] * X.itemsize * 20 / 2 ** 20)
+    assert_array_equal(ann.fit(X_small).kneighbors(X_small[:20],
+                                                   return_distance=False),
+                       ind)
+    assert_array_equal(ann.fit(X_csr).kneighbors(X_csr[:20],
+                                                 return_distance=False),
+                       ind_csr)
+
+
+def test_ann_random_state():
+    ann = ApproximateNearestNeighbors(random_state=0)
+    ind_1 = ann.fit(X).kneighbors(X[:50], return_distance=False)
+    ind_2 = ann.fit(X).kneighbors(X[:50], return_distance=False)
+    assert_array_equal(ind_1, ind_2)
+
+
+@pytest.mark.parametrize(
+    "params, err_msg",
+    [({'n_trees': 0}, "'n_trees' should be a positive integer"),
+     ({'leaf_size': 1.5}, "'leaf_size' should be a positive integer")])
+def test_ann_error(params, err_msg):
+    ann = ApproximateNearestNeighbors(**params)
+    with pytest.raises(ValueError, match=err_msg):
+        ann.fit(X)
+
+
+def test_ann_too_many_neighbors():
+    ann = ApproximateNearestNeighbors(n_neighbors=11).fit(X[:10])
+    with pytest.raises(ValueError, match="Expected n_neighbors <= n_samples"):
+        ann.kneighbors(X[:10])
+
+
+@pytest.mark.parametrize(
+    "sampler",
+    [SMOTE(k_neighbors=ApproximateNearestNeighbors(n_neighbors=6,
+                                                   random_state=0),
+           random_state=0),
+     ADASYN(n_neighbors=ApproximateNearestNeighbors(n_neighbors=6,
+                                                    random_state=0),
+            random_state=0),
+     EditedNearestNeighbours(
+         n_neighbors=ApproximateNearestNeighbors(n_neighbors=4,
+                                                 random_state=0))])
+def test_ann_samplers(sampler):
+    X_clf, y_clf = make_classification(n_samples=500, weights=[0.2, 0.8],
+                                       random_state=0)
+    X_res, y_res = sampler.fit_sample(X_clf, y_clf)
+    assert X_res.shape[0] == y_res.shape[0]
+    assert X_res.shape[0] != X_clf.shape[0]
+    X_res_csr, y_res_csr = sampler.fit_sample(sparse.csr_matrix(X_clf),
+                                              y_clf)
+    assert sparse.issparse(X_res_csr)
+    assert X_res_csr.shape == X_res.shape
+
+
+def test_neighbors_recall_score():
+    ind_true = np.array([[0, 1, 2], [3, 4, 5]])
+    assert neighbors_recall_score(ind_true, ind_true) == 1
+    assert neighbors_recall_score(ind_true, ind_true[::-1]) == 0
+    assert neighbors_recall_score(ind_true, [[2, 1, 9], [5, 7, 8]]) == 0.5
+    with pytest.raises(ValueError, match="same number of queries"):
+        neighbors_recall_score(ind_true, ind_true[:1])
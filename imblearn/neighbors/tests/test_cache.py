@@ -0,0 +1,145 @@
+"""Test the module neighbours graph cache."""
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+import numpy as np
+import pytest
+
+from sklearn.datasets import make_classification
+from sklearn.neighbors import NearestNeighbors
+from sklearn.utils.testing import assert_allclose, assert_array_equal
+
+from imblearn.combine import SMOTEENN, SMOTETomek
+from imblearn.neighbors import ApproximateNearestNeighbors
+from imblearn.neighbors import NeighborGraphCache
+from imblearn.neighbors.cache import _kneighbors
+from imblearn.over_sampling import ADASYN, SMOTE
+from imblearn.under_sampling import (AllKNN, ClusterCentroids,
+                                     EditedNearestNeighbours, NearMiss,
+                                     NeighbourhoodCleaningRule,
+                                     OneSidedSelection,
+                                     RepeatedEditedNearestNeighbours,
+                                     TomekLinks)
+
+X, y = make_classification(n_samples=300, n_classes=3, n_informative=4,
+                           weights=[0.1, 0.3, 0.6], random_state=0)
+
+
+def test_kneighbors_prefix():
+    nn = NearestNeighbors(n_neighbors=6)
+    with NeighborGraphCache() as cache:
+        dist_6, ind_6 = _kneighbors(nn, X)
+        dist_3, ind_3 = _kneighbors(nn, X, rows=np.arange(10),
+                                    n_neighbors=3)
+    assert cache.n_misses == 1
+    assert cache.n_hits == 1
+    assert_array_equal(ind_3, ind_6[:10, :3])
+    assert_allclose(dist_3, dist_6[:10, :3])
+
+
+def test_kneighbors_larger_k_replaces_graph():
+    nn = NearestNeighbors(n_neighbors=3)
+    with NeighborGraphCache() as cache:
+        _kneighbors(nn, X)
+        ind = _kneighbors(nn, X, n_neighbors=5, return_distance=False)
+        assert ind.shape == (X.shape[0], 5)
+        _kneighbors(nn, X, n_neighbors=4)
+    assert len(cache) == 1
+    assert (cache.n_hits, cache.n_misses) == (1, 2)
+
+
+def test_kneighbors_keys():
+    with NeighborGraphCache() as cache:
+        # the number of jobs and the algorithm do not matter
+        _kneighbors(NearestNeighbors(n_neighbors=3), X)
+        _kneighbors(NearestNeighbors(n_neighbors=3, algorithm='brute',
+                                     n_jobs=2), X)
+        assert cache.n_hits == 1
+        # the metric, the data and the queries do
+        _kneighbors(NearestNeighbors(n_neighbors=3, metric='manhattan'), X)
+        _kneighbors(NearestNeighbors(n_neighbors=3), X[:100])
+        _kneighbors(NearestNeighbors(n_neighbors=3), X, X_query=X[:10])
+        _kneighbors(ApproximateNearestNeighbors(n_neighbors=3,
+                                                random_state=0), X)
+        assert cache.n_hits == 1
+        assert len(cache) == 5
+
+
+def test_cache_eviction():
+    nn = NearestNeighbors(n_neighbors=3)
+    graph_nbytes = X.shape[0] * 3 * 16
+    with NeighborGraphCache(max_bytes=2 * graph_nbytes) as cache:
+        _kneighbors(nn, X[:300])
+        _kneighbors(nn, X[:300][::-1])
+        _kneighbors(nn, X[:300])
+        # the least recently used graph is evicted
+        _kneighbors(nn, X[:300] + 1)
+        assert len(cache) == 2
+        assert cache.nbytes <= cache.max_bytes
+        _kneighbors(nn, X[:300])
+        assert cache.n_hits == 2
+        # graph larger than the cache are not stored
+        _kneighbors(nn, X[:300], n_neighbors=10)
+        assert len(cache) == 1
+    cache.clear()
+    assert len(cache) == 0
+
+
+def test_cache_not_active():
+    cache = NeighborGraphCache()
+    with cache:
+        pass
+    _kneighbors(NearestNeighbors(n_neighbors=3), X)
+    assert len(cache) == 0
+
+
+@pytest.mark.parametrize(
+    "sampler",
+    [SMOTE(random_state=0),
+     SMOTE(kind='borderline1', random_state=0),
+     SMOTE(kind='borderline2', random_state=0),
+     SMOTE(kind='svm', random_state=0),
+     ADASYN(random_state=0),
+     EditedNearestNeighbours(),
+     RepeatedEditedNearestNeighbours(),
+     AllKNN(),
+     NeighbourhoodCleaningRule(),
+     OneSidedSelection(random_state=0),
+     TomekLinks(),
+     NearMiss(version=1),
+     NearMiss(version=2),
+     NearMiss(version=3),
+     ClusterCentroids(voting='hard', random_state=0),
+     SMOTEENN(random_state=0),
+     SMOTETomek(random_state=0)])
+def test_samplers_with_cache(sampler):
+    X_res, y_res = sampler.fit_sample(X, y)
+    with NeighborGraphCache() as cache:
+        for _ in range(2):
+            X_res_cache, y_res_cache = sampler.fit_sample(X, y)
+            assert_allclose(X_res_cache, X_res)
+            assert_array_equal(y_res_cache, y_res)
+    assert cache.n_hits > 0
+
+
+def test_oss_neighbors_search_cached():
+    # the neighbours of the samples of each class and the Tomek links
+    with NeighborGraphCache() as cache:
+        X_res, y_res = OneSidedSelection(random_state=0).fit_sample(X, y)
+        assert (cache.n_hits, cache.n_misses) == (0, 3)
+        X_res_cache, y_res_cache = OneSidedSelection(
+            random_state=0).fit_sample(X, y)
+        assert (cache.n_hits, cache.n_misses) == (3, 3)
+    assert_allclose(X_res_cache, X_res)
+    assert_array_equal(y_res_cache, y_res)
+
+
+def test_ncr_single_neighbors_search():
+    # the edition and the cleaning of the neighbourhood share their search
+    with NeighborGraphCache() as cache:
+        NeighbourhoodCleaningRule().fit_sample(X, y)
+    assert (cache.n_hits, cache.n_misses) == (0, 1)
+    with NeighborGraphCache() as cache:
+        EditedNearestNeighbours().fit_sample(X, y)
+        NeighbourhoodCleaningRule().fit_sample(X, y)
+    assert (cache.n_hits, cache.n_misses) == (1, 1)
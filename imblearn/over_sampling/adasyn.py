@@ -7,15 +7,17 @@
 from __future__ import division
 
 import numpy as np
-from scipy import sparse
 
-from sklearn.utils import check_random_state, safe_indexing
+from sklearn.base import clone
+from sklearn.externals.joblib import Parallel, delayed
+from sklearn.utils import check_random_state
 
 from .base import BaseOverSampler
+from ..base import NeighborsGraphMixin
 from ..utils import check_neighbors_object
 
 
-class ADASYN(BaseOverSampler):
+class ADASYN(NeighborsGraphMixin, BaseOverSampler):
     """Perform over-sampling using ADASYN.
 
     Perform over-sampling using Adaptive Synthetic Sampling Approach for
@@ -55,7 +57,9 @@ class ADASYN(BaseOverSampler):
         find the k_neighbors.
 
     n_jobs : int, optional (default=1)
-        Number of threads to run the algorithm when it is possible.
+        Number of threads to run the algorithm when it is possible. The
+        nearest neighbours of the classes to over-sample are also searched
+        in parallel.
 
     Notes
     -----
@@ -135,27 +139,60 @@ ADASYN # doctest: +NORMALIZE_WHITESPACE
         y_resampled : ndarray, shape (n_samples_new,)
             The corresponding label of `X_resampled`
 
+        """
+        return self._build_resampled(X, y, self._draw_samples(X, y))
+
+    def _draw_samples(self, X, y):
+        """Draw the synthetic samples to generate for each targeted class.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        Returns
+        -------
+        samples : list of tuple
+            Each tuple ``(class_sample, parents, neighbors, steps)`` defines
+            the synthetic samples of the class ``class_sample`` generated as
+            ``X[parents] - steps * (X[parents] - X[neighbors])``.
 
         """
         self._validate_estimator()
         random_state = check_random_state(self.random_state)
 
-        X_resampled = X.copy()
-        y_resampled = y.copy()
-
-        for class_sample, n_samples in self.ratio_.items():
-            if n_samples == 0:
-                continue
-            target_class_indices = np.flatnonzero(y == class_sample)
-            X_class = safe_indexing(X, target_class_indices)
-
-            self.nn_.fit(X)
-            _, nn_index = self.nn_.kneighbors(X_class)
-            # The ratio is computed using a one-vs-rest manner. Using majority
-            # in multi-class would lead to slightly different results at the
-            # cost of introducing a new parameter.
-            ratio_nn = (np.sum(y[nn_index[:, 1:]] != class_sample, axis=1) /
-                        (self.nn_.n_neighbors - 1))
+        targeted_classes = [class_sample for class_sample, n_samples
+                            in self.ratio_.items() if n_samples > 0]
+        if not targeted_classes:
+            return []
+
+        # The ratio is computed using a one-vs-rest manner. Using majority
+        # in multi-class would lead to slightly different results at the
+        # cost of introducing a new parameter. The neighbours of the samples
+        # of all targeted classes are found at once.
+        targeted_class_indices = [self._class_index.indices(class_sample)
+                                  for class_sample in targeted_classes]
+        targeted_indices = np.concatenate(targeted_class_indices)
+        nn_index = self._kneighbors(self.nn_, X,
+                                    query_indices=targeted_indices,
+                                    return_distance=False)
+        y_targeted = y[targeted_indices]
+        ratio_nn_targeted = (
+            np.sum(y[nn_index[:, 1:]] != y_targeted[:, np.newaxis], axis=1) /
+            (self.nn_.n_neighbors - 1))
+        # the queries of a class are contiguous
+        class_offsets = np.cumsum([0] + [target_class_indices.size for
+                                         target_class_indices in
+                                         targeted_class_indices])
+
+        n_samples_generate = []
+        for class_sample, start, stop in zip(targeted_classes,
+                                             class_offsets[:-1],
+                                             class_offsets[1:]):
+            ratio_nn = ratio_nn_targeted[start:stop]
             if not np.sum(ratio_nn):
                 raise RuntimeError('Not any neigbours belong to the majority'
                                    ' class. This case will induce a NaN case'
@@ -163,60 +200,31 @@ ADASYN # doctest: +NORMALIZE_WHITESPACE
                                    ' suited for this specific dataset.'
                                    ' Use SMOTE instead.')
             ratio_nn /= np.sum(ratio_nn)
-            n_samples_generate = np.rint(ratio_nn * n_samples).astype(int)
-            if not np.sum(n_samples_generate):
+            n_samples_generate.append(
+                np.rint(ratio_nn * self.ratio_[class_sample]).astype(int))
+            if not np.sum(n_samples_generate[-1]):
                 raise ValueError("No samples will be generated with the"
                                  " provided ratio settings.")
 
-            # the nearest neighbors need to be fitted only on the current class
-            # to find the class NN to generate new samples
-            self.nn_.fit(X_class)
-            _, nn_index = self.nn_.kneighbors(X_class)
-
-            if sparse.issparse(X):
-                row_indices, col_indices, samples = [], [], []
-                n_samples_generated = 0
-                for x_i, x_i_nn, num_sample_i in zip(X_class, nn_index,
-                                                     n_samples_generate):
-                    if num_sample_i == 0:
-                        continue
-                    nn_zs = random_state.randint(
-                        1, high=self.nn_.n_neighbors, size=num_sample_i)
-                    steps = random_state.uniform(size=len(nn_zs))
-                    if x_i.nnz:
-                        for step, nn_z in zip(steps, nn_zs):
-                            sample = (x_i +
-                                      step * (X_class[x_i_nn[nn_z], :] - x_i))
-                            row_indices += ([n_samples_generated] *
-                                            len(sample.indices))
-                            col_indices += sample.indices.tolist()
-                            samples += sample.data.tolist()
-                            n_samples_generated += 1
-                X_new = (sparse.csr_matrix((samples,
-                                            (row_indices, col_indices)),
-                                           [np.sum(n_samples_generate),
-                                            X.shape[1]]))
-                y_new = np.array([class_sample] * np.sum(n_samples_generate))
-            else:
-                x_class_gen = []
-                for x_i, x_i_nn, num_sample_i in zip(X_class, nn_index,
-                                                     n_samples_generate):
-                    if num_sample_i == 0:
-                        continue
-                    nn_zs = random_state.randint(
-                        1, high=self.nn_.n_neighbors, size=num_sample_i)
-                    steps = random_state.uniform(size=len(nn_zs))
-                    x_class_gen.append([x_i +
-                                        step * (X_class[x_i_nn[nn_z], :] - x_i)
-                                        for step, nn_z in zip(steps, nn_zs)])
-
-                X_new = np.concatenate(x_class_gen)
-                y_new = np.array([class_sample] * np.sum(n_samples_generate))
-
-            if sparse.issparse(X_new):
-                X_resampled = sparse.vstack([X_resampled, X_new])
-            else:
-                X_resampled = np.vstack((X_resampled, X_new))
-            y_resampled = np.hstack((y_resampled, y_new))
-
-        return X_resampled, y_resampled
+        # the nearest neighbors need to be fitted only on the current class
+        # to find the class NN to generate new samples
+        nn_index_classes = Parallel(n_jobs=self.n_jobs, backend='threading')(
+            delayed(self._kneighbors)(clone(self.nn_, safe=False), X,
+                                      fit_indices=target_class_indices,
+                                      return_distance=False)
+            for target_class_indices in targeted_class_indices)
+
+        samples = []
+        for class_sample, target_class_indices, nn_index, n_generate in zip(
+                targeted_classes, targeted_class_indices, nn_index_classes,
+                n_samples_generate):
+            # all the samples of the class are drawn at once
+            rows = np.repeat(np.arange(target_class_indices.size), n_generate)
+            cols = random_state.randint(1, high=self.nn_.n_neighbors,
+                                        size=rows.size)
+            steps = random_state.uniform(size=rows.size)
+            samples.append((class_sample, target_class_indices[rows],
+                            target_class_indices[nn_index[rows, cols]],
+                            steps))
+
+        return samples
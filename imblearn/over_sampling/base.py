@@ -5,7 +5,246 @@ Base class for the over-sampling method.
 #          Christos Aridas
 # License: MIT
 
+import numpy as np
+
+from scipy import sparse
+
+from sklearn.utils import check_X_y, gen_batches
+from sklearn.utils.validation import check_is_fitted
+
 from ..base import BaseSampler
+from ..utils._chunk import get_chunk_n_rows
+
+
+def _resampled_dtype(X):
+    """The dtype of the synthetic samples generated from ``X``.
+
+    Floating point data keep their precision while other data are
+    interpolated in double precision.
+    """
+    return X.dtype if X.dtype.kind == 'f' else np.dtype(np.float64)
+
+
+def _interpolate_dense(X, nn_data, parents, neighbors, steps, out=None):
+    """Generate samples along the line joining parents and neighbours.
+
+    The new samples are computed as ``X[parents] - steps * (X[parents] -
+    nn_data[neighbors])`` by chunks of rows such that the temporary arrays
+    fit within the working memory.
+
+    Parameters
+    ----------
+    X : ndarray, shape (n_samples, n_features)
+        Data containing the parent samples.
+
+    nn_data : ndarray, shape (n_samples_all, n_features)
+        Data containing the neighbour samples.
+
+    parents : ndarray, shape (n_samples_new,)
+        Indices in ``X`` of the parent of each new sample.
+
+    neighbors : ndarray, shape (n_samples_new,)
+        Indices in ``nn_data`` of the neighbour of each new sample.
+
+    steps : ndarray, shape (n_samples_new,)
+        Step size used to interpolate each new sample.
+
+    out : ndarray, shape (n_samples_new, n_features) or None, optional
+        Array in which the new samples are written. If ``None``, a new
+        array is allocated.
+
+    Returns
+    -------
+    out : ndarray, shape (n_samples_new, n_features)
+        Synthetically generated samples.
+
+    """
+    n_samples_new = parents.size
+    if X.dtype.kind == 'f':
+        # interpolate in the precision of the input data
+        steps = steps.astype(X.dtype, copy=False)
+    if out is None:
+        out = np.empty((n_samples_new, X.shape[1]), dtype=_resampled_dtype(X))
+    # the parents, the neighbours and their difference are materialized
+    chunk_n_rows = get_chunk_n_rows(row_bytes=3 * X.shape[1] * out.itemsize,
+                                    max_n_rows=n_samples_new)
+    for batch in gen_batches(n_samples_new, chunk_n_rows):
+        X_parents = X[parents[batch]]
+        out[batch] = X_parents - steps[batch, np.newaxis] * (
+            X_parents - nn_data[neighbors[batch]])
+    return out
+
+
+def _check_csr(X):
+    """Convert to CSR with sorted indices and without duplicated entries."""
+    X = X.tocsr()
+    if not X.has_canonical_format:
+        X = X.copy()
+        X.sum_duplicates()
+    return X
+
+
+def _csr_row_positions(X, rows):
+    """Positions in ``X.data`` of the entries of ``X[rows]``."""
+    starts = X.indptr[rows]
+    lengths = X.indptr[rows + 1] - starts
+    offsets = np.cumsum(lengths) - lengths
+    positions = (np.arange(lengths.sum(), dtype=np.int64) +
+                 np.repeat(starts - offsets, lengths))
+    return positions, lengths
+
+
+def _interpolate_csr_chunk(X, nn_data, parents, neighbors, steps):
+    """Interpolate a chunk of samples from the CSR buffers of ``X`` and
+    ``nn_data``.
+
+    Returns the number of non-zero values of each new sample as well as the
+    column indices and the values of these non-zero entries, ordered by
+    sample and by column.
+    """
+    n_samples_new, n_features = parents.size, X.shape[1]
+    parents_pos, parents_nnz = _csr_row_positions(X, parents)
+    neighbors_pos, neighbors_nnz = _csr_row_positions(nn_data, neighbors)
+    samples = np.arange(n_samples_new, dtype=np.int64)
+
+    # the union of the non-zero columns of a parent and its neighbour gives
+    # the potential non-zero columns of the new sample
+    keys = np.concatenate((
+        np.repeat(samples, parents_nnz) * n_features +
+        X.indices[parents_pos],
+        np.repeat(samples, neighbors_nnz) * n_features +
+        nn_data.indices[neighbors_pos]))
+    order = np.argsort(keys, kind='mergesort')
+    keys = keys[order]
+    is_first = np.ones(keys.size, dtype=bool)
+    is_first[1:] = keys[1:] != keys[:-1]
+    group = np.cumsum(is_first) - 1
+    keys = keys[is_first]
+
+    dtype = np.result_type(X.dtype, nn_data.dtype)
+    from_parent = order < parents_pos.size
+    parents_data = np.zeros(keys.size, dtype=dtype)
+    parents_data[group[from_parent]] = X.data[parents_pos][order[from_parent]]
+    neighbors_data = np.zeros(keys.size, dtype=dtype)
+    neighbors_data[group[~from_parent]] = nn_data.data[neighbors_pos][
+        order[~from_parent] - parents_pos.size]
+
+    sample_keys = keys // n_features
+    data = parents_data - steps[sample_keys] * (parents_data - neighbors_data)
+    # similarly to the sparse arithmetic, do not store the zero values
+    nonzero = data != 0
+    nnz = np.bincount(sample_keys[nonzero], minlength=n_samples_new)
+    return nnz, keys[nonzero] % n_features, data[nonzero]
+
+
+def _iter_interpolate_csr(X, nn_data, parents, neighbors, steps):
+    """Yield the CSR buffers of the interpolated sparse samples by chunks.
+
+    ``X`` and ``nn_data`` should be in canonical CSR format. Each chunk is
+    given as a tuple ``(nnz, indices, data)`` where ``nnz`` is the number of
+    non-zero values of each new sample of the chunk.
+    """
+    n_samples_new = parents.size
+    if X.dtype.kind == 'f':
+        # interpolate in the precision of the input data
+        steps = steps.astype(X.dtype, copy=False)
+
+    # each non-zero value requires a couple of keys, positions and values
+    nnz_per_row = (X.nnz / max(X.shape[0], 1) +
+                   nn_data.nnz / max(nn_data.shape[0], 1))
+    chunk_n_rows = get_chunk_n_rows(row_bytes=64 * max(nnz_per_row, 1),
+                                    max_n_rows=n_samples_new)
+    for batch in gen_batches(n_samples_new, chunk_n_rows):
+        yield _interpolate_csr_chunk(X, nn_data, parents[batch],
+                                     neighbors[batch], steps[batch])
+
+
+def _interpolate_sparse(X, nn_data, parents, neighbors, steps):
+    """Generate sparse samples along the line joining parents and neighbours.
+
+    The CSR buffers of the new samples are directly built from the
+    ``indptr``, ``indices`` and ``data`` arrays of the parents and the
+    neighbours, by chunks of rows such that the temporary arrays fit within
+    the working memory.
+
+    Parameters
+    ----------
+    X : sparse matrix, shape (n_samples, n_features)
+        Data containing the parent samples.
+
+    nn_data : sparse matrix, shape (n_samples_all, n_features)
+        Data containing the neighbour samples.
+
+    parents : ndarray, shape (n_samples_new,)
+        Indices in ``X`` of the parent of each new sample.
+
+    neighbors : ndarray, shape (n_samples_new,)
+        Indices in ``nn_data`` of the neighbour of each new sample.
+
+    steps : ndarray, shape (n_samples_new,)
+        Step size used to interpolate each new sample.
+
+    Returns
+    -------
+    X_new : sparse matrix, shape (n_samples_new, n_features)
+        Synthetically generated samples in CSR format.
+
+    """
+    X, nn_data = _check_csr(X), _check_csr(nn_data)
+    nnz, indices, data = [np.zeros(1, dtype=np.intp)], [], []
+    for nnz_batch, indices_batch, data_batch in _iter_interpolate_csr(
+            X, nn_data, parents, neighbors, steps):
+        nnz.append(nnz_batch)
+        indices.append(indices_batch)
+        data.append(data_batch)
+
+    indptr = np.cumsum(np.concatenate(nnz))
+    indices = (np.concatenate(indices) if indices
+               else np.zeros(0, dtype=np.intp))
+    dtype = _resampled_dtype(X)
+    data = (np.concatenate(data).astype(dtype, copy=False) if data
+            else np.zeros(0, dtype=dtype))
+    return sparse.csr_matrix((data, indices, indptr),
+                             shape=(parents.size, X.shape[1]))
+
+
+def _build_csr_resampled(X, samples):
+    """Write the original and the synthetic samples in CSR buffers
+    preallocated with an upper bound of the number of non-zero values."""
+    X = _check_csr(X)
+    n_samples, n_features = X.shape
+    n_samples_new = sum(parents.size for _, parents, _, _ in samples)
+    # a synthetic sample cannot have more non-zero values than its parent
+    # and its neighbour together
+    X_nnz = np.diff(X.indptr)
+    max_nnz = X.nnz + sum(X_nnz[parents].sum() + X_nnz[neighbors].sum()
+                          for _, parents, neighbors, _ in samples)
+    if max(max_nnz, n_features) <= np.iinfo(np.int32).max:
+        index_dtype = np.int32
+    else:
+        index_dtype = np.int64
+
+    indptr = np.empty(n_samples + n_samples_new + 1, dtype=index_dtype)
+    indices = np.empty(max_nnz, dtype=index_dtype)
+    data = np.empty(max_nnz, dtype=_resampled_dtype(X))
+    indptr[:n_samples + 1] = X.indptr
+    indices[:X.nnz] = X.indices
+    data[:X.nnz] = X.data
+
+    row, nnz = n_samples, X.nnz
+    for _, parents, neighbors, steps in samples:
+        for nnz_batch, indices_batch, data_batch in _iter_interpolate_csr(
+                X, X, parents, neighbors, steps):
+            indptr[row + 1:row + 1 + nnz_batch.size] = (
+                nnz + np.cumsum(nnz_batch))
+            indices[nnz:nnz + indices_batch.size] = indices_batch
+            data[nnz:nnz + data_batch.size] = data_batch
+            row += nnz_batch.size
+            nnz += data_batch.size
+
+    return sparse.csr_matrix((data[:nnz], indices[:nnz], indptr),
+                             shape=(n_samples + n_samples_new,
+                                    n_features))
 
 
 class BaseOverSampler(BaseSampler):
@@ -16,3 +255,160 @@ class BaseOverSampler(BaseSampler):
     """
 
     _sampling_type = 'over-sampling'
+
+    def iter_sample(self, X, y, batch_size=1000):
+        """Resample the dataset and yield the resampled data by batches.
+
+        The original samples are yielded first followed by the synthetic
+        samples. Only a batch of synthetic samples is materialized at once.
+        Stacking the batches gives the same data than :func:`sample` for a
+        given ``random_state``.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        batch_size : int, optional (default=1000)
+            The number of samples in each batch. The last batch can contain
+            fewer samples.
+
+        Returns
+        -------
+        batches : generator of tuple
+            Generator yielding the tuples ``(X_batch, y_batch)`` which
+            stacked together correspond to ``(X_resampled, y_resampled)``.
+
+        """
+        # Check the consistency of X and y
+        X, y = check_X_y(X, y, accept_sparse=['csr', 'csc'])
+
+        check_is_fitted(self, 'ratio_')
+        self._check_X_y(X, y)
+
+        return self._iter_sample(X, y, batch_size)
+
+    def fit_sample_batches(self, X, y, batch_size=1000):
+        """Fit the statistics and yield the resampled data by batches.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        batch_size : int, optional (default=1000)
+            The number of samples in each batch. The last batch can contain
+            fewer samples.
+
+        Returns
+        -------
+        batches : generator of tuple
+            Generator yielding the tuples ``(X_batch, y_batch)`` which
+            stacked together correspond to ``(X_resampled, y_resampled)``.
+
+        """
+        return self.fit(X, y).iter_sample(X, y, batch_size=batch_size)
+
+    def _iter_sample(self, X, y, batch_size):
+        """Yield the resampled data by batches."""
+        samples = self._draw_samples(X, y)
+        n_samples = X.shape[0]
+        n_samples_new = sum(parents.size for _, parents, _, _ in samples)
+        if sparse.issparse(X) and n_samples_new:
+            X = _check_csr(X)
+        dtype = _resampled_dtype(X) if n_samples_new else X.dtype
+
+        if samples:
+            parents, neighbors, steps = [
+                np.concatenate([sample[i] for sample in samples])
+                for i in range(1, 4)]
+            y_new = np.repeat(
+                np.array([sample[0] for sample in samples], dtype=y.dtype),
+                [sample[1].size for sample in samples])
+
+        for batch in gen_batches(n_samples + n_samples_new, batch_size):
+            original = slice(min(batch.start, n_samples),
+                             min(batch.stop, n_samples))
+            synthetic = slice(max(batch.start - n_samples, 0),
+                              max(batch.stop - n_samples, 0))
+            if synthetic.stop == 0:
+                X_batch = X[original].astype(dtype)
+                y_batch = y[original].copy()
+            elif sparse.issparse(X):
+                X_batch = sparse.vstack(
+                    [X[original].astype(dtype),
+                     _interpolate_sparse(X, X, parents[synthetic],
+                                         neighbors[synthetic],
+                                         steps[synthetic])], format='csr')
+                y_batch = np.concatenate((y[original], y_new[synthetic]))
+            else:
+                X_batch = np.empty((batch.stop - batch.start, X.shape[1]),
+                                   dtype=dtype)
+                n_original = original.stop - original.start
+                X_batch[:n_original] = X[original]
+                _interpolate_dense(X, X, parents[synthetic],
+                                   neighbors[synthetic], steps[synthetic],
+                                   out=X_batch[n_original:])
+                y_batch = np.concatenate((y[original], y_new[synthetic]))
+            yield X_batch, y_batch
+
+    def _build_resampled(self, X, y, samples):
+        """Materialize the original and the synthetic samples at once.
+
+        The size of the output is computed before to generate the synthetic
+        samples such that a single output is allocated and each synthetic
+        sample is directly written in place.
+
+        Parameters
+        ----------
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the original samples.
+
+        y : ndarray, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        samples : list of tuple
+            Each tuple ``(class_sample, parents, neighbors, steps)`` defines
+            the synthetic samples of the class ``class_sample`` generated as
+            ``X[parents] - steps * (X[parents] - X[neighbors])``.
+
+        Returns
+        -------
+        X_resampled : {ndarray, sparse matrix}, shape \
+(n_samples_new, n_features)
+            The array containing the resampled data.
+
+        y_resampled : ndarray, shape (n_samples_new,)
+            The corresponding label of `X_resampled`
+
+        """
+        n_samples = X.shape[0]
+        n_samples_new = sum(parents.size for _, parents, _, _ in samples)
+        if not n_samples_new:
+            return X.copy(), y.copy()
+
+        y_resampled = np.empty(n_samples + n_samples_new, dtype=y.dtype)
+        y_resampled[:n_samples] = y
+        start = n_samples
+        for class_sample, parents, _, _ in samples:
+            y_resampled[start:start + parents.size] = class_sample
+            start += parents.size
+
+        if sparse.issparse(X):
+            return _build_csr_resampled(X, samples), y_resampled
+
+        X_resampled = np.empty((n_samples + n_samples_new, X.shape[1]),
+                               dtype=_resampled_dtype(X))
+        X_resampled[:n_samples] = X
+        start = n_samples
+        for _, parents, neighbors, steps in samples:
+            _interpolate_dense(X, X, parents, neighbors, steps,
+                               out=X_resampled[start:start + parents.size])
+            start += parents.size
+        return X_resampled, y_resampled
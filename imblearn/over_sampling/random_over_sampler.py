@@ -5,10 +5,8 @@
 # License: MIT
 from __future__ import division
 
-from collections import Counter
-
 import numpy as np
-from sklearn.utils import check_random_state, safe_indexing
+from sklearn.utils import check_random_state, gen_batches, safe_indexing
 
 from .base import BaseOverSampler
 
@@ -46,6 +44,13 @@ class RandomOverSampler(BaseOverSampler):
         number generator; If ``None``, the random number generator is the
         ``RandomState`` instance used by ``np.random``.
 
+    return_weights : bool, optional (default=False)
+        Whether or not to return the original data with the number of times
+        each sample is drawn instead of the resampled data. The sample weights
+        reproduce the resampled data without copying the samples and can be
+        given as ``sample_weight`` to the ``fit`` method of most estimators.
+        The batches yielded by :func:`iter_sample` are not affected.
+
     Notes
     -----
     Supports mutli-class resampling by sampling each class independently.
@@ -72,12 +77,21 @@ RandomOverSampler # doctest: +NORMALIZE_WHITESPACE
     >>> X_res, y_res = ros.fit_sample(X, y)
     >>> print('Resampled dataset shape {}'.format(Counter(y_res)))
     Resampled dataset shape Counter({0: 900, 1: 900})
+    >>> import numpy as np
+    >>> ros = RandomOverSampler(random_state=42, return_weights=True)
+    >>> X_res, y_res, sample_weight = ros.fit_sample(X, y)
+    >>> X_res.shape
+    (1000, 20)
+    >>> print('Weighted dataset shape {}'.format(
+    ...     Counter(np.repeat(y_res, sample_weight))))
+    Weighted dataset shape Counter({0: 900, 1: 900})
 
     """
 
-    def __init__(self, ratio='auto', random_state=None):
+    def __init__(self, ratio='auto', random_state=None, return_weights=False):
         super(RandomOverSampler, self).__init__(ratio=ratio)
         self.random_state = random_state
+        self.return_weights = return_weights
 
     def _sample(self, X, y):
         """Resample the dataset.
@@ -99,19 +113,38 @@ RandomOverSampler # doctest: +NORMALIZE_WHITESPACE
         y_resampled : ndarray, shape (n_samples_new,)
             The corresponding label of `X_resampled`
 
+        sample_weight : ndarray, shape (n_samples,)
+            If `return_weights` is `True`, ``X`` and ``y`` are returned
+            unchanged in place of the resampled data together with the number
+            of times each sample is drawn.
+
         """
+        sample_indices = self._sample_indices(y)
+
+        if self.return_weights:
+            return X, y, np.bincount(sample_indices, minlength=y.shape[0])
+        return (safe_indexing(X, sample_indices),
+                safe_indexing(y, sample_indices))
+
+    def _iter_sample(self, X, y, batch_size):
+        """Yield the resampled data by batches."""
+        sample_indices = self._sample_indices(y)
+        for batch in gen_batches(sample_indices.size, batch_size):
+            yield (safe_indexing(X, sample_indices[batch]),
+                   safe_indexing(y, sample_indices[batch]))
+
+    def _sample_indices(self, y):
+        """Draw the indices of the samples composing the resampled data."""
         random_state = check_random_state(self.random_state)
-        target_stats = Counter(y)
+        class_index = self._class_index
 
-        sample_indices = range(X.shape[0])
+        sample_indices = [np.arange(y.shape[0])]
 
         for class_sample, num_samples in self.ratio_.items():
-            target_class_indices = np.flatnonzero(y == class_sample)
+            target_class_indices = class_index.indices(class_sample)
             indices = random_state.randint(
-                low=0, high=target_stats[class_sample], size=num_samples)
+                low=0, high=target_class_indices.size, size=num_samples)
 
-            sample_indices = np.append(sample_indices,
-                                       target_class_indices[indices])
+            sample_indices.append(target_class_indices[indices])
 
-        return (safe_indexing(X, sample_indices),
-                safe_indexing(y, sample_indices))
+        return np.concatenate(sample_indices)
@@ -12,16 +12,17 @@ import numpy as np
 from scipy import sparse
 
 from sklearn.svm import SVC
-from sklearn.utils import check_random_state, safe_indexing
+from sklearn.utils import check_random_state
 
-from .base import BaseOverSampler
+from .base import BaseOverSampler, _interpolate_dense, _interpolate_sparse
+from ..base import NeighborsGraphMixin
 from ..exceptions import raise_isinstance_error
 from ..utils import check_neighbors_object
 
 SMOTE_KIND = ('regular', 'borderline1', 'borderline2', 'svm')
 
 
-class SMOTE(BaseOverSampler):
+class SMOTE(NeighborsGraphMixin, BaseOverSampler):
     """Class to perform over-sampling using SMOTE.
 
     This object is an implementation of SMOTE - Synthetic Minority
@@ -77,7 +78,13 @@ class SMOTE(BaseOverSampler):
 
     svm_estimator : object, optional (default=SVC())
         If ``kind='svm'``, a parametrized :class:`sklearn.svm.SVC`
-        classifier can be passed.
+        classifier can be passed. Any other classifier exposing a
+        ``decision_function`` can be used instead, e.g.
+        :class:`sklearn.svm.LinearSVC`,
+        :class:`sklearn.linear_model.SGDClassifier` or a pipeline combining
+        :class:`sklearn.kernel_approximation.Nystroem` with a linear model,
+        which scale to large datasets. In this case, the samples lying within
+        the margin of the decision function are used as support vectors.
 
     n_jobs : int, optional (default=1)
         The number of threads to open if possible.
@@ -152,16 +159,18 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
         self.svm_estimator = svm_estimator
         self.n_jobs = n_jobs
 
-    def _in_danger_noise(self, samples, target_class, y, kind='danger'):
+    def _in_danger_noise(self, nns, target_class, y, kind='danger'):
         """Estimate if a set of sample are in danger or noise.
 
         Parameters
         ----------
-        samples : {array-like, sparse matrix}, shape (n_samples, n_features)
-            The samples to check if either they are in danger or not.
+        nns : ndarray, shape (n_samples, m_neighbors)
+            The indices of the ``m_neighbors`` nearest neighbours of the
+            samples to check if either they are in danger or not.
 
-        target_class : int or str,
-            The target corresponding class being over-sampled.
+        target_class : int, str or ndarray, shape (n_samples,)
+            The target corresponding class being over-sampled. An array can
+            be given to check samples of several classes at once.
 
         y : array-like, shape (n_samples,)
             The true label in order to check the neighbour labels.
@@ -178,8 +187,7 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
             A boolean array where True refer to samples in danger or noise.
 
         """
-        x = self.nn_m_.kneighbors(samples, return_distance=False)[:, 1:]
-        nn_label = (y[x] != target_class).astype(int)
+        nn_label = (y[nns] != np.reshape(target_class, (-1, 1))).astype(int)
         n_maj = np.sum(nn_label, axis=1)
 
         if kind == 'danger':
@@ -233,6 +241,44 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
         y_new : ndarray, shape (n_samples_new,)
             Target values for synthetic samples.
 
+        """
+        rows, neighbors, steps = self._draw_interpolation(nn_num, n_samples,
+                                                          step_size)
+        if sparse.issparse(X):
+            X_new = _interpolate_sparse(X, nn_data, rows, neighbors, steps)
+        else:
+            X_new = _interpolate_dense(X, nn_data, rows, neighbors, steps)
+        y_new = np.array([y_type] * len(rows))
+
+        return X_new, y_new
+
+    def _draw_interpolation(self, nn_num, n_samples, step_size=1.):
+        """Draw randomly the parents, neighbours and steps used to construct
+        artificial samples.
+
+        Parameters
+        ----------
+        nn_num : ndarray, shape (n_samples_all, k_nearest_neighbours)
+            The nearest neighbours of each parent candidate.
+
+        n_samples : int
+            The number of samples to generate.
+
+        step_size : float, optional (default=1.)
+            The step size to create samples.
+
+        Returns
+        -------
+        rows : ndarray, shape (n_samples,)
+            The index of the parent of each new sample in ``nn_num``.
+
+        neighbors : ndarray, shape (n_samples,)
+            The index of the neighbour of each new sample, taken from
+            ``nn_num``.
+
+        steps : ndarray, shape (n_samples,)
+            The step of each new sample.
+
         """
         random_state = check_random_state(self.random_state)
         samples_indices = random_state.randint(
@@ -241,28 +287,7 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
         rows = np.floor_divide(samples_indices, nn_num.shape[1])
         cols = np.mod(samples_indices, nn_num.shape[1])
 
-        if sparse.issparse(X):
-            row_indices, col_indices, samples = [], [], []
-            for i, (row, col, step) in enumerate(zip(rows, cols, steps)):
-                if X[row].nnz:
-                    sample = X[row] - step * (X[row] -
-                                              nn_data[nn_num[row, col]])
-                    row_indices += [i] * len(sample.indices)
-                    col_indices += sample.indices.tolist()
-                    samples += sample.data.tolist()
-        else:
-            X_new = np.zeros((n_samples, X.shape[1]))
-            for i, (row, col, step) in enumerate(zip(rows, cols, steps)):
-                X_new[i] = X[row] - step * (X[row] - nn_data[nn_num[row, col]])
-
-        y_new = np.array([y_type] * len(samples_indices))
-
-        if sparse.issparse(X):
-            return (sparse.csr_matrix((samples, (row_indices, col_indices)),
-                                      [len(samples_indices), X.shape[1]]),
-                    y_new)
-        else:
-            return X_new, y_new
+        return rows, nn_num[rows, cols], steps
 
     def _validate_estimator(self):
         """Create the necessary objects for SMOTE."""
@@ -286,14 +311,48 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
         if self.kind == 'svm':
             if self.svm_estimator is None:
                 self.svm_estimator_ = SVC(random_state=self.random_state)
-            elif isinstance(self.svm_estimator, SVC):
+            elif (isinstance(self.svm_estimator, SVC) or
+                  hasattr(self.svm_estimator, 'decision_function')):
                 self.svm_estimator_ = self.svm_estimator
             else:
                 raise_isinstance_error('svm_estimator', [SVC],
                                        self.svm_estimator)
 
+    def _support_index(self, X, y):
+        """Find the samples lying on the boundary found by the SVM.
+
+        For :class:`sklearn.svm.SVC`, the support vectors are used. For other
+        classifiers, the samples lying within the margin of the one-vs-rest
+        decision function of their own class are used.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix on which the SVM has been fitted.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        Returns
+        -------
+        support_index : ndarray, shape (n_support,)
+            The indices of the samples defining the boundary.
+
+        """
+        if hasattr(self.svm_estimator_, 'support_'):
+            return self.svm_estimator_.support_
+
+        decision = self.svm_estimator_.decision_function(X)
+        classes = self.svm_estimator_.classes_
+        if decision.ndim == 1:
+            # with binary problem, only the second class decision is given
+            margin = np.where(y == classes[1], decision, -decision)
+        else:
+            margin = decision[np.arange(y.size), np.searchsorted(classes, y)]
+        return np.flatnonzero(margin <= 1)
+
     def _sample_regular(self, X, y):
-        """Resample the dataset using the regular SMOTE implementation.
+        """Draw the samples using the regular SMOTE implementation.
 
         Use the regular SMOTE algorithm proposed in [1]_.
 
@@ -307,12 +366,10 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
+        samples : list of tuple
+            Each tuple ``(class_sample, parents, neighbors, steps)`` defines
+            the synthetic samples of the class ``class_sample`` generated as
+            ``X[parents] - steps * (X[parents] - X[neighbors])``.
 
         References
         ----------
@@ -322,30 +379,23 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
 
         """
 
-        X_resampled = X.copy()
-        y_resampled = y.copy()
-
+        samples = []
         for class_sample, n_samples in self.ratio_.items():
             if n_samples == 0:
                 continue
-            target_class_indices = np.flatnonzero(y == class_sample)
-            X_class = safe_indexing(X, target_class_indices)
-
-            self.nn_k_.fit(X_class)
-            nns = self.nn_k_.kneighbors(X_class, return_distance=False)[:, 1:]
-            X_new, y_new = self._make_samples(X_class, class_sample, X_class,
-                                              nns, n_samples, 1.0)
-
-            if sparse.issparse(X_new):
-                X_resampled = sparse.vstack([X_resampled, X_new])
-            else:
-                X_resampled = np.vstack((X_resampled, X_new))
-            y_resampled = np.hstack((y_resampled, y_new))
+            target_class_indices = self._class_index.indices(class_sample)
+            nns = self._kneighbors(self.nn_k_, X,
+                                   fit_indices=target_class_indices,
+                                   return_distance=False)[:, 1:]
+            rows, neighbors, steps = self._draw_interpolation(nns, n_samples,
+                                                              1.0)
+            samples.append((class_sample, target_class_indices[rows],
+                            target_class_indices[neighbors], steps))
 
-        return X_resampled, y_resampled
+        return samples
 
     def _sample_borderline(self, X, y):
-        """Resample the dataset using the borderline SMOTE implementation.
+        """Draw the samples using the borderline SMOTE implementation.
 
         Use the borderline SMOTE algorithm proposed in [2]_. Two methods can be
         used: (i) borderline-1 or (ii) borderline-2. A nearest-neighbours
@@ -362,12 +412,10 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
+        samples : list of tuple
+            Each tuple ``(class_sample, parents, neighbors, steps)`` defines
+            the synthetic samples of the class ``class_sample`` generated as
+            ``X[parents] - steps * (X[parents] - X[neighbors])``.
 
         References
         ----------
@@ -376,70 +424,63 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
            intelligent computing, 878-887, 2005.
 
         """
-        X_resampled = X.copy()
-        y_resampled = y.copy()
-
+        # the samples in danger of all targeted classes are found at once
+        targeted_indices = np.flatnonzero(np.in1d(
+            y, [class_sample for class_sample, n_samples in self.ratio_.items()
+                if n_samples > 0]))
+        in_danger = np.zeros(y.shape, dtype=bool)
+        nns = self._kneighbors(self.nn_m_, X, query_indices=targeted_indices,
+                               return_distance=False)[:, 1:]
+        in_danger[targeted_indices] = self._in_danger_noise(
+            nns, y[targeted_indices], y, kind='danger')
+
+        samples = []
         for class_sample, n_samples in self.ratio_.items():
             if n_samples == 0:
                 continue
-            target_class_indices = np.flatnonzero(y == class_sample)
-            X_class = safe_indexing(X, target_class_indices)
+            target_class_indices = self._class_index.indices(class_sample)
 
-            self.nn_m_.fit(X)
-            danger_index = self._in_danger_noise(X_class, class_sample, y,
-                                                 kind='danger')
-            if not any(danger_index):
+            danger_index = np.flatnonzero(in_danger[target_class_indices])
+            if not danger_index.size:
                 continue
 
-            self.nn_k_.fit(X_class)
-            nns = self.nn_k_.kneighbors(
-                safe_indexing(X_class, danger_index),
-                return_distance=False)[:, 1:]
+            danger_indices = target_class_indices[danger_index]
+            nns = self._kneighbors(self.nn_k_, X,
+                                   fit_indices=target_class_indices,
+                                   query_indices=danger_indices,
+                                   return_distance=False)[:, 1:]
 
             # divergence between borderline-1 and borderline-2
             if self.kind == 'borderline1':
                 # Create synthetic samples for borderline points.
-                X_new, y_new = self._make_samples(safe_indexing(X_class,
-                                                                danger_index),
-                                                  class_sample, X_class,
-                                                  nns, n_samples)
-                if sparse.issparse(X_new):
-                    X_resampled = sparse.vstack([X_resampled, X_new])
-                else:
-                    X_resampled = np.vstack((X_resampled, X_new))
-                y_resampled = np.hstack((y_resampled, y_new))
+                rows, neighbors, steps = self._draw_interpolation(nns,
+                                                                  n_samples)
+                samples.append((class_sample, danger_indices[rows],
+                                target_class_indices[neighbors], steps))
 
             else:
                 random_state = check_random_state(self.random_state)
                 fractions = random_state.beta(10, 10)
 
                 # only minority
-                X_new_1, y_new_1 = self._make_samples(
-                    safe_indexing(X_class, danger_index), class_sample,
-                    X_class, nns,
-                    int(fractions * (n_samples + 1)), step_size=1.)
+                rows, neighbors, steps = self._draw_interpolation(
+                    nns, int(fractions * (n_samples + 1)), step_size=1.)
+                samples.append((class_sample, danger_indices[rows],
+                                target_class_indices[neighbors], steps))
 
                 # we use a one-vs-rest policy to handle the multiclass in which
                 # new samples will be created considering not only the majority
                 # class but all over classes.
-                X_new_2, y_new_2 = self._make_samples(
-                    safe_indexing(X_class, danger_index), class_sample,
-                    safe_indexing(X, np.flatnonzero(y != class_sample)),
+                rows, neighbors, steps = self._draw_interpolation(
                     nns, int((1 - fractions) * n_samples), step_size=0.5)
+                samples.append((class_sample, danger_indices[rows],
+                                np.flatnonzero(y != class_sample)[neighbors],
+                                steps))
 
-                if sparse.issparse(X_resampled):
-                    X_resampled = sparse.vstack([X_resampled,
-                                                 X_new_1, X_new_2])
-                else:
-                    X_resampled = np.vstack((X_resampled,
-                                             X_new_1, X_new_2))
-                y_resampled = np.hstack((y_resampled,
-                                         y_new_1, y_new_2))
-
-        return X_resampled, y_resampled
+        return samples
 
     def _sample_svm(self, X, y):
-        """Resample the dataset using the SVM SMOTE implementation.
+        """Draw the samples using the SVM SMOTE implementation.
 
         Use the SVM SMOTE algorithm proposed in [3]_. A SVM classifier detect
         support vectors to get a notion of the boundary.
@@ -454,12 +495,10 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
+        samples : list of tuple
+            Each tuple ``(class_sample, parents, neighbors, steps)`` defines
+            the synthetic samples of the class ``class_sample`` generated as
+            ``X[parents] - steps * (X[parents] - X[neighbors])``.
 
         References
         ----------
@@ -469,78 +508,66 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
 
         """
         random_state = check_random_state(self.random_state)
-        X_resampled = X.copy()
-        y_resampled = y.copy()
 
+        # the SVM and the m-neighbours are fitted once and the support vectors
+        # of all targeted classes are checked at once
+        self.svm_estimator_.fit(X, y)
+        support_index = self._support_index(X, y)
+        support_index = support_index[np.in1d(
+            y[support_index],
+            [class_sample for class_sample, n_samples in self.ratio_.items()
+             if n_samples > 0])]
+        if support_index.size:
+            nns = self._kneighbors(self.nn_m_, X, query_indices=support_index,
+                                   return_distance=False)[:, 1:]
+            noise_bool = self._in_danger_noise(nns, y[support_index], y,
+                                               kind='noise')
+            support_index = support_index[np.logical_not(noise_bool)]
+            nns = nns[np.logical_not(noise_bool)]
+            in_danger = self._in_danger_noise(nns, y[support_index], y,
+                                              kind='danger')
+        else:
+            in_danger = np.zeros(0, dtype=bool)
+
+        samples = []
         for class_sample, n_samples in self.ratio_.items():
             if n_samples == 0:
                 continue
-            target_class_indices = np.flatnonzero(y == class_sample)
-            X_class = safe_indexing(X, target_class_indices)
-
-            self.svm_estimator_.fit(X, y)
-            support_index = self.svm_estimator_.support_[
-                y[self.svm_estimator_.support_] == class_sample]
-            support_vector = safe_indexing(X, support_index)
+            target_class_indices = self._class_index.indices(class_sample)
 
-            self.nn_m_.fit(X)
-            noise_bool = self._in_danger_noise(support_vector, class_sample, y,
-                                               kind='noise')
-            support_vector = safe_indexing(
-                support_vector,
-                np.flatnonzero(np.logical_not(noise_bool)))
-            danger_bool = self._in_danger_noise(support_vector, class_sample,
-                                                y, kind='danger')
+            support_class = y[support_index] == class_sample
+            support_class_index = support_index[support_class]
+            danger_bool = in_danger[support_class]
             safety_bool = np.logical_not(danger_bool)
 
-            self.nn_k_.fit(X_class)
             fractions = random_state.beta(10, 10)
+            if support_class_index.size:
+                # the support vectors of the class are queried at once
+                nns_support = self._kneighbors(
+                    self.nn_k_, X, fit_indices=target_class_indices,
+                    query_indices=support_class_index,
+                    return_distance=False)[:, 1:]
+
             if np.count_nonzero(danger_bool) > 0:
-                nns = self.nn_k_.kneighbors(safe_indexing(
-                    support_vector,
-                    np.flatnonzero(danger_bool)),
-                                            return_distance=False)[:, 1:]
-
-                X_new_1, y_new_1 = self._make_samples(
-                    safe_indexing(support_vector, np.flatnonzero(danger_bool)),
-                    class_sample, X_class,
+                nns = nns_support[danger_bool]
+
+                rows, neighbors, steps = self._draw_interpolation(
                     nns, int(fractions * (n_samples + 1)), step_size=1.)
+                samples.append((class_sample,
+                                support_class_index[danger_bool][rows],
+                                target_class_indices[neighbors], steps))
 
             if np.count_nonzero(safety_bool) > 0:
-                nns = self.nn_k_.kneighbors(
-                    safe_indexing(support_vector, np.flatnonzero(safety_bool)),
-                    return_distance=False)[:, 1:]
+                nns = nns_support[safety_bool]
 
-                X_new_2, y_new_2 = self._make_samples(
-                    safe_indexing(support_vector, np.flatnonzero(safety_bool)),
-                    class_sample, X_class,
+                rows, neighbors, steps = self._draw_interpolation(
                     nns, int((1 - fractions) * n_samples),
                     step_size=-self.out_step)
+                samples.append((class_sample,
+                                support_class_index[safety_bool][rows],
+                                target_class_indices[neighbors], steps))
 
-            if (np.count_nonzero(danger_bool) > 0 and
-                    np.count_nonzero(safety_bool) > 0):
-                if sparse.issparse(X_resampled):
-                    X_resampled = sparse.vstack([X_resampled,
-                                                 X_new_1, X_new_2])
-                else:
-                    X_resampled = np.vstack((X_resampled,
-                                             X_new_1, X_new_2))
-                y_resampled = np.concatenate((y_resampled, y_new_1, y_new_2),
-                                             axis=0)
-            elif np.count_nonzero(danger_bool) == 0:
-                if sparse.issparse(X_resampled):
-                    X_resampled = sparse.vstack([X_resampled,  X_new_2])
-                else:
-                    X_resampled = np.vstack((X_resampled, X_new_2))
-                y_resampled = np.concatenate((y_resampled, y_new_2), axis=0)
-            elif np.count_nonzero(safety_bool) == 0:
-                if sparse.issparse(X_resampled):
-                    X_resampled = sparse.vstack([X_resampled, X_new_1])
-                else:
-                    X_resampled = np.vstack((X_resampled, X_new_1))
-                y_resampled = np.concatenate((y_resampled, y_new_1), axis=0)
-
-        return X_resampled, y_resampled
+        return samples
 
     def _sample(self, X, y):
         """Resample the dataset.
@@ -562,6 +589,27 @@ SMOTE # doctest: +NORMALIZE_WHITESPACE
         y_resampled : ndarray, shape (n_samples_new,)
             The corresponding label of `X_resampled`
 
+        """
+        return self._build_resampled(X, y, self._draw_samples(X, y))
+
+    def _draw_samples(self, X, y):
+        """Draw the synthetic samples to generate for each targeted class.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        Returns
+        -------
+        samples : list of tuple
+            Each tuple ``(class_sample, parents, neighbors, steps)`` defines
+            the synthetic samples of the class ``class_sample`` generated as
+            ``X[parents] - steps * (X[parents] - X[neighbors])``.
+
         """
         self._validate_estimator()
 
@@ -64,10 +64,10 @@ def test_ada_fit_sample():
                      [-0.41635887, -0.38299653],
                      [0.08711622, 0.93259929],
                      [1.70580611, -0.11219234],
-                     [0.94899098, -0.30508981],
-                     [0.28204936, -0.13953426],
-                     [1.58028868, -0.04089947],
-                     [0.66117333, -0.28009063]])
+                     [0.88161986, -0.2829741],
+                     [0.35681689, -0.18814597],
+                     [1.4148276, 0.05308106],
+                     [0.3136591, -0.31327875]])
     y_gt = np.array([
         0, 1, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0
     ])
@@ -106,10 +106,10 @@ def test_ada_fit_sample_nn_obj():
                      [-0.41635887, -0.38299653],
                      [0.08711622, 0.93259929],
                      [1.70580611, -0.11219234],
-                     [0.94899098, -0.30508981],
-                     [0.28204936, -0.13953426],
-                     [1.58028868, -0.04089947],
-                     [0.66117333, -0.28009063]])
+                     [0.88161986, -0.2829741],
+                     [0.35681689, -0.18814597],
+                     [1.4148276, 0.05308106],
+                     [0.3136591, -0.31327875]])
     y_gt = np.array([
         0, 1, 0, 0, 0, 1, 1, 1, 1, 1, 1, 0, 0, 1, 1, 1, 1, 0, 1, 0, 0, 0, 0, 0
     ])
@@ -122,3 +122,37 @@ def test_ada_wrong_nn_obj():
     ada = ADASYN(random_state=RND_SEED, n_neighbors=nn)
     with raises(ValueError, match="has to be one of"):
         ada.fit_sample(X, Y)
+
+
+class _RecordingNearestNeighbors(NearestNeighbors):
+    n_samples_fit = []
+
+    def fit(self, X, y=None):
+        _RecordingNearestNeighbors.n_samples_fit.append(X.shape[0])
+        return super(_RecordingNearestNeighbors, self).fit(X, y)
+
+
+def test_ada_full_index_fitted_once():
+    y = np.array([0, 1, 2, 0, 2, 1, 1, 1, 1, 1, 1, 0, 2, 1, 1, 1, 1, 0, 1, 2])
+    _RecordingNearestNeighbors.n_samples_fit = []
+    ada = ADASYN(random_state=RND_SEED,
+                 n_neighbors=_RecordingNearestNeighbors(n_neighbors=3))
+    ada.fit_sample(X, y)
+    # a single index on the full data set and one index per targeted class
+    assert sorted(_RecordingNearestNeighbors.n_samples_fit) == [4, 4, 20]
+
+    _RecordingNearestNeighbors.n_samples_fit = []
+    ada = ADASYN(ratio={0: 8}, random_state=RND_SEED,
+                 n_neighbors=_RecordingNearestNeighbors(n_neighbors=3))
+    ada.fit_sample(X, y)
+    assert sorted(_RecordingNearestNeighbors.n_samples_fit) == [4, 20]
+
+
+def test_ada_n_jobs():
+    y = np.array([0, 1, 2, 0, 2, 1, 1, 1, 1, 1, 1, 0, 2, 1, 1, 1, 1, 0, 1, 2])
+    X_res, y_res = ADASYN(n_neighbors=3,
+                          random_state=RND_SEED).fit_sample(X, y)
+    X_res_par, y_res_par = ADASYN(n_neighbors=3, random_state=RND_SEED,
+                                  n_jobs=2).fit_sample(X, y)
+    assert_allclose(X_res_par, X_res)
+    assert_array_equal(y_res_par, y_res)
@@ -78,3 +78,20 @@ def test_multiclass_fit_sample():
     assert count_y_res[0] == 5
     assert count_y_res[1] == 5
     assert count_y_res[2] == 5
+
+
+def test_ros_return_weights():
+    ros = RandomOverSampler(random_state=RND_SEED)
+    X_resampled, y_resampled = ros.fit_sample(X, Y)
+    ros = RandomOverSampler(random_state=RND_SEED, return_weights=True)
+    X_weighted, y_weighted, sample_weight = ros.fit_sample(X, Y)
+    assert X_weighted is X
+    assert_array_equal(y_weighted, Y)
+    assert sample_weight.dtype.kind == 'i'
+    # the weights reproduce the resampled data
+    assert sample_weight.sum() == y_resampled.size
+    X_repeated = np.repeat(X, sample_weight, axis=0)
+    assert_array_equal(X_repeated[np.lexsort(X_repeated.T)],
+                       X_resampled[np.lexsort(X_resampled.T)])
+    assert_array_equal(np.sort(np.repeat(Y, sample_weight)),
+                       np.sort(y_resampled))
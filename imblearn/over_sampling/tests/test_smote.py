@@ -7,10 +7,14 @@ from __future__ import print_function
 
 import numpy as np
 from pytest import raises
+from scipy import sparse
 
 from sklearn.utils.testing import assert_allclose, assert_array_equal
+from sklearn.kernel_approximation import Nystroem
+from sklearn.linear_model import SGDClassifier
 from sklearn.neighbors import NearestNeighbors
-from sklearn.svm import SVC
+from sklearn.pipeline import make_pipeline
+from sklearn.svm import SVC, LinearSVC
 
 from imblearn.over_sampling import SMOTE
 
@@ -254,3 +258,135 @@ def test_sample_regular_wrong_svm():
 
     with raises(ValueError, match="has to be one of"):
         smote.fit_sample(X, Y)
+
+
+def test_make_samples_dense_chunked(monkeypatch):
+    # generating the samples by chunks should give the same samples than
+    # interpolating them one at a time
+    monkeypatch.setattr('imblearn.utils._chunk.WORKING_MEMORY', 1e-4)
+    smote = SMOTE(random_state=RND_SEED)
+    nn_num = NearestNeighbors(n_neighbors=6).fit(X).kneighbors(
+        X, return_distance=False)[:, 1:]
+    X_new, y_new = smote._make_samples(X, 0, X, nn_num, 50, step_size=0.5)
+
+    random_state = np.random.RandomState(RND_SEED)
+    samples_indices = random_state.randint(low=0, high=nn_num.size, size=50)
+    steps = 0.5 * random_state.uniform(size=50)
+    rows = samples_indices // nn_num.shape[1]
+    cols = samples_indices % nn_num.shape[1]
+    X_gt = np.array([X[row] - step * (X[row] - X[nn_num[row, col]])
+                     for row, col, step in zip(rows, cols, steps)])
+    assert_array_equal(X_new, X_gt)
+    assert_array_equal(y_new, np.zeros(50, dtype=int))
+
+
+def test_make_samples_sparse_chunked(monkeypatch):
+    # the sparse samples should be identical to the dense ones, even when a
+    # parent does not contain any non-zero value
+    monkeypatch.setattr('imblearn.utils._chunk.WORKING_MEMORY', 1e-4)
+    X_zeros = X.copy()
+    X_zeros[X_zeros < 0] = 0
+    X_zeros[3] = 0
+    smote = SMOTE(random_state=RND_SEED)
+    nn_num = NearestNeighbors(n_neighbors=6).fit(X_zeros).kneighbors(
+        X_zeros, return_distance=False)[:, 1:]
+    X_dense, y_dense = smote._make_samples(X_zeros, 0, X_zeros, nn_num, 50)
+    for sparse_format in ('csr', 'csc'):
+        X_sparse = sparse.csr_matrix(X_zeros).asformat(sparse_format)
+        X_new, y_new = smote._make_samples(X_sparse, 0, X_sparse, nn_num, 50)
+        assert sparse.isspmatrix_csr(X_new)
+        assert_array_equal(X_new.toarray(), X_dense)
+        assert_array_equal(y_new, y_dense)
+
+
+def test_smote_multiclass_single_output():
+    # the synthetic samples of all classes are written in a single output
+    y = np.array([0, 1, 2, 0, 2, 1, 1, 1, 1, 1, 1, 0, 2, 1, 1, 1, 1, 0, 1, 2])
+    for kind in ('regular', 'borderline1', 'borderline2'):
+        smote = SMOTE(random_state=RND_SEED, kind=kind, k_neighbors=3,
+                      m_neighbors=4)
+        X_res, y_res = smote.fit_sample(X, y)
+        X_res_sparse, y_res_sparse = smote.fit_sample(sparse.csr_matrix(X), y)
+        assert sparse.isspmatrix_csr(X_res_sparse)
+        assert_allclose(X_res_sparse.toarray(), X_res)
+        assert_array_equal(y_res_sparse, y_res)
+        assert_array_equal(X_res[:X.shape[0]], X)
+        assert_array_equal(y_res[:y.shape[0]], y)
+
+
+class _CountingNearestNeighbors(NearestNeighbors):
+    n_fit = 0
+
+    def fit(self, X, y=None):
+        _CountingNearestNeighbors.n_fit += 1
+        return super(_CountingNearestNeighbors, self).fit(X, y)
+
+
+def test_smote_m_neighbors_fitted_once():
+    y = np.array([0, 1, 2, 0, 2, 1, 1, 1, 1, 1, 1, 0, 2, 1, 1, 1, 1, 0, 1, 2])
+    for kind in ('borderline1', 'borderline2', 'svm'):
+        nn_m = _CountingNearestNeighbors(n_neighbors=5)
+        _CountingNearestNeighbors.n_fit = 0
+        smote = SMOTE(random_state=RND_SEED, kind=kind, k_neighbors=3,
+                      m_neighbors=nn_m)
+        smote.fit_sample(X, y)
+        assert _CountingNearestNeighbors.n_fit == 1
+
+
+def test_sample_svm_fitted_once():
+    y = np.array([0, 1, 2, 0, 2, 1, 1, 1, 1, 1, 1, 0, 2, 1, 1, 1, 1, 0, 1, 2])
+
+    class CountingSVC(SVC):
+        n_fit = 0
+
+        def fit(self, X, y, sample_weight=None):
+            CountingSVC.n_fit += 1
+            return super(CountingSVC, self).fit(X, y, sample_weight)
+
+    smote = SMOTE(random_state=RND_SEED, kind='svm', k_neighbors=3,
+                  m_neighbors=4, svm_estimator=CountingSVC())
+    smote.fit_sample(X, y)
+    assert CountingSVC.n_fit == 1
+
+
+def test_sample_svm_linear_estimators():
+    y = np.array([0, 1, 2, 0, 2, 1, 1, 1, 1, 1, 1, 0, 2, 1, 1, 1, 1, 0, 1, 2])
+    svm_estimators = [LinearSVC(random_state=RND_SEED),
+                      SGDClassifier(max_iter=100, tol=None,
+                                    random_state=RND_SEED),
+                      make_pipeline(Nystroem(n_components=10,
+                                             random_state=RND_SEED),
+                                    LinearSVC(random_state=RND_SEED))]
+    for y_ in (Y, y):
+        for svm in svm_estimators:
+            smote = SMOTE(random_state=RND_SEED, kind='svm', k_neighbors=3,
+                          m_neighbors=4, svm_estimator=svm)
+            X_res, y_res = smote.fit_sample(X, y_)
+            assert X_res.shape[0] == y_res.shape[0]
+            assert_array_equal(X_res[:X.shape[0]], X)
+
+            # the boundary samples are the one within the margin
+            support_index = smote._support_index(X, y_)
+            decision = smote.svm_estimator_.decision_function(X)
+            if decision.ndim == 1:
+                decision = np.vstack((-decision, decision)).T
+            margin = decision[np.arange(y_.size), y_]
+            assert_array_equal(support_index, np.flatnonzero(margin <= 1))
+
+
+def test_smote_fit_sample_batches():
+    y = np.array([0, 1, 2, 0, 2, 1, 1, 1, 1, 1, 1, 0, 2, 1, 1, 1, 1, 0, 1, 2])
+    for kind in ('regular', 'borderline1', 'borderline2', 'svm'):
+        smote = SMOTE(random_state=RND_SEED, kind=kind, k_neighbors=3,
+                      m_neighbors=4)
+        X_res, y_res = smote.fit_sample(X, y)
+        for batch_size in (1, 7, 50):
+            batches = list(smote.fit_sample_batches(X, y,
+                                                    batch_size=batch_size))
+            assert_array_equal(np.vstack([X_b for X_b, _ in batches]), X_res)
+            assert_array_equal(np.hstack([y_b for _, y_b in batches]), y_res)
+
+        batches = smote.fit_sample_batches(sparse.csr_matrix(X), y,
+                                           batch_size=7)
+        assert_array_equal(
+            sparse.vstack([X_b for X_b, _ in batches]).toarray(), X_res)
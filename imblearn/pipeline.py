@@ -15,13 +15,17 @@ composite estimator, as a chain of transforms, samples and estimators.
 
 from __future__ import division
 
+import numpy as np
+
 from sklearn import pipeline
 from sklearn.base import clone
 from sklearn.externals import six
 from sklearn.externals.joblib import Memory
-from sklearn.utils import tosequence
+from sklearn.utils import check_X_y, safe_indexing, tosequence
 from sklearn.utils.metaestimators import if_delegate_has_method
 
+from .under_sampling.base import BaseCleaningSampler
+
 __all__ = ['Pipeline', 'make_pipeline']
 
 
@@ -66,6 +70,14 @@ class Pipeline(pipeline.Pipeline):
 
     Notes
     -----
+    A sampler returning sample weights instead of the resampled data, e.g.
+    :class:`imblearn.over_sampling.RandomOverSampler` with
+    ``return_weights=True``, does not modify the data. The weights are given
+    as ``sample_weight`` to the ``fit`` method of the final estimator,
+    multiplied by the ``sample_weight`` fit parameter of the final estimator
+    if given. Such a sampler cannot be followed by another sampler, including
+    the final step, nor by a final step set to ``None``.
+
     See :ref:`sphx_glr_auto_examples_pipeline_plot_pipeline_classification.py`
 
     See also
@@ -175,6 +187,7 @@ class Pipeline(pipeline.Pipeline):
 
         fit_transform_one_cached = memory.cache(_fit_transform_one)
         fit_sample_one_cached = memory.cache(_fit_sample_one)
+        fit_sample_indices_one_cached = memory.cache(_fit_sample_indices_one)
 
         fit_params_steps = dict((name, {}) for name, step in self.steps
                                 if step is not None)
@@ -183,6 +196,13 @@ class Pipeline(pipeline.Pipeline):
             fit_params_steps[step][param] = pval
         Xt = X
         yt = y
+        # the samples selected by consecutive cleaning samplers are indexed in
+        # the last materialized data. Each cleaning sampler is fitted on the
+        # gathered selection and only returns the indices of the samples to
+        # keep: the resampled data are built once, for the following step
+        # which is not a cleaning sampler.
+        sample_indices = None
+        sample_weight, weighting_step = None, None
         for step_idx, (name, transformer) in enumerate(self.steps[:-1]):
             if transformer is None:
                 pass
@@ -193,6 +213,9 @@ class Pipeline(pipeline.Pipeline):
                     cloned_transformer = transformer
                 else:
                     cloned_transformer = clone(transformer)
+                if not isinstance(cloned_transformer, BaseCleaningSampler):
+                    Xt, yt = _select(Xt, yt, sample_indices)
+                    sample_indices = None
                 # Fit or load from cache the current transfomer
                 if (hasattr(cloned_transformer, "transform") or
                         hasattr(cloned_transformer, "fit_transform")):
@@ -200,16 +223,49 @@ class Pipeline(pipeline.Pipeline):
                         cloned_transformer, None, Xt, yt,
                         **fit_params_steps[name])
                 elif hasattr(cloned_transformer, "sample"):
-                    Xt, yt, fitted_transformer = fit_sample_one_cached(
-                        cloned_transformer, Xt, yt,
-                        **fit_params_steps[name])
+                    _check_no_sample_weight(weighting_step, name)
+                    if isinstance(cloned_transformer, BaseCleaningSampler):
+                        if sample_indices is None:
+                            Xt, yt = check_X_y(Xt, yt,
+                                               accept_sparse=['csr', 'csc'])
+                        X_sel, y_sel = _select(Xt, yt, sample_indices)
+                        step_indices, fitted_transformer = \
+                            fit_sample_indices_one_cached(
+                                cloned_transformer, X_sel, y_sel,
+                                **fit_params_steps[name])
+                        del X_sel, y_sel
+                        sample_indices = (
+                            step_indices if sample_indices is None
+                            else sample_indices[step_indices])
+                    else:
+                        Xt, yt, step_weight, fitted_transformer = \
+                            fit_sample_one_cached(cloned_transformer, Xt, yt,
+                                                  **fit_params_steps[name])
+                        if step_weight is not None:
+                            sample_weight, weighting_step = step_weight, name
                 # Replace the transformer of the step with the fitted
                 # transformer. This is necessary when loading the transformer
                 # from the cache.
                 self.steps[step_idx] = (name, fitted_transformer)
-        if self._final_estimator is None:
+        Xt, yt = _select(Xt, yt, sample_indices)
+        name, estimator = self.steps[-1]
+        if estimator is None:
+            if sample_weight is not None:
+                raise ValueError(
+                    "The step '{}' returns sample weights and cannot be"
+                    " followed by a final step set to None.".format(
+                        weighting_step))
             return Xt, yt, {}
-        return Xt, yt, fit_params_steps[self.steps[-1][0]]
+        if (not hasattr(estimator, "transform") and
+                hasattr(estimator, "sample")):
+            _check_no_sample_weight(weighting_step, name)
+        fit_params_final = fit_params_steps[name]
+        if sample_weight is not None:
+            if fit_params_final.get('sample_weight') is not None:
+                sample_weight = (sample_weight *
+                                 np.asarray(fit_params_final['sample_weight']))
+            fit_params_final['sample_weight'] = sample_weight
+        return Xt, yt, fit_params_final
 
     def fit(self, X, y=None, **fit_params):
         """Fit the model
@@ -336,6 +392,7 @@ class Pipeline(pipeline.Pipeline):
 
         """
         Xt = X
+        weighting_step = None
         for name, transform in self.steps[:-1]:
             if transform is None:
                 continue
@@ -344,9 +401,13 @@ class Pipeline(pipeline.Pipeline):
                 # last estimator is a sampler. Samplers don't carry
                 # the sampled data. So, call 'fit_sample' in all intermediate
                 # steps to get the sampled data for the last estimator.
-                Xt, y = transform.fit_sample(Xt, y)
+                _check_no_sample_weight(weighting_step, name)
+                Xt, y, sample_weight, _ = _fit_sample_one(transform, Xt, y)
+                if sample_weight is not None:
+                    weighting_step = name
             else:
                 Xt = transform.transform(Xt)
+        _check_no_sample_weight(weighting_step, self.steps[-1][0])
         return self.steps[-1][-1].fit_sample(Xt, y)
 
     @if_delegate_has_method(delegate='_final_estimator')
@@ -600,9 +661,34 @@ def _fit_transform_one(transformer, weight, X, y,
 
 
 def _fit_sample_one(sampler, X, y, **fit_params):
-    X_res, y_res = sampler.fit_sample(X, y, **fit_params)
+    # the indices returned with ``return_indices=True`` are not used
+    res = sampler.fit_sample(X, y, **fit_params)
+    X_res, y_res = res[:2]
+    if getattr(sampler, 'return_weights', False):
+        sample_weight = res[2]
+    else:
+        sample_weight = None
+
+    return X_res, y_res, sample_weight, sampler
+
+
+def _check_no_sample_weight(weighting_step, name):
+    """Raise an error if a sampler follows a step returning weights."""
+    if weighting_step is not None:
+        raise ValueError(
+            "The step '{}' returns sample weights and cannot be followed by"
+            " the sampler '{}'.".format(weighting_step, name))
+
+
+def _fit_sample_indices_one(sampler, X, y, **fit_params):
+    return sampler._fit_sample_indices(X, y, **fit_params), sampler
+
 
-    return X_res, y_res, sampler
+def _select(X, y, indices):
+    """Gather the selected samples, if any selection is pending."""
+    if indices is None:
+        return X, y
+    return safe_indexing(X, indices), safe_indexing(y, indices)
 
 
 def make_pipeline(*steps):
@@ -0,0 +1,155 @@
+"""Test for the base samplers"""
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+import numpy as np
+import pytest
+
+from sklearn.datasets import make_classification
+from sklearn.neighbors import NearestNeighbors, kneighbors_graph
+from sklearn.utils import check_X_y
+from sklearn.utils.testing import assert_allclose, assert_array_equal
+
+import imblearn
+from imblearn.base import SamplerMixin
+from imblearn.over_sampling import ADASYN, SMOTE
+from imblearn.under_sampling import (EditedNearestNeighbours, NearMiss,
+                                     NeighbourhoodCleaningRule, TomekLinks)
+from imblearn.utils import hash_X_y
+
+X, y = make_classification(n_samples=200, n_classes=3, n_informative=4,
+                           weights=[0.1, 0.3, 0.6], random_state=0)
+
+
+class NotFittableNearestNeighbors(NearestNeighbors):
+    def fit(self, X, y=None):
+        raise AssertionError("The nearest neighbours should not be fitted.")
+
+
+@pytest.mark.parametrize("include_self", [False, True])
+@pytest.mark.parametrize(
+    "sampler",
+    [SMOTE(random_state=0),
+     SMOTE(kind='borderline1', random_state=0),
+     SMOTE(kind='borderline2', random_state=0),
+     SMOTE(kind='svm', random_state=0),
+     ADASYN(random_state=0),
+     EditedNearestNeighbours(),
+     NeighbourhoodCleaningRule(),
+     TomekLinks(),
+     NearMiss(version=1),
+     NearMiss(version=2),
+     NearMiss(version=3)])
+def test_neighbors_graph(sampler, include_self):
+    # a graph containing all the neighbours gives the same results than the
+    # nearest neighbours search
+    neighbors_graph = kneighbors_graph(X, X.shape[0] - 1 + include_self,
+                                       mode='distance',
+                                       include_self=include_self)
+    X_res, y_res = sampler.fit_sample(X, y)
+    X_res_graph, y_res_graph = sampler.fit_sample(
+        X, y, neighbors_graph=neighbors_graph)
+    assert_allclose(X_res_graph, X_res)
+    assert_array_equal(y_res_graph, y_res)
+
+
+def test_neighbors_graph_skip_fit():
+    neighbors_graph = kneighbors_graph(X, 50, mode='distance')
+    smote = SMOTE(k_neighbors=NotFittableNearestNeighbors(n_neighbors=3),
+                  random_state=0)
+    X_res, y_res = smote.fit_sample(X, y, neighbors_graph=neighbors_graph)
+    assert X_res.shape[0] == 3 * np.bincount(y).max()
+    enn = EditedNearestNeighbours(
+        n_neighbors=NotFittableNearestNeighbors(n_neighbors=4))
+    enn.fit_sample(X, y, neighbors_graph=neighbors_graph)
+
+
+def test_neighbors_graph_not_enough_neighbors():
+    # the neighbours lacking from the graph are searched
+    neighbors_graph = kneighbors_graph(X, 5, mode='distance')
+    smote = SMOTE(random_state=0)
+    X_res, y_res = smote.fit_sample(X, y)
+    X_res_graph, y_res_graph = smote.fit_sample(
+        X, y, neighbors_graph=neighbors_graph)
+    assert_allclose(X_res_graph, X_res)
+    assert_array_equal(y_res_graph, y_res)
+    # the fitted graph is used by sample
+    smote.fit(X, y, neighbors_graph=neighbors_graph)
+    X_res_graph, y_res_graph = smote.sample(X, y)
+    assert_allclose(X_res_graph, X_res)
+    assert_array_equal(y_res_graph, y_res)
+
+
+@pytest.mark.parametrize(
+    "sampler",
+    [SMOTE(random_state=0),
+     SMOTE(kind='borderline1', random_state=0),
+     SMOTE(kind='borderline2', random_state=0),
+     SMOTE(kind='svm', random_state=0),
+     ADASYN(random_state=0),
+     NearMiss(version=1),
+     NearMiss(version=2),
+     NearMiss(version=3)])
+def test_neighbors_graph_within_class(sampler):
+    # a global graph does not contain enough neighbours from the minority
+    # class for most of its samples
+    X_large, y_large = make_classification(n_samples=5000, weights=[0.05],
+                                           random_state=0)
+    neighbors_graph = kneighbors_graph(X_large, 10, mode='distance')
+    X_res, y_res = sampler.fit_sample(X_large, y_large)
+    X_res_graph, y_res_graph = sampler.fit_sample(
+        X_large, y_large, neighbors_graph=neighbors_graph)
+    assert_allclose(X_res_graph, X_res)
+    assert_array_equal(y_res_graph, y_res)
+
+
+def test_fit_sample_not_recorded():
+    smote = SMOTE(random_state=0)
+    X_res, y_res = smote.fit_sample(X, y)
+    with pytest.raises(RuntimeError, match="Call 'fit' before 'sample'"):
+        smote.sample(X, y)
+    X_res_sample, y_res_sample = smote.fit(X, y).sample(X, y)
+    assert_allclose(X_res_sample, X_res)
+    assert_array_equal(y_res_sample, y_res)
+
+
+def test_fit_fingerprint_config():
+    smote = SMOTE(random_state=0)
+    with imblearn.config_context(fingerprint='address'):
+        smote.fit(X, y)
+    # the data are checked with the method used at fit
+    smote.sample(X, y)
+    with pytest.raises(RuntimeError, match="X and y need to be same array"):
+        smote.sample(X.copy(), y)
+
+
+def test_fit_fingerprint_address_copied_data():
+    # the data copied by the validation are fingerprinted from their content
+    smote = SMOTE(random_state=0)
+    with imblearn.config_context(fingerprint='address'):
+        smote.fit(X.tolist(), y.tolist())
+        X_res, y_res = smote.sample(X.tolist(), y.tolist())
+    X_res_array, y_res_array = smote.fit_sample(X, y)
+    assert_allclose(X_res, X_res_array)
+    assert_array_equal(y_res, y_res_array)
+
+
+class FitOverridingSampler(SamplerMixin):
+    # sampler written against the public API only, without the '_fit' hook
+    def fit(self, X, y):
+        X, y = check_X_y(X, y)
+        self.X_hash_, self.y_hash_ = hash_X_y(X, y)
+        self.ratio_ = 'auto'
+        return self
+
+    def _sample(self, X, y):
+        return X[::2], y[::2]
+
+
+def test_sampler_overriding_fit():
+    sampler = FitOverridingSampler()
+    X_res, y_res = sampler.fit_sample(X, y)
+    assert_array_equal(y_res, y[::2])
+    X_res_sample, y_res_sample = sampler.fit(X, y).sample(X, y)
+    assert_allclose(X_res_sample, X_res)
+    assert_array_equal(y_res_sample, y_res)
@@ -0,0 +1,42 @@
+"""Test the global configuration"""
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+from pytest import raises
+
+from imblearn import config_context, get_config, set_config
+
+
+def test_config_context():
+    assert get_config() == {'fingerprint': 'strided'}
+
+    with config_context(fingerprint='full'):
+        assert get_config() == {'fingerprint': 'full'}
+        with config_context(fingerprint='address'):
+            assert get_config() == {'fingerprint': 'address'}
+        assert get_config() == {'fingerprint': 'full'}
+    assert get_config() == {'fingerprint': 'strided'}
+
+    # the configuration is restored when an error is raised
+    with raises(ValueError):
+        with config_context(fingerprint='full'):
+            raise ValueError()
+    assert get_config() == {'fingerprint': 'strided'}
+
+
+def test_set_config():
+    set_config(fingerprint='address')
+    assert get_config()['fingerprint'] == 'address'
+    set_config()
+    assert get_config()['fingerprint'] == 'address'
+    set_config(fingerprint='strided')
+    assert get_config()['fingerprint'] == 'strided'
+
+
+def test_set_config_error():
+    with raises(ValueError, match="'fingerprint' should be one of"):
+        set_config(fingerprint='stride')
+    with raises(ValueError, match="'fingerprint' should be one of"):
+        with config_context(fingerprint='adress'):
+            pass
+    assert get_config()['fingerprint'] == 'strided'
@@ -27,10 +27,13 @@ from sklearn.feature_selection import SelectKBest, f_classif
 from sklearn.datasets import load_iris, make_classification
 from sklearn.preprocessing import StandardScaler
 from sklearn.externals.joblib import Memory
+from sklearn.neighbors import kneighbors_graph
 
+from imblearn.over_sampling import RandomOverSampler
 from imblearn.pipeline import Pipeline, make_pipeline
 from imblearn.under_sampling import (RandomUnderSampler,
-                                     EditedNearestNeighbours as ENN)
+                                     EditedNearestNeighbours as ENN,
+                                     OneSidedSelection, TomekLinks)
 
 
 JUNK_FOOD_DOCS = (
@@ -1079,3 +1082,94 @@ def test_pipeline_fit_then_sample_3_samplers_with_sampler_last_estimator():
     X_fit_then_sample_res, y_fit_then_sample_res = pipeline.sample(X, y)
     assert_array_equal(X_fit_sample_resampled, X_fit_then_sample_res)
     assert_array_equal(y_fit_sample_resampled, y_fit_then_sample_res)
+
+
+def test_pipeline_sample_weight_from_sampler():
+    X, y = make_classification(n_classes=2, weights=[0.1, 0.9],
+                               n_samples=500, random_state=0)
+    ros = RandomOverSampler(random_state=0, return_weights=True)
+    _, _, sample_weight = clone(ros).fit_sample(X, y)
+
+    pipeline = make_pipeline(ros, StandardScaler(), LogisticRegression())
+    pipeline.fit(X, y)
+    clf = LogisticRegression().fit(StandardScaler().fit_transform(X), y,
+                                   sample_weight=sample_weight)
+    assert_allclose(pipeline.steps[-1][1].coef_, clf.coef_)
+
+    # the weights are combined with the ones given by the user
+    user_weight = np.linspace(0.5, 1.5, num=y.size)
+    pipeline.fit(X, y, logisticregression__sample_weight=user_weight)
+    clf.fit(StandardScaler().fit_transform(X), y,
+            sample_weight=sample_weight * user_weight)
+    assert_allclose(pipeline.steps[-1][1].coef_, clf.coef_)
+
+
+def test_pipeline_sampler_after_sample_weight_error():
+    X, y = make_classification(n_classes=2, weights=[0.1, 0.9],
+                               n_samples=500, random_state=0)
+    pipeline = make_pipeline(
+        RandomOverSampler(random_state=0, return_weights=True),
+        RandomUnderSampler(random_state=0), LogisticRegression())
+    with raises(ValueError, match="cannot be followed by the sampler"):
+        pipeline.fit(X, y)
+
+
+def test_pipeline_final_sampler_after_sample_weight_error():
+    X, y = make_classification(n_classes=2, weights=[0.1, 0.9],
+                               n_samples=500, random_state=0)
+    pipeline = make_pipeline(
+        RandomUnderSampler(random_state=0, return_weights=True),
+        TomekLinks())
+    for method in ('fit', 'fit_sample', 'sample'):
+        with raises(ValueError, match="cannot be followed by the sampler"):
+            getattr(pipeline, method)(X, y)
+
+    pipeline = make_pipeline(
+        RandomUnderSampler(random_state=0, return_weights=True), None)
+    for method in ('fit', 'fit_transform'):
+        with raises(ValueError, match="followed by a final step set to None"):
+            getattr(pipeline, method)(X, y)
+
+
+def test_pipeline_sample_weight_with_indices():
+    X, y = make_classification(n_classes=2, weights=[0.1, 0.9],
+                               n_samples=500, random_state=0)
+    rus = RandomUnderSampler(random_state=0, return_weights=True)
+    pipeline = make_pipeline(clone(rus), LogisticRegression())
+    pipeline.fit(X, y)
+    pipeline_indices = make_pipeline(clone(rus).set_params(
+        return_indices=True), LogisticRegression())
+    pipeline_indices.fit(X, y)
+    assert_allclose(pipeline_indices.steps[-1][1].coef_,
+                    pipeline.steps[-1][1].coef_)
+
+
+def test_pipeline_cleaning_samplers_gather_once():
+    X, y = make_classification(n_classes=3, weights=[0.1, 0.3, 0.6],
+                               n_informative=3, n_samples=500, random_state=0)
+    neighbors_graph = kneighbors_graph(X, n_neighbors=10, mode='distance')
+    samplers = [ENN(), TomekLinks(), OneSidedSelection(random_state=0)]
+    X_res, y_res = X, y
+    for sampler in samplers:
+        fit_params = ({'neighbors_graph': neighbors_graph}
+                      if sampler is samplers[0] else {})
+        X_res, y_res = clone(sampler).fit_sample(X_res, y_res, **fit_params)
+    clf = LogisticRegression(random_state=0).fit(X_res, y_res)
+
+    cachedir = mkdtemp()
+    try:
+        for memory in (None, Memory(cachedir=cachedir, verbose=0)):
+            pipeline = make_pipeline(*(samplers + [LogisticRegression(
+                random_state=0)]))
+            pipeline.set_params(memory=memory)
+            pipeline.fit(X.tolist(), y,
+                         editednearestneighbours__neighbors_graph=(
+                             neighbors_graph))
+            assert_allclose(pipeline.steps[-1][1].coef_, clf.coef_)
+            X_pipe, y_pipe = pipeline._fit(
+                X, y, editednearestneighbours__neighbors_graph=(
+                    neighbors_graph))[:2]
+            assert_array_equal(X_pipe, X_res)
+            assert_array_equal(y_pipe, y_res)
+    finally:
+        shutil.rmtree(cachedir)
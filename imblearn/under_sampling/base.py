@@ -4,6 +4,10 @@ Base class for the under-sampling method.
 # Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
 # License: MIT
 
+from abc import abstractmethod
+
+from sklearn.utils import check_X_y, safe_indexing
+
 from ..base import BaseSampler
 
 
@@ -19,7 +23,88 @@ class BaseUnderSampler(BaseSampler):
 class BaseCleaningSampler(BaseSampler):
     """Base class for under-sampling algorithms.
 
+    The cleaning samplers only select samples. They find the indices of the
+    samples to keep and the data are gathered once, at the end of
+    :meth:`_sample`. Composite samplers and pipelines use
+    :meth:`_fit_sample_indices` to chain several selections without gathering
+    the intermediate data.
+
     Warning: This class should not be used directly. Use the derive classes
     instead.
     """
     _sampling_type = 'clean-sampling'
+
+    def _fit_sample_indices(self, X, y):
+        """Fit the statistics and find the samples to keep.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        Returns
+        -------
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
+
+        """
+        X, y = check_X_y(X, y, accept_sparse=['csr', 'csc'])
+        self.X_hash_ = self.y_hash_ = None
+
+        return self._fit(X, y)._sample_indices(X, y)
+
+    def _sample(self, X, y):
+        """Resample the dataset.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        Returns
+        -------
+        X_resampled : {ndarray, sparse matrix}, shape \
+(n_samples_new, n_features)
+            The array containing the resampled data.
+
+        y_resampled : ndarray, shape (n_samples_new,)
+            The corresponding label of `X_resampled`
+
+        idx_under : ndarray, shape (n_samples_new,)
+            If `return_indices` is `True`, an array will be returned
+            containing the indices of the selected samples.
+
+        """
+        idx_under = self._sample_indices(X, y)
+        X_resampled = safe_indexing(X, idx_under)
+        y_resampled = safe_indexing(y, idx_under)
+
+        if self.return_indices:
+            return X_resampled, y_resampled, idx_under
+        return X_resampled, y_resampled
+
+    @abstractmethod
+    def _sample_indices(self, X, y):
+        """Find the samples to keep.
+
+        Parameters
+        ----------
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : ndarray, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        Returns
+        -------
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
+
+        """
+        pass
@@ -16,6 +16,7 @@ from sklearn.neighbors import NearestNeighbors
 from sklearn.utils import safe_indexing
 
 from ..base import BaseUnderSampler
+from ...neighbors.cache import _kneighbors
 
 VOTING_KIND = ('auto', 'hard', 'soft')
 
@@ -129,11 +130,13 @@ ClusterCentroids # doctest: +NORMALIZE_WHITESPACE
     def _generate_sample(self, X, y, centroids, target_class):
         if self.voting_ == 'hard':
             nearest_neighbors = NearestNeighbors(n_neighbors=1)
-            nearest_neighbors.fit(X, y)
-            indices = nearest_neighbors.kneighbors(centroids,
-                                                   return_distance=False)
+            indices = _kneighbors(nearest_neighbors, X, X_query=centroids,
+                                  return_distance=False)
             X_new = safe_indexing(X, np.squeeze(indices))
         else:
+            if X.dtype.kind == 'f':
+                # keep the precision of the original data
+                centroids = centroids.astype(X.dtype, copy=False)
             if sparse.issparse(X):
                 X_new = sparse.csr_matrix(centroids)
             else:
@@ -177,18 +180,19 @@ ClusterCentroids # doctest: +NORMALIZE_WHITESPACE
                 raise ValueError("'voting' needs to be one of {}. Got {}"
                                  " instead.".format(VOTING_KIND, self.voting))
 
+        class_index = self._class_index
         X_resampled, y_resampled = [], []
-        for target_class in np.unique(y):
+        for target_class in class_index.classes:
+            target_class_indices = class_index.indices(target_class)
             if target_class in self.ratio_.keys():
                 n_samples = self.ratio_[target_class]
                 self.estimator_.set_params(**{'n_clusters': n_samples})
-                self.estimator_.fit(X[y == target_class])
+                self.estimator_.fit(safe_indexing(X, target_class_indices))
                 X_new, y_new = self._generate_sample(
                     X, y, self.estimator_.cluster_centers_, target_class)
                 X_resampled.append(X_new)
                 y_resampled.append(y_new)
             else:
-                target_class_indices = np.flatnonzero(y == target_class)
                 X_resampled.append(safe_indexing(X, target_class_indices))
                 y_resampled.append(safe_indexing(y, target_class_indices))
 
@@ -7,16 +7,17 @@ method."""
 
 from __future__ import division
 
-from collections import Counter
-
 import numpy as np
 
 from scipy.sparse import issparse
 
+from sklearn.metrics.pairwise import (pairwise_distances,
+                                      pairwise_distances_argmin_min)
 from sklearn.neighbors import KNeighborsClassifier
 from sklearn.utils import check_random_state, safe_indexing
 
 from ..base import BaseCleaningSampler
+from ...neighbors.cache import _effective_metric
 
 
 class CondensedNearestNeighbour(BaseCleaningSampler):
@@ -111,6 +112,10 @@ CondensedNearestNeighbour #doctest: +SKIP
 
     """
 
+    # number of samples of a class visited between two updates of the
+    # distances of all the following samples to the store
+    _batch_size = 1024
+
     def __init__(self,
                  ratio='auto',
                  return_indices=False,
@@ -141,105 +146,160 @@ CondensedNearestNeighbour #doctest: +SKIP
                              ' inhereited from KNeighborsClassifier.'
                              ' Got {} instead.'.format(type(self.n_neighbors)))
 
-    def _sample(self, X, y):
-        """Resample the dataset.
+    def _sample_indices(self, X, y):
+        """Find the samples to keep.
 
         Parameters
         ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
             Matrix containing the data which have to be sampled.
 
-        y : array-like, shape (n_samples,)
+        y : ndarray, shape (n_samples,)
             Corresponding label for each sample in X.
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
-
-        idx_under : ndarray, shape (n_samples, )
-            If `return_indices` is `True`, a boolean array will be returned
-            containing the which samples have been selected.
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
 
         """
         self._validate_estimator()
 
         random_state = check_random_state(self.random_state)
-        target_stats = Counter(y)
+        class_index = self._class_index
+        target_stats = class_index.target_stats()
         class_minority = min(target_stats, key=target_stats.get)
-        idx_under = np.empty((0, ), dtype=int)
+        idx_under = []
 
-        for target_class in np.unique(y):
+        for target_class in class_index.classes:
             if target_class in self.ratio_.keys():
                 # Randomly get one sample from the majority class
                 # Generate the index to select
-                idx_maj = np.flatnonzero(y == target_class)
+                idx_maj = class_index.indices(target_class)
                 idx_maj_sample = idx_maj[random_state.randint(
                         low=0, high=target_stats[target_class],
                         size=self.n_seeds_S)]
 
-                # Create the set C - One majority samples and all minority
-                C_indices = np.append(np.flatnonzero(y == class_minority),
-                                      idx_maj_sample)
+                idx_min = class_index.indices(class_minority)
+                if self.estimator_.n_neighbors == 1:
+                    idx_maj_sample = self._condense(X, idx_maj,
+                                                    idx_maj_sample, idx_min)
+                else:
+                    idx_maj_sample = self._condense_estimator(
+                        X, y, idx_maj, idx_maj_sample, idx_min)
+                idx_under.append(idx_maj_sample)
+            else:
+                idx_under.append(class_index.indices(target_class))
+        idx_under = np.concatenate(idx_under)
+
+        return idx_under
+
+    def _condense(self, X, idx_maj, idx_maj_sample, idx_min):
+        """Condense a class with the 1-NN rule.
+
+        The samples of the class are visited in order and a sample is added
+        to the store when its nearest neighbour in the store is a sample of
+        the minority class. Instead of fitting a nearest neighbours estimator
+        for each store, the distance from each sample to its nearest
+        prototype of the class is kept up to date: within a batch, with the
+        distances to each added prototype, and for the following samples,
+        with the distances to all the prototypes added by the batch.
+        Equidistant prototypes are resolved in favour of the minority class.
+        """
+        if np.array_equal(idx_min, idx_maj):
+            # the store only contains samples of the class
+            return idx_maj_sample
+        n_samples = idx_maj.size
+        metric, metric_params = _effective_metric(self.estimator_)
+
+        S_x = safe_indexing(X, idx_maj)
+        _, dist_min = pairwise_distances_argmin_min(
+            S_x, safe_indexing(X, idx_min), metric=metric,
+            metric_kwargs=metric_params)
+        _, dist_store = pairwise_distances_argmin_min(
+            S_x, safe_indexing(X, idx_maj_sample), metric=metric,
+            metric_kwargs=metric_params)
+
+        # the samples already in the store are not visited
+        is_skipped = np.in1d(idx_maj, idx_maj_sample)
+
+        added = []
+        for start in range(0, n_samples, self._batch_size):
+            stop = min(start + self._batch_size, n_samples)
+            batch_added = []
+            position = start
+            while position < stop:
+                is_misclassified = np.logical_and(
+                    dist_min[position:stop] <= dist_store[position:stop],
+                    ~is_skipped[position:stop])
+                misclassified = np.flatnonzero(is_misclassified)
+                if not misclassified.size:
+                    break
+                position += misclassified[0]
+                batch_added.append(position)
+                position += 1
+                if position < stop:
+                    dist_store[position:stop] = np.minimum(
+                        dist_store[position:stop], pairwise_distances(
+                            S_x[position:stop], S_x[batch_added[-1:]],
+                            metric=metric, **metric_params).ravel())
+            if batch_added and stop < n_samples:
+                _, dist_batch = pairwise_distances_argmin_min(
+                    S_x[stop:], S_x[batch_added], metric=metric,
+                    metric_kwargs=metric_params)
+                dist_store[stop:] = np.minimum(dist_store[stop:], dist_batch)
+            added.extend(batch_added)
+
+        return np.append(idx_maj_sample, idx_maj[added])
+
+    def _condense_estimator(self, X, y, idx_maj, idx_maj_sample, idx_min):
+        """Condense a class by refitting the estimator after each addition."""
+        # Create the set C - One majority samples and all minority
+        C_indices = np.append(idx_min, idx_maj_sample)
+        C_x = safe_indexing(X, C_indices)
+        C_y = safe_indexing(y, C_indices)
+
+        # Create the set S - all majority samples
+        S_indices = idx_maj
+        S_x = safe_indexing(X, S_indices)
+        S_y = safe_indexing(y, S_indices)
+
+        # fit knn on C
+        self.estimator_.fit(C_x, C_y)
+
+        # the samples already in the store are not visited
+        is_good = np.in1d(idx_maj, idx_maj_sample)
+        # Check each sample in S if we keep it or drop it
+        for idx_sam, (x_sam, y_sam) in enumerate(zip(S_x, S_y)):
+
+            # Do not select sample which are already well classified
+            if is_good[idx_sam]:
+                continue
+
+            # Classify on S
+            if not issparse(x_sam):
+                x_sam = x_sam.reshape(1, -1)
+            pred_y = self.estimator_.predict(x_sam)
+
+            # If the prediction do not agree with the true label
+            # append it in C_x
+            if y_sam != pred_y:
+                # Keep the index for later
+                idx_maj_sample = np.append(idx_maj_sample, idx_maj[idx_sam])
+
+                # Update C
+                C_indices = np.append(C_indices, idx_maj[idx_sam])
                 C_x = safe_indexing(X, C_indices)
                 C_y = safe_indexing(y, C_indices)
 
-                # Create the set S - all majority samples
-                S_indices = np.flatnonzero(y == target_class)
-                S_x = safe_indexing(X, S_indices)
-                S_y = safe_indexing(y, S_indices)
-
-                # fit knn on C
+                # fit a knn on C
                 self.estimator_.fit(C_x, C_y)
 
-                good_classif_label = idx_maj_sample.copy()
-                # Check each sample in S if we keep it or drop it
-                for idx_sam, (x_sam, y_sam) in enumerate(zip(S_x, S_y)):
-
-                    # Do not select sample which are already well classified
-                    if idx_sam in good_classif_label:
-                        continue
-
-                    # Classify on S
-                    if not issparse(x_sam):
-                        x_sam = x_sam.reshape(1, -1)
-                    pred_y = self.estimator_.predict(x_sam)
-
-                    # If the prediction do not agree with the true label
-                    # append it in C_x
-                    if y_sam != pred_y:
-                        # Keep the index for later
-                        idx_maj_sample = np.append(idx_maj_sample,
-                                                   idx_maj[idx_sam])
-
-                        # Update C
-                        C_indices = np.append(C_indices, idx_maj[idx_sam])
-                        C_x = safe_indexing(X, C_indices)
-                        C_y = safe_indexing(y, C_indices)
-
-                        # fit a knn on C
-                        self.estimator_.fit(C_x, C_y)
-
-                        # This experimental to speed up the search
-                        # Classify all the element in S and avoid to test the
-                        # well classified elements
-                        pred_S_y = self.estimator_.predict(S_x)
-                        good_classif_label = np.unique(
-                            np.append(idx_maj_sample,
-                                      np.flatnonzero(pred_S_y == S_y)))
-
-                idx_under = np.concatenate((idx_under, idx_maj_sample),
-                                           axis=0)
-            else:
-                idx_under = np.concatenate(
-                    (idx_under, np.flatnonzero(y == target_class)), axis=0)
+                # This experimental to speed up the search
+                # Classify all the element in S and avoid to test the
+                # well classified elements
+                pred_S_y = self.estimator_.predict(S_x)
+                is_good = pred_S_y == S_y
+                is_good[np.in1d(idx_maj, idx_maj_sample)] = True
 
-        if self.return_indices:
-            return (safe_indexing(X, idx_under), safe_indexing(y, idx_under),
-                    idx_under)
-        else:
-            return safe_indexing(X, idx_under), safe_indexing(y, idx_under)
+        return idx_maj_sample
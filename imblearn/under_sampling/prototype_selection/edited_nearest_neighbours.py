@@ -9,22 +9,165 @@ method."""
 
 from __future__ import division
 
-from collections import Counter
-
 import numpy as np
-from scipy.stats import mode
 
 from sklearn.utils import safe_indexing
 
 from ..base import BaseCleaningSampler
+from ...base import NeighborsGraphMixin
+from ...neighbors.cache import _kneighbors
 from ...utils import check_neighbors_object
+from ...utils.validation import _check_ratio
 from ...utils.deprecation import deprecate_parameter
 
 
 SEL_KIND = ('all', 'mode')
 
 
-class EditedNearestNeighbours(BaseCleaningSampler):
+def _edited_mask(nnhood_label, y_query, n_classes, kind_sel,
+                 chunk_size=2 ** 20):
+    """Check which samples agree with their nearest neighbours.
+
+    Parameters
+    ----------
+    nnhood_label : ndarray, shape (n_queries, n_neighbors)
+        The labels of the neighbours of the queries, encoded in
+        ``[0, n_classes)``.
+
+    y_query : ndarray, shape (n_queries,)
+        The encoded labels of the queries.
+
+    n_classes : int
+        The number of classes.
+
+    kind_sel : str
+        If ``'all'``, all the neighbours should belong to the class of the
+        query. If ``'mode'``, the most common label among the neighbours, the
+        smallest one in case of ties as with :func:`scipy.stats.mode`, should
+        be the label of the query.
+
+    chunk_size : int, optional (default=2 ** 20)
+        Maximum number of class counts computed at once with
+        ``kind_sel='mode'``.
+
+    Returns
+    -------
+    is_kept : ndarray, shape (n_queries,)
+        Whether each query agrees with its neighbours.
+
+    """
+    if kind_sel == 'all':
+        return np.all(nnhood_label == y_query[:, np.newaxis], axis=1)
+
+    n_queries = y_query.size
+    is_kept = np.empty(n_queries, dtype=bool)
+    step = max(1, chunk_size // n_classes)
+    for start in range(0, n_queries, step):
+        label = nnhood_label[start:start + step]
+        n_rows = label.shape[0]
+        # the labels of all the rows are counted with a single bincount by
+        # offsetting the labels of each row
+        label = label + n_classes * np.arange(n_rows)[:, np.newaxis]
+        counts = np.bincount(label.ravel(), minlength=n_rows * n_classes)
+        counts = counts.reshape(n_rows, n_classes)
+        is_kept[start:start + step] = (np.argmax(counts, axis=1) ==
+                                       y_query[start:start + step])
+    return is_kept
+
+
+def _reverse_neighbors(nnhood_idx, rows):
+    """Sort the neighbourhoods of some samples by neighbour.
+
+    Parameters
+    ----------
+    nnhood_idx : ndarray, shape (n_rows, n_neighbors)
+        The neighbours of the samples.
+
+    rows : ndarray, shape (n_rows,)
+        The samples.
+
+    Returns
+    -------
+    neighbors : ndarray, shape (n_rows * n_neighbors,)
+        The sorted neighbours.
+
+    rows : ndarray, shape (n_rows * n_neighbors,)
+        The sample having each neighbour in its neighbourhood.
+
+    """
+    neighbors = np.ravel(nnhood_idx)
+    order = np.argsort(neighbors, kind='mergesort')
+    return neighbors[order], np.repeat(rows, nnhood_idx.shape[1])[order]
+
+
+def _lookup_reverse_neighbors(neighbors, rows, samples):
+    """Find the rows having some samples in their neighbourhood."""
+    starts = np.searchsorted(neighbors, samples, side='left')
+    stops = np.searchsorted(neighbors, samples, side='right')
+    lengths = stops - starts
+    offsets = np.repeat(starts - np.cumsum(lengths) + lengths, lengths)
+    return rows[offsets + np.arange(np.sum(lengths))]
+
+
+def _alive_neighbors(estimator, X, candidates, is_alive, rows, n_neighbors):
+    """Read the nearest remaining neighbours of samples from candidates.
+
+    The candidates of the samples which do not have enough remaining
+    candidates are searched again among the remaining samples.
+
+    Parameters
+    ----------
+    estimator : KNeighborsMixin
+        The nearest neighbours estimator.
+
+    X : {ndarray, sparse matrix}, shape (n_samples, n_features)
+        The original data.
+
+    candidates : ndarray, shape (n_samples, n_candidates)
+        The candidate neighbours of each sample sorted by distance, the
+        missing candidates being flagged by the index ``n_samples``. Updated
+        in place.
+
+    is_alive : ndarray, shape (n_samples + 1,)
+        Whether each sample remains. The last entry, corresponding to the
+        missing candidates, is False.
+
+    rows : ndarray, shape (n_rows,)
+        The remaining samples whose neighbours are read.
+
+    n_neighbors : int
+        The number of neighbours to read, the sample itself excluded.
+
+    Returns
+    -------
+    nnhood_idx : ndarray, shape (n_rows, n_neighbors)
+        The nearest remaining neighbours of the samples ``rows``.
+
+    """
+    n_samples, n_candidates = candidates.shape
+    is_alive_candidate = is_alive[candidates[rows]]
+    is_lacking = np.sum(is_alive_candidate, axis=1) < n_neighbors + 1
+    if np.any(is_lacking):
+        lacking = rows[is_lacking]
+        alive_idx = np.flatnonzero(is_alive)
+        position = np.empty(n_samples, dtype=np.intp)
+        position[alive_idx] = np.arange(alive_idx.size)
+        n_found = max(n_neighbors + 1, min(alive_idx.size, n_candidates))
+        candidates[lacking] = n_samples
+        X_alive = (X if alive_idx.size == n_samples else
+                   safe_indexing(X, alive_idx))
+        candidates[lacking, :n_found] = alive_idx[_kneighbors(
+            estimator, X_alive, rows=position[lacking],
+            n_neighbors=n_found, return_distance=False)]
+        is_alive_candidate[is_lacking] = is_alive[candidates[lacking]]
+
+    # the first remaining candidate is the sample itself
+    position = np.argsort(~is_alive_candidate, axis=1,
+                          kind='mergesort')[:, 1:n_neighbors + 1]
+    return candidates[rows[:, np.newaxis], position]
+
+
+class EditedNearestNeighbours(NeighborsGraphMixin, BaseCleaningSampler):
     """Class to perform under-sampling based on the edited nearest neighbour
     method.
 
@@ -152,64 +295,46 @@ EditedNearestNeighbours # doctest: +NORMALIZE_WHITESPACE
         if self.kind_sel not in SEL_KIND:
             raise NotImplementedError
 
-    def _sample(self, X, y):
-        """Resample the dataset.
+    def _sample_indices(self, X, y):
+        """Find the samples to keep.
 
         Parameters
         ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
             Matrix containing the data which have to be sampled.
 
-        y : array-like, shape (n_samples,)
+        y : ndarray, shape (n_samples,)
             Corresponding label for each sample in X.
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
-
-        idx_under : ndarray, shape (n_samples, )
-            If `return_indices` is `True`, a boolean array will be returned
-            containing the which samples have been selected.
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
 
         """
         self._validate_estimator()
 
-        idx_under = np.empty((0, ), dtype=int)
-
-        self.nn_.fit(X)
-
-        for target_class in np.unique(y):
-            if target_class in self.ratio_.keys():
-                target_class_indices = np.flatnonzero(y == target_class)
-                X_class = safe_indexing(X, target_class_indices)
-                y_class = safe_indexing(y, target_class_indices)
-                nnhood_idx = self.nn_.kneighbors(
-                    X_class, return_distance=False)[:, 1:]
-                nnhood_label = y[nnhood_idx]
-                if self.kind_sel == 'mode':
-                    nnhood_label, _ = mode(nnhood_label, axis=1)
-                    nnhood_bool = np.ravel(nnhood_label) == y_class
-                elif self.kind_sel == 'all':
-                    nnhood_label = nnhood_label == target_class
-                    nnhood_bool = np.all(nnhood_label, axis=1)
-                index_target_class = np.flatnonzero(nnhood_bool)
-            else:
-                index_target_class = slice(None)
-
-            idx_under = np.concatenate(
-                (idx_under, np.flatnonzero(y == target_class)[
-                    index_target_class]), axis=0)
-
-        if self.return_indices:
-            return (safe_indexing(X, idx_under), safe_indexing(y, idx_under),
-                    idx_under)
-        else:
-            return safe_indexing(X, idx_under), safe_indexing(y, idx_under)
+        class_index = self._class_index
+        y_encoded = class_index.codes()
+        is_kept = np.ones(y.shape, dtype=bool)
+
+        # the neighbours of the samples of all targeted classes are found at
+        # once
+        targeted_indices = [class_index.indices(target_class)
+                            for target_class in class_index.classes
+                            if target_class in self.ratio_.keys()]
+        if targeted_indices:
+            query_indices = np.concatenate(targeted_indices)
+            nnhood_idx = self._kneighbors(
+                self.nn_, X, query_indices=query_indices,
+                return_distance=False)[:, 1:]
+            is_kept[query_indices] = _edited_mask(
+                y_encoded[nnhood_idx], y_encoded[query_indices],
+                len(class_index), self.kind_sel)
+        # the selected samples are grouped by class
+        idx_under = class_index.order[is_kept[class_index.order]]
+
+        return idx_under
 
 
 class RepeatedEditedNearestNeighbours(BaseCleaningSampler):
@@ -281,6 +406,9 @@ class RepeatedEditedNearestNeighbours(BaseCleaningSampler):
     The method is based on [1]_. A one-vs.-rest scheme is used when
     sampling a class as proposed in [1]_.
 
+    After the first iteration, only the samples having a removed sample among
+    their nearest neighbours are edited again.
+
     Supports mutli-class resampling.
 
     See
@@ -345,54 +473,74 @@ RepeatedEditedNearestNeighbours # doctest : +NORMALIZE_WHITESPACE
 
         self.nn_ = check_neighbors_object('n_neighbors', self.n_neighbors,
                                           additional_neighbor=1)
+        self.nn_.set_params(**{'n_jobs': self.n_jobs})
 
-        self.enn_ = EditedNearestNeighbours(ratio=self.ratio,
-                                            return_indices=self.return_indices,
-                                            n_neighbors=self.nn_,
-                                            kind_sel=self.kind_sel,
-                                            n_jobs=self.n_jobs)
+        if self.kind_sel not in SEL_KIND:
+            raise NotImplementedError
 
-    def _sample(self, X, y):
-        """Resample the dataset.
+    def _sample_indices(self, X, y):
+        """Find the samples to keep.
 
         Parameters
         ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
             Matrix containing the data which have to be sampled.
 
-        y : array-like, shape (n_samples,)
+        y : ndarray, shape (n_samples,)
             Corresponding label for each sample in X.
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
-
-        idx_under : ndarray, shape (n_samples, )
-            If `return_indices` is `True`, a boolean array will be returned
-            containing the which samples have been selected.
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
 
         """
 
         self._validate_estimator()
 
-        X_, y_ = X, y
-        if self.return_indices:
-            idx_under = np.arange(X.shape[0], dtype=int)
-        target_stats = Counter(y)
+        class_index = self._class_index
+        n_samples, n_classes = y.shape[0], len(class_index)
+        y_encoded = class_index.codes()
+        target_stats = class_index.target_stats()
         class_minority = min(target_stats, key=target_stats.get)
+        is_minority = class_index.classes == class_minority
+        counts = class_index.counts.copy()
+
+        # the neighbours are searched once among all the samples and read
+        # from these candidates skipping the removed samples. The missing
+        # candidates are flagged by the extra index ``n_samples``.
+        n_neighbors = self.nn_.n_neighbors - 1
+        n_candidates = min(n_samples, 2 * self.nn_.n_neighbors)
+        candidates = np.full((n_samples, n_candidates), n_samples,
+                             dtype=np.intp)
+        is_alive = np.ones(n_samples + 1, dtype=bool)
+        is_alive[-1] = False
+        nnhood_idx = np.empty((n_samples, n_neighbors), dtype=np.intp)
+        # the neighbourhood of a sample is read when it is edited for the
+        # first time or when one of its neighbours was removed
+        is_outdated = np.ones(n_samples, dtype=bool)
+        reverse_neighbors = []
+        # samples to edit if their class is targeted
+        pending = np.arange(n_samples)
+        ratio_ = self.ratio_
 
         for n_iter in range(self.max_iter):
-
-            prev_len = y_.shape[0]
-            if self.return_indices:
-                X_enn, y_enn, idx_enn = self.enn_.fit_sample(X_, y_)
-            else:
-                X_enn, y_enn = self.enn_.fit_sample(X_, y_)
+            is_targeted = np.in1d(class_index.classes, list(ratio_.keys()))
+            is_edited = is_targeted[y_encoded[pending]]
+            edited = pending[is_edited]
+
+            outdated = edited[is_outdated[edited]]
+            if outdated.size:
+                nnhood_idx[outdated] = _alive_neighbors(
+                    self.nn_, X, candidates, is_alive, outdated, n_neighbors)
+                is_outdated[outdated] = False
+                reverse_neighbors.append(_reverse_neighbors(
+                    nnhood_idx[outdated], outdated))
+
+            is_kept = _edited_mask(y_encoded[nnhood_idx[edited]],
+                                   y_encoded[edited], n_classes,
+                                   self.kind_sel)
+            removed = edited[~is_kept]
 
             # Check the stopping criterion
             # 1. If there is no changes for the vector y
@@ -401,39 +549,43 @@ RepeatedEditedNearestNeighbours # doctest : +NORMALIZE_WHITESPACE
             # 3. If one of the class is disappearing
 
             # Case 1
-            b_conv = (prev_len == y_enn.shape[0])
+            if removed.size == 0:
+                break
+            is_alive[removed] = False
+            counts -= np.bincount(y_encoded[removed], minlength=n_classes)
 
             # Case 2
-            stats_enn = Counter(y_enn)
-            count_non_min = np.array([
-                val for val, key in zip(stats_enn.values(), stats_enn.keys())
-                if key != class_minority
-            ])
-            b_min_bec_maj = np.any(count_non_min <
+            b_min_bec_maj = np.any(counts[(counts > 0) & ~is_minority] <
                                    target_stats[class_minority])
 
             # Case 3
-            b_remove_maj_class = (len(stats_enn) < len(target_stats))
-
-            X_, y_, = X_enn, y_enn
-            if self.return_indices:
-                idx_under = idx_under[idx_enn]
-
-            if b_conv or b_min_bec_maj or b_remove_maj_class:
-                if b_conv:
-                    if self.return_indices:
-                        X_, y_, = X_enn, y_enn
-                        idx_under = idx_under[idx_enn]
-                    else:
-                        X_, y_, = X_enn, y_enn
-                break
+            b_remove_maj_class = np.any(counts == 0)
 
-        X_resampled, y_resampled = X_, y_
+            if b_min_bec_maj or b_remove_maj_class:
+                break
 
-        if self.return_indices:
-            return X_resampled, y_resampled, idx_under
-        else:
-            return X_resampled, y_resampled
+            # the samples which had a removed neighbour are edited again
+            affected = np.unique(np.concatenate(
+                [_lookup_reverse_neighbors(neighbors, rows, removed)
+                 for neighbors, rows in reverse_neighbors]))
+            affected = affected[is_alive[affected] & ~is_outdated[affected]]
+            affected = affected[np.any(~is_alive[nnhood_idx[affected]],
+                                       axis=1)]
+            is_outdated[affected] = True
+            pending = np.union1d(pending[~is_edited], affected)
+
+            # the classes to edit are computed on the remaining samples
+            y_ = None
+            if callable(self.ratio):
+                y_ = safe_indexing(
+                    y, class_index.order[is_alive[class_index.order]])
+            ratio_ = _check_ratio(self.ratio, y_,
+                                  dict(zip(class_index.classes.tolist(),
+                                           counts.tolist())),
+                                  self._sampling_type)
+
+        idx_under = class_index.order[is_alive[class_index.order]]
+        return idx_under
 
 
 class AllKNN(BaseCleaningSampler):
@@ -505,6 +657,9 @@ class AllKNN(BaseCleaningSampler):
     -----
     The method is based on [1]_.
 
+    The neighbourhoods of increasing size are read from a single nearest
+    neighbours search of the largest neighbourhood.
+
     Supports mutli-class resampling. A one-vs.-rest scheme is used when
     sampling a class as proposed in [1]_.
 
@@ -568,84 +723,89 @@ AllKNN # doctest: +NORMALIZE_WHITESPACE
 
         self.nn_ = check_neighbors_object('n_neighbors', self.n_neighbors,
                                           additional_neighbor=1)
+        self.nn_.set_params(**{'n_jobs': self.n_jobs})
 
-        self.enn_ = EditedNearestNeighbours(ratio=self.ratio,
-                                            return_indices=self.return_indices,
-                                            n_neighbors=self.nn_,
-                                            kind_sel=self.kind_sel,
-                                            n_jobs=self.n_jobs)
-
-    def _sample(self, X, y):
-        """Resample the dataset.
+    def _sample_indices(self, X, y):
+        """Find the samples to keep.
 
         Parameters
         ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
             Matrix containing the data which have to be sampled.
 
-        y : array-like, shape (n_samples,)
+        y : ndarray, shape (n_samples,)
             Corresponding label for each sample in X.
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
-
-        idx_under : ndarray, shape (n_samples, )
-            If `return_indices` is `True`, a boolean array will be returned
-            containing the which samples have been selected.
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
 
         """
         self._validate_estimator()
 
-        X_, y_ = X, y
-        target_stats = Counter(y)
+        class_index = self._class_index
+        n_samples, n_classes = y.shape[0], len(class_index)
+        y_encoded = class_index.codes()
+        target_stats = class_index.target_stats()
         class_minority = min(target_stats, key=target_stats.get)
-
-        if self.return_indices:
-            idx_under = np.arange(X.shape[0], dtype=int)
-
-        for curr_size_ngh in range(1, self.nn_.n_neighbors):
-            self.enn_.n_neighbors = curr_size_ngh
-
-            if self.return_indices:
-                X_enn, y_enn, idx_enn = self.enn_.fit_sample(X_, y_)
-            else:
-                X_enn, y_enn = self.enn_.fit_sample(X_, y_)
+        is_minority = class_index.classes == class_minority
+        counts = class_index.counts.copy()
+
+        # the neighbourhoods of all sizes are read from a single list of
+        # candidates per sample. The removed samples, and the missing
+        # candidates flagged by the extra index ``n_samples``, are skipped.
+        max_neighbors = self.nn_.n_neighbors
+        n_candidates = min(n_samples, 2 * max_neighbors)
+        candidates = np.full((n_samples, n_candidates), n_samples,
+                             dtype=np.intp)
+        is_alive = np.ones(n_samples + 1, dtype=bool)
+        is_alive[-1] = False
+        ratio_ = self.ratio_
+
+        for curr_size_ngh in range(1, max_neighbors):
+            edited = np.concatenate(
+                [np.empty(0, dtype=np.intp)] +
+                [class_index.indices(target_class)
+                 for target_class in class_index.classes
+                 if target_class in ratio_.keys()])
+            edited = edited[is_alive[edited]]
+            nnhood_idx = _alive_neighbors(self.nn_, X, candidates, is_alive,
+                                          edited, curr_size_ngh)
+            is_kept = _edited_mask(y_encoded[nnhood_idx], y_encoded[edited],
+                                   n_classes, self.kind_sel)
+            removed = edited[~is_kept]
+            is_alive[removed] = False
+            counts -= np.bincount(y_encoded[removed], minlength=n_classes)
 
             # Check the stopping criterion
             # 1. If the number of samples in the other class become inferior to
             # the number of samples in the majority class
             # 2. If one of the class is disappearing
             # Case 1
-            stats_enn = Counter(y_enn)
-            count_non_min = np.array([
-                val for val, key in zip(stats_enn.values(), stats_enn.keys())
-                if key != class_minority
-            ])
-            b_min_bec_maj = np.any(count_non_min <
+            b_min_bec_maj = np.any(counts[(counts > 0) & ~is_minority] <
                                    target_stats[class_minority])
             if self.allow_minority:
                 # overwrite b_min_bec_maj
                 b_min_bec_maj = False
 
             # Case 2
-            b_remove_maj_class = (len(stats_enn) < len(target_stats))
-
-            X_, y_, = X_enn, y_enn
-            if self.return_indices:
-                idx_under = idx_under[idx_enn]
+            b_remove_maj_class = np.any(counts == 0)
 
             if b_min_bec_maj or b_remove_maj_class:
                 break
 
-        X_resampled, y_resampled = X_, y_
-
-        if self.return_indices:
-            return X_resampled, y_resampled, idx_under
-        else:
-            return X_resampled, y_resampled
+            # the classes to edit are computed on the remaining samples
+            y_ = None
+            if callable(self.ratio):
+                y_ = safe_indexing(
+                    y, class_index.order[is_alive[class_index.order]])
+            ratio_ = _check_ratio(self.ratio, y_,
+                                  dict(zip(class_index.classes.tolist(),
+                                           counts.tolist())),
+                                  self._sampling_type)
+
+        # the samples are grouped by class as returned by the edited nearest
+        # neighbours
+        idx_under = class_index.order[is_alive[class_index.order]]
+        return idx_under
@@ -8,8 +8,6 @@ threshold."""
 
 from __future__ import division
 
-from collections import Counter
-
 import numpy as np
 
 from sklearn.base import ClassifierMixin
@@ -137,30 +135,26 @@ class InstanceHardnessThreshold(BaseCleaningSampler):
             raise ValueError('Invalid parameter `estimator`. Got {}.'.format(
                 type(self.estimator)))
 
-    def _sample(self, X, y):
-        """Resample the dataset.
+    def _sample_indices(self, X, y):
+        """Find the samples to keep.
 
         Parameters
         ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
             Matrix containing the data which have to be sampled.
 
-        y : array-like, shape (n_samples,)
+        y : ndarray, shape (n_samples,)
             Corresponding label for each sample in X.
 
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
-
-        idx_under : ndarray, shape (n_samples, )
-            If `return_indices` is `True`, a boolean array will be returned
-            containing the which samples have been selected.
+        Returns
+        -------
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
 
         """
         self._validate_estimator()
 
-        target_stats = Counter(y)
+        class_index = self._class_index
         skf = StratifiedKFold(n_splits=self.cv, shuffle=False,
                               random_state=self.random_state).split(X, y)
         probabilities = np.zeros(y.shape[0], dtype=float)
@@ -175,30 +169,26 @@ class InstanceHardnessThreshold(BaseCleaningSampler):
 
             probs = self.estimator_.predict_proba(X_test)
             classes = self.estimator_.classes_
-            probabilities[test_index] = [
-                probs[l, np.where(classes == c)[0][0]]
-                for l, c in enumerate(y_test)
-            ]
+            classes_order = np.argsort(classes)
+            classes_position = classes_order[np.searchsorted(
+                classes, y_test, sorter=classes_order)]
+            probabilities[test_index] = probs[np.arange(y_test.size),
+                                              classes_position]
 
-        idx_under = np.empty((0, ), dtype=int)
+        idx_under = []
 
-        for target_class in np.unique(y):
+        for target_class in class_index.classes:
+            target_class_indices = class_index.indices(target_class)
             if target_class in self.ratio_.keys():
                 n_samples = self.ratio_[target_class]
+                probabilities_class = probabilities[target_class_indices]
                 threshold = np.percentile(
-                    probabilities[y == target_class],
-                    (1. - (n_samples / target_stats[target_class])) * 100.)
-                index_target_class = np.flatnonzero(
-                    probabilities[y == target_class] >= threshold)
-            else:
-                index_target_class = slice(None)
-
-            idx_under = np.concatenate(
-                (idx_under, np.flatnonzero(y == target_class)[
-                    index_target_class]), axis=0)
-
-        if self.return_indices:
-            return (safe_indexing(X, idx_under), safe_indexing(y, idx_under),
-                    idx_under)
-        else:
-            return safe_indexing(X, idx_under), safe_indexing(y, idx_under)
+                    probabilities_class,
+                    (1. - (n_samples / target_class_indices.size)) * 100.)
+                target_class_indices = target_class_indices[
+                    np.flatnonzero(probabilities_class >= threshold)]
+
+            idx_under.append(target_class_indices)
+        idx_under = np.concatenate(idx_under)
+
+        return idx_under
@@ -7,18 +7,22 @@
 from __future__ import division
 
 import warnings
-from collections import Counter
 
 import numpy as np
 
-from sklearn.utils import safe_indexing
+from sklearn.metrics.pairwise import pairwise_distances
+from sklearn.neighbors.base import NeighborsBase
+from sklearn.utils import gen_batches, safe_indexing
 
 from ..base import BaseUnderSampler
+from ...base import NeighborsGraphMixin
+from ...neighbors.cache import _ACTIVE_CACHES, _effective_metric
+from ...utils._chunk import get_chunk_n_rows
 from ...utils import check_neighbors_object
 from ...utils.deprecation import deprecate_parameter
 
 
-class NearMiss(BaseUnderSampler):
+class NearMiss(NeighborsGraphMixin, BaseUnderSampler):
     """Class to perform under-sampling based on NearMiss methods.
 
     Read more in the :ref:`User Guide <controlled_under_sampling>`.
@@ -128,32 +132,18 @@ NearMiss # doctest: +NORMALIZE_WHITESPACE
         self.n_neighbors_ver3 = n_neighbors_ver3
         self.n_jobs = n_jobs
 
-    def _selection_dist_based(self,
-                              X,
-                              y,
-                              dist_vec,
-                              num_samples,
-                              key,
+    def _selection_dist_based(self, dist_sum, num_samples,
                               sel_strategy='nearest'):
         """Select the appropriate samples depending of the strategy selected.
 
         Parameters
         ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
-            Original samples.
-
-        y : array-like, shape (n_samples,)
-            Associated label to X.
-
-        dist_vec : ndarray, shape (n_samples, )
-            The distance matrix to the nearest neigbour.
+        dist_sum : ndarray, shape (n_samples, )
+            The sum of the distances of each sample to its neighbours.
 
         num_samples: int
             The desired number of samples to select.
 
-        key : str or int,
-            The target class.
-
         sel_strategy : str, optional (default='nearest')
             Strategy to select the samples. Either 'nearest' or 'farthest'
 
@@ -163,41 +153,58 @@ NearMiss # doctest: +NORMALIZE_WHITESPACE
             The list of the indices of the selected samples.
 
         """
-
-        # Compute the distance considering the farthest neighbour
-        dist_avg_vec = np.sum(dist_vec[:, -self.nn_.n_neighbors:], axis=1)
-
-        target_class_indices = np.flatnonzero(y == key)
-        if (dist_vec.shape[0] != safe_indexing(X,
-                                               target_class_indices).shape[0]):
-            raise RuntimeError('The samples to be selected do not correspond'
-                               ' to the distance matrix given. Ensure that'
-                               ' both `X[y == key]` and `dist_vec` are'
-                               ' related.')
-
-        # Sort the list of distance and get the index
+        # the samples are ranked as with a stable sort: the samples at equal
+        # distance are kept in their original order
         if sel_strategy == 'nearest':
-            sort_way = False
+            key = dist_sum
         elif sel_strategy == 'farthest':
-            sort_way = True
+            key = -dist_sum
         else:
             raise NotImplementedError
 
-        sorted_idx = sorted(
-            range(len(dist_avg_vec)),
-            key=dist_avg_vec.__getitem__,
-            reverse=sort_way)
-
         # Throw a warning to tell the user that we did not have enough samples
         # to select and that we just select everything
-        if len(sorted_idx) < num_samples:
+        if key.size < num_samples:
             warnings.warn('The number of the samples to be selected is larger'
                           ' than the number of samples available. The'
                           ' balancing ratio cannot be ensure and all samples'
                           ' will be returned.')
-
-        # Select the desired number of samples
-        return sorted_idx[:num_samples]
+        if key.size <= num_samples:
+            return np.argsort(key, kind='mergesort')
+
+        # only the selected samples are sorted
+        threshold = np.partition(key, num_samples - 1)[num_samples - 1]
+        idx_below = np.flatnonzero(key < threshold)
+        idx_tie = np.flatnonzero(key == threshold)
+        idx_sel = np.concatenate(
+            (idx_below, idx_tie[:num_samples - idx_below.size]))
+        return idx_sel[np.lexsort((idx_sel, key[idx_sel]))]
+
+    def _farthest_dist_sum(self, X, fit_indices, query_indices):
+        """Sum of the distances of the queries to their farthest neighbours.
+
+        The distances to all the fitted samples are computed by chunks of
+        queries such that only a chunk of the distance matrix is kept in
+        memory.
+        """
+        n_fit = fit_indices.size
+        n_neighbors = min(self.nn_.n_neighbors, n_fit)
+        metric, metric_params = _effective_metric(self.nn_)
+        X_fit = safe_indexing(X, fit_indices)
+        dist_sum = np.empty(query_indices.size)
+        # the distances and their partition are stored for a chunk
+        chunk_n_rows = get_chunk_n_rows(row_bytes=2 * n_fit * 8,
+                                        max_n_rows=query_indices.size)
+        for batch in gen_batches(query_indices.size, chunk_n_rows):
+            dist = pairwise_distances(
+                safe_indexing(X, query_indices[batch]), X_fit, metric=metric,
+                n_jobs=self.n_jobs, **metric_params)
+            dist = np.partition(dist, n_fit - n_neighbors, axis=1)
+            # the distances are summed in increasing order as when they are
+            # given by kneighbors
+            dist_sum[batch] = np.sort(dist[:, n_fit - n_neighbors:],
+                                      axis=1).sum(axis=1)
+        return dist_sum
 
     def _validate_estimator(self):
         """Private function to create the NN estimator"""
@@ -245,55 +252,70 @@ NearMiss # doctest: +NORMALIZE_WHITESPACE
         """
         self._validate_estimator()
 
-        idx_under = np.empty((0, ), dtype=int)
+        class_index = self._class_index
+        idx_under = []
 
-        target_stats = Counter(y)
+        target_stats = class_index.target_stats()
         class_minority = min(target_stats, key=target_stats.get)
-        minority_class_indices = np.flatnonzero(y == class_minority)
-
-        self.nn_.fit(safe_indexing(X, minority_class_indices))
-
-        for target_class in np.unique(y):
+        minority_class_indices = class_index.indices(class_minority)
+        targeted_classes = [target_class
+                            for target_class in class_index.classes
+                            if target_class in self.ratio_.keys()]
+
+        # the samples of the targeted classes among which the selection is
+        # performed; NearMiss-3 keeps the nearest neighbours of the minority
+        # samples
+        candidates = {}
+        for target_class in targeted_classes:
+            target_class_indices = class_index.indices(target_class)
+            if self.version == 3:
+                idx_vec = self._kneighbors(
+                    self.nn_ver3_, X, fit_indices=target_class_indices,
+                    query_indices=minority_class_indices,
+                    return_distance=False)
+                candidates[target_class] = np.unique(idx_vec.reshape(-1))
+            else:
+                candidates[target_class] = np.arange(target_class_indices.size)
+
+        # the distances of the candidates of all targeted classes to the
+        # minority class are computed at once and the candidates of a class
+        # are contiguous
+        if targeted_classes:
+            query_indices = np.concatenate(
+                [class_index.indices(target_class)[candidates[target_class]]
+                 for target_class in targeted_classes])
+            if (self.version == 2 and self.neighbors_graph_ is None and
+                    not _ACTIVE_CACHES and
+                    isinstance(self.nn_, NeighborsBase)):
+                dist_sum = self._farthest_dist_sum(
+                    X, minority_class_indices, query_indices)
+            else:
+                n_neighbors = (target_stats[class_minority]
+                               if self.version == 2 else None)
+                dist_vec, _ = self._kneighbors(
+                    self.nn_, X, fit_indices=minority_class_indices,
+                    query_indices=query_indices, n_neighbors=n_neighbors)
+                # Compute the distance considering the farthest neighbour
+                dist_sum = np.sum(dist_vec[:, -self.nn_.n_neighbors:], axis=1)
+        offset = 0
+
+        for target_class in class_index.classes:
+            target_class_indices = class_index.indices(target_class)
             if target_class in self.ratio_.keys():
                 n_samples = self.ratio_[target_class]
-                target_class_indices = np.flatnonzero(y == target_class)
-                X_class = safe_indexing(X, target_class_indices)
-                y_class = safe_indexing(y, target_class_indices)
-
-                if self.version == 1:
-                    dist_vec, idx_vec = self.nn_.kneighbors(
-                        X_class, n_neighbors=self.nn_.n_neighbors)
-                    index_target_class = self._selection_dist_based(
-                        X, y, dist_vec, n_samples, target_class,
-                        sel_strategy='nearest')
-                elif self.version == 2:
-                    dist_vec, idx_vec = self.nn_.kneighbors(
-                        X_class, n_neighbors=target_stats[class_minority])
-                    index_target_class = self._selection_dist_based(
-                        X, y, dist_vec, n_samples, target_class,
-                        sel_strategy='nearest')
-                elif self.version == 3:
-                    self.nn_ver3_.fit(X_class)
-                    dist_vec, idx_vec = self.nn_ver3_.kneighbors(
-                        safe_indexing(X, minority_class_indices))
-                    idx_vec_farthest = np.unique(idx_vec.reshape(-1))
-                    X_class_selected = safe_indexing(X_class, idx_vec_farthest)
-                    y_class_selected = safe_indexing(y_class, idx_vec_farthest)
-
-                    dist_vec, idx_vec = self.nn_.kneighbors(
-                        X_class_selected, n_neighbors=self.nn_.n_neighbors)
-                    index_target_class = self._selection_dist_based(
-                        X_class_selected, y_class_selected, dist_vec,
-                        n_samples, target_class, sel_strategy='farthest')
-                    # idx_tmp is relative to the feature selected in the
-                    # previous step and we need to find the indirection
-                    index_target_class = idx_vec_farthest[index_target_class]
-            else:
-                index_target_class = slice(None)
-
-            idx_under = np.concatenate(
-                (idx_under, np.flatnonzero(y == target_class)[
-                    index_target_class]), axis=0)
+                idx_candidates = candidates[target_class]
+                dist_class = dist_sum[offset:offset + idx_candidates.size]
+                offset += idx_candidates.size
+                index_target_class = self._selection_dist_based(
+                    dist_class, n_samples,
+                    sel_strategy='farthest' if self.version == 3
+                    else 'nearest')
+                # the selected samples are relative to the candidates
+                target_class_indices = target_class_indices[
+                    idx_candidates[index_target_class]]
+
+            idx_under.append(target_class_indices)
+        idx_under = np.concatenate(idx_under)
 
         if self.return_indices:
             return (safe_indexing(X, idx_under), safe_indexing(y, idx_under),
@@ -6,15 +6,11 @@
 
 from __future__ import division, print_function
 
-from collections import Counter
-
 import numpy as np
-from scipy.stats import mode
-
-from sklearn.utils import safe_indexing
 
 from ..base import BaseCleaningSampler
-from .edited_nearest_neighbours import EditedNearestNeighbours
+from ...base import NeighborsGraphMixin
+from .edited_nearest_neighbours import _edited_mask
 from ...utils import check_neighbors_object
 from ...utils.deprecation import deprecate_parameter
 
@@ -22,7 +18,7 @@ from ...utils.deprecation import deprecate_parameter
 SEL_KIND = ('all', 'mode')
 
 
-class NeighbourhoodCleaningRule(BaseCleaningSampler):
+class NeighbourhoodCleaningRule(NeighborsGraphMixin, BaseCleaningSampler):
     """Class performing under-sampling based on the neighbourhood cleaning
     rule.
 
@@ -113,7 +109,7 @@ NeighbourhoodCleaningRule # doctest: +NORMALIZE_WHITESPACE
     >>> ncr = NeighbourhoodCleaningRule()
     >>> X_res, y_res = ncr.fit_sample(X, y)
     >>> print('Resampled dataset shape {}'.format(Counter(y_res)))
-    Resampled dataset shape Counter({1: 877, 0: 100})
+    Resampled dataset shape Counter({1: 871, 0: 100})
 
     """
 
@@ -152,78 +148,72 @@ NeighbourhoodCleaningRule # doctest: +NORMALIZE_WHITESPACE
                              " Got {} instead.".format(
                                  self.threshold_cleaning))
 
-    def _sample(self, X, y):
-        """Resample the dataset.
+    def _sample_indices(self, X, y):
+        """Find the samples to keep.
 
         Parameters
         ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
             Matrix containing the data which have to be sampled.
 
-        y : array-like, shape (n_samples,)
+        y : ndarray, shape (n_samples,)
             Corresponding label for each sample in X.
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
-
-        idx_under : ndarray, shape (n_samples, )
-            If `return_indices` is `True`, a boolean array will be returned
-            containing the which samples have been selected.
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
 
         """
         self._validate_estimator()
-        enn = EditedNearestNeighbours(ratio=self.ratio, return_indices=True,
-                                      n_neighbors=self.n_neighbors,
-                                      kind_sel='mode',
-                                      n_jobs=self.n_jobs)
-        _, _, index_not_a1 = enn.fit_sample(X, y)
-        index_a1 = np.ones(y.shape, dtype=bool)
-        index_a1[index_not_a1] = False
-        index_a1 = np.flatnonzero(index_a1)
+
+        class_index = self._class_index
+        y_encoded = class_index.codes()
+        n_classes = len(class_index)
+        target_stats = class_index.target_stats()
+        class_minority = np.searchsorted(
+            class_index.classes, min(target_stats, key=target_stats.get))
+        is_targeted = np.in1d(class_index.classes, list(self.ratio_.keys()))
+        # classes to consider for cleaning for the A2 group
+        is_cleaned = np.logical_and(
+            is_targeted,
+            class_index.counts > X.shape[0] * self.threshold_cleaning)
+
+        # the neighbours of the targeted classes, edited to find the A1
+        # group, and of the minority class, whose neighbourhood is cleaned to
+        # find the A2 group, are found at once
+        is_queried = is_targeted.copy()
+        is_queried[class_minority] = True
+        query_indices = class_index.order[
+            is_queried[y_encoded[class_index.order]]]
+        nnhood_idx = self._kneighbors(self.nn_, X,
+                                      query_indices=query_indices,
+                                      return_distance=False)[:, 1:]
+        y_query = y_encoded[query_indices]
+        is_removed = np.zeros(y.shape, dtype=bool)
+
+        # compute a1 group
+        is_a1_query = is_targeted[y_query]
+        is_removed[query_indices[is_a1_query]] = ~_edited_mask(
+            y_encoded[nnhood_idx[is_a1_query]], y_query[is_a1_query],
+            n_classes, 'mode')
 
         # clean the neighborhood
-        target_stats = Counter(y)
-        class_minority = min(target_stats, key=target_stats.get)
-        # compute which classes to consider for cleaning for the A2 group
-        classes_under_sample = [c for c, n_samples in target_stats.items()
-                                if (c in self.ratio_.keys() and
-                                    (n_samples > X.shape[0] *
-                                     self.threshold_cleaning))]
-        self.nn_.fit(X)
-        class_minority_indices = np.flatnonzero(y == class_minority)
-        X_class = safe_indexing(X, class_minority_indices)
-        y_class = safe_indexing(y, class_minority_indices)
-        nnhood_idx = self.nn_.kneighbors(
-            X_class, return_distance=False)[:, 1:]
-        nnhood_label = y[nnhood_idx]
+        is_minority = y_query == class_minority
+        nnhood_idx = nnhood_idx[is_minority]
         if self.kind_sel == 'mode':
-            nnhood_label_majority, _ = mode(nnhood_label, axis=1)
-            nnhood_bool = np.ravel(nnhood_label_majority) == y_class
+            nnhood_bool = _edited_mask(y_encoded[nnhood_idx],
+                                       y_query[is_minority], n_classes,
+                                       'mode')
         elif self.kind_sel == 'all':
-            nnhood_label_majority = nnhood_label == class_minority
-            nnhood_bool = np.all(nnhood_label, axis=1)
+            nnhood_bool = np.all(y_encoded[nnhood_idx] == class_minority,
+                                 axis=1)
         else:
             raise NotImplementedError
         # compute a2 group
         index_a2 = np.ravel(nnhood_idx[~nnhood_bool])
-        index_a2 = np.unique([index for index in index_a2
-                              if y[index] in classes_under_sample])
-
-        union_a1_a2 = np.union1d(index_a1, index_a2).astype(int)
-        selected_samples = np.ones(y.shape, dtype=bool)
-        selected_samples[union_a1_a2] = False
-        index_target_class = np.flatnonzero(selected_samples)
-
-        if self.return_indices:
-            return (safe_indexing(X, index_target_class),
-                    safe_indexing(y, index_target_class),
-                    index_target_class)
-        else:
-            return (safe_indexing(X, index_target_class),
-                    safe_indexing(y, index_target_class))
+        is_removed[index_a2[is_cleaned[y_encoded[index_a2]]]] = True
+
+        index_target_class = np.flatnonzero(~is_removed)
+
+        return index_target_class
@@ -6,13 +6,13 @@
 
 from __future__ import division
 
-from collections import Counter
-
 import numpy as np
-from sklearn.neighbors import KNeighborsClassifier
+from sklearn.neighbors import KNeighborsClassifier, NearestNeighbors
 from sklearn.utils import check_random_state, safe_indexing
 
 from ..base import BaseCleaningSampler
+from ...neighbors.cache import _kneighbors
+from .edited_nearest_neighbours import _edited_mask
 from .tomek_links import TomekLinks
 
 
@@ -132,47 +132,61 @@ KNeighborsClassifier(n_neighbors=1))
                              ' inhereited from KNeighborsClassifier.'
                              ' Got {} instead.'.format(type(self.n_neighbors)))
 
-    def _sample(self, X, y):
-        """Resample the dataset.
+    def _is_misclassified(self, C_x, C_y, S_x, S_y):
+        """Check which samples of S are misclassified by the estimator fitted
+        on C."""
+        self.estimator_.fit(C_x, C_y)
+        if (type(self.estimator_) is not KNeighborsClassifier or
+                self.estimator_.weights != 'uniform'):
+            return self.estimator_.predict(S_x) != S_y
+        # the prediction is the most common label among the neighbours, which
+        # are searched such that they can be served by a NeighborGraphCache
+        nn = NearestNeighbors()
+        nn_params = nn.get_params()
+        nn.set_params(**{key: value for key, value
+                         in self.estimator_.get_params().items()
+                         if key in nn_params})
+        nnhood_idx = _kneighbors(nn, C_x, X_query=S_x, return_distance=False)
+        classes, C_y_encoded = np.unique(C_y, return_inverse=True)
+        return ~_edited_mask(C_y_encoded[nnhood_idx],
+                             np.searchsorted(classes, S_y), classes.size,
+                             'mode')
+
+    def _sample_indices(self, X, y):
+        """Find the samples to keep.
 
         Parameters
         ----------
-        X : ndarray, shape (n_samples, n_features)
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
             Matrix containing the data which have to be sampled.
 
-        y : ndarray, shape (n_samples, )
+        y : ndarray, shape (n_samples,)
             Corresponding label for each sample in X.
 
         Returns
         -------
-        X_resampled : ndarray, shape (n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new)
-            The corresponding label of `X_resampled`
-
-        idx_under : ndarray, shape (n_samples, )
-            If `return_indices` is `True`, a boolean array will be returned
-            containing the which samples have been selected.
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples.
 
         """
         self._validate_estimator()
 
         random_state = check_random_state(self.random_state)
-        target_stats = Counter(y)
+        class_index = self._class_index
+        target_stats = class_index.target_stats()
         class_minority = min(target_stats, key=target_stats.get)
 
-        idx_under = np.empty((0, ), dtype=int)
+        idx_under = []
 
-        for target_class in np.unique(y):
+        for target_class in class_index.classes:
             if target_class in self.ratio_.keys():
                 # select a sample from the current class
-                idx_maj = np.flatnonzero(y == target_class)
+                idx_maj = class_index.indices(target_class)
                 idx_maj_sample = idx_maj[random_state.randint(
                         low=0, high=target_stats[target_class],
                         size=self.n_seeds_S)]
 
-                minority_class_indices = np.flatnonzero(y == class_minority)
+                minority_class_indices = class_index.indices(class_minority)
                 C_indices = np.append(minority_class_indices, idx_maj_sample)
 
                 # create the set composed of all minority samples and one
@@ -185,27 +199,17 @@ KNeighborsClassifier(n_neighbors=1))
                 idx_maj_extracted = np.delete(idx_maj, idx_maj_sample, axis=0)
                 S_x = safe_indexing(X, idx_maj_extracted)
                 S_y = safe_indexing(y, idx_maj_extracted)
-                self.estimator_.fit(C_x, C_y)
-                pred_S_y = self.estimator_.predict(S_x)
-
-                S_misclassified_indices = np.flatnonzero(pred_S_y != S_y)
+                S_misclassified_indices = np.flatnonzero(
+                    self._is_misclassified(C_x, C_y, S_x, S_y))
                 idx_tmp = idx_maj_extracted[S_misclassified_indices]
-                idx_under = np.concatenate(
-                    (idx_under, idx_maj_sample, idx_tmp), axis=0)
+                idx_under.extend((idx_maj_sample, idx_tmp))
             else:
-                idx_under = np.concatenate(
-                    (idx_under, np.flatnonzero(y == target_class)), axis=0)
-
-        X_resampled = safe_indexing(X, idx_under)
-        y_resampled = safe_indexing(y, idx_under)
+                idx_under.append(class_index.indices(target_class))
+        idx_under = np.concatenate(idx_under)
 
-        # apply Tomek cleaning
-        tl = TomekLinks(ratio=self.ratio_, return_indices=True)
-        X_cleaned, y_cleaned, idx_cleaned = tl.fit_sample(X_resampled,
-                                                          y_resampled)
+        # apply Tomek cleaning on the selected samples, given by their
+        # indices; the data are gathered once at the end
+        tl = TomekLinks(ratio=self.ratio_)
+        idx_cleaned = tl._fit_sample_indices(X, y, fit_indices=idx_under)
 
-        idx_under = safe_indexing(idx_under, idx_cleaned)
-        if self.return_indices:
-            return (X_cleaned, y_cleaned, idx_under)
-        else:
-            return X_cleaned, y_cleaned
+        return idx_under[idx_cleaned]
@@ -6,10 +6,100 @@
 
 from __future__ import division
 
+import hashlib
+import struct
+from numbers import Integral
+
 import numpy as np
-from sklearn.utils import check_random_state, safe_indexing
+from sklearn.externals import six
+from sklearn.utils import check_consistent_length, check_random_state
+from sklearn.utils import check_X_y, safe_indexing
 
 from ..base import BaseUnderSampler
+from ...utils._class_index import ClassIndex
+from ...utils.validation import _ratio_dict
+
+
+def _hash_uniform(keys, seed=0):
+    """Map each key to a pseudo-random number in [0, 1).
+
+    The numbers only depend on the keys and on ``seed``: they are identical
+    across processes, platforms and partitions of the keys. Integer keys are
+    hashed in a vectorized manner while the other keys are hashed from their
+    text representation.
+    """
+    keys = np.asarray(keys)
+    if keys.dtype.kind in 'biu':
+        hashes = keys.astype(np.uint64)
+    else:
+        hashes = np.array(
+            [struct.unpack('<Q', hashlib.md5(
+                six.text_type(key).encode('utf-8')).digest()[:8])[0]
+             for key in keys.ravel()], dtype=np.uint64)
+    # finalizer of the splitmix64 generator
+    with np.errstate(over='ignore'):
+        hashes = hashes + np.uint64(seed + 1) * np.uint64(0x9E3779B97F4A7C15)
+        hashes ^= hashes >> np.uint64(30)
+        hashes *= np.uint64(0xBF58476D1CE4E5B9)
+        hashes ^= hashes >> np.uint64(27)
+        hashes *= np.uint64(0x94D049BB133111EB)
+        hashes ^= hashes >> np.uint64(31)
+    return (hashes >> np.uint64(11)).astype(np.float64) * 2. ** -53
+
+
+class _ClassReservoir(object):
+    """Uniform sample without replacement of the stream of a class.
+
+    The reservoir keeps ``capacity`` samples using the algorithm R of
+    Vitter. All the samples are kept when ``capacity`` is None.
+    """
+
+    def __init__(self, capacity=None):
+        self.capacity = capacity
+        self.n_seen = 0
+        self._X, self._indices, self._label = [], [], None
+
+    def update(self, X_chunk, y_chunk, rows, offset, random_state):
+        """Offer the samples ``rows`` of a chunk starting at ``offset``."""
+        if self._label is None:
+            self._label = y_chunk[rows[:1]]
+            if self.capacity is not None:
+                self._X = np.empty((self.capacity, X_chunk.shape[1]),
+                                   dtype=X_chunk.dtype)
+                self._indices = np.empty(self.capacity, dtype=int)
+        # rank of the samples in the stream of the class
+        ranks = self.n_seen + np.arange(rows.size)
+        self.n_seen += rows.size
+
+        if self.capacity is None:
+            self._X.append(X_chunk[rows])
+            self._indices.append(rows + offset)
+            return
+
+        # the first samples fill the reservoir, the next ones replace a
+        # random slot with a probability capacity / (rank + 1)
+        slots = ranks.copy()
+        is_drawn = ranks >= self.capacity
+        slots[is_drawn] = np.floor(
+            random_state.uniform(size=np.count_nonzero(is_drawn)) *
+            (ranks[is_drawn] + 1)).astype(int)
+        is_kept = slots < self.capacity
+        slots, rows = slots[is_kept], rows[is_kept]
+        # a slot drawn several times keeps the last sample
+        _, last = np.unique(slots[::-1], return_index=True)
+        last = slots.size - 1 - last
+        self._X[slots[last]] = X_chunk[rows[last]]
+        self._indices[slots[last]] = rows[last] + offset
+
+    def sample(self):
+        """The samples kept, the labels and the indices in the stream."""
+        if self.capacity is None:
+            X, indices = np.vstack(self._X), np.concatenate(self._indices)
+        else:
+            n_kept = min(self.capacity, self.n_seen)
+            order = np.argsort(self._indices[:n_kept])
+            X, indices = self._X[order], self._indices[order]
+        return X, np.repeat(self._label, indices.size), indices
 
 
 class RandomUnderSampler(BaseUnderSampler):
@@ -52,10 +142,34 @@ class RandomUnderSampler(BaseUnderSampler):
     replacement : boolean, optional (default=False)
         Whether the sample is with or without replacement.
 
+    return_weights : bool, optional (default=False)
+        Whether or not to return the original data with the number of times
+        each sample is selected instead of the resampled data. The sample
+        weights reproduce the resampled data without copying the samples and
+        can be given as ``sample_weight`` to the ``fit`` method of most
+        estimators.
+
+    class_counts : dict or None, optional (default=None)
+        Number of samples of each class in the whole dataset when the
+        sampler is fitted on a shard of the dataset with ``sample_keys``.
+        ``ratio_`` is then computed from these counts instead of the counts
+        of the shard such that all shards use the same thresholds.
+
     Notes
     -----
     Supports mutli-class resampling by sampling each class independently.
 
+    When ``sample_keys`` are given to :meth:`fit`, the samples are selected
+    deterministically by comparing a hash of their key to a threshold: a
+    sample of the targeted class ``c`` is kept if the hash, mapped to
+    [0, 1), is lower than ``ratio_[c] / n_c`` with ``n_c`` the number of
+    samples of the class. The number of samples kept is therefore
+    ``ratio_[c]`` on average only. Since the selection of a sample does not
+    depend on the other samples, the shards of a dataset can be under-sampled
+    independently, with the same ``class_counts`` and integer
+    ``random_state``, and the union of the shards resampled is identical to
+    the whole dataset resampled.
+
     See
     :ref:`sphx_glr_auto_examples_plot_ratio_usage.py` and
     :ref:`sphx_glr_auto_examples_under-sampling_plot_random_under_sampler.py`
@@ -76,6 +190,12 @@ RandomUnderSampler # doctest: +NORMALIZE_WHITESPACE
     >>> X_res, y_res = rus.fit_sample(X, y)
     >>> print('Resampled dataset shape {}'.format(Counter(y_res)))
     Resampled dataset shape Counter({0: 100, 1: 100})
+    >>> rus = RandomUnderSampler(random_state=42, return_weights=True)
+    >>> X_res, y_res, sample_weight = rus.fit_sample(X, y)
+    >>> X_res.shape
+    (1000, 20)
+    >>> print('Number of samples kept {}'.format(sample_weight.sum()))
+    Number of samples kept 200
 
     """
 
@@ -83,11 +203,96 @@ RandomUnderSampler # doctest: +NORMALIZE_WHITESPACE
                  ratio='auto',
                  return_indices=False,
                  random_state=None,
-                 replacement=False):
+                 replacement=False,
+                 return_weights=False,
+                 class_counts=None):
         super(RandomUnderSampler, self).__init__(ratio=ratio)
         self.random_state = random_state
         self.return_indices = return_indices
         self.replacement = replacement
+        self.return_weights = return_weights
+        self.class_counts = class_counts
+
+    def fit(self, X, y, sample_keys=None):
+        """Find the classes statistics before to perform sampling.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        sample_keys : array-like, shape (n_samples,), optional (default=None)
+            Key identifying each sample, e.g. an ID column. If given, the
+            samples are selected deterministically from a hash of their key
+            instead of being drawn at random.
+
+        Returns
+        -------
+        self : object,
+            Return self.
+
+        """
+        self.sample_keys_ = self._check_sample_keys(y, sample_keys)
+        return super(RandomUnderSampler, self).fit(X, y)
+
+    def fit_sample(self, X, y, sample_keys=None):
+        """Fit the statistics and resample the data directly.
+
+        Parameters
+        ----------
+        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+            Matrix containing the data which have to be sampled.
+
+        y : array-like, shape (n_samples,)
+            Corresponding label for each sample in X.
+
+        sample_keys : array-like, shape (n_samples,), optional (default=None)
+            Key identifying each sample. See :meth:`fit`.
+
+        Returns
+        -------
+        X_resampled : {array-like, sparse matrix}, shape \
+(n_samples_new, n_features)
+            The array containing the resampled data.
+
+        y_resampled : array-like, shape (n_samples_new,)
+            The corresponding label of `X_resampled`
+
+        """
+        self.sample_keys_ = self._check_sample_keys(y, sample_keys)
+        return super(RandomUnderSampler, self).fit_sample(X, y)
+
+    def _check_sample_keys(self, y, sample_keys):
+        if sample_keys is None:
+            return None
+        check_consistent_length(y, sample_keys)
+        if self.replacement:
+            raise ValueError("The samples cannot be selected from their key"
+                             " with replacement.")
+        if not (self.random_state is None or
+                isinstance(self.random_state, Integral)):
+            raise ValueError("The samples selected from their key are only"
+                             " reproducible with an integer 'random_state'."
+                             " Got {} instead.".format(self.random_state))
+        return np.asarray(sample_keys)
+
+    def _target_stats(self):
+        """Number of samples of each class used to compute ``ratio_``."""
+        target_stats = super(RandomUnderSampler, self)._target_stats()
+        if self.sample_keys_ is None or self.class_counts is None:
+            return target_stats
+        for target_class, n_samples in target_stats.items():
+            if self.class_counts.get(target_class, 0) < n_samples:
+                raise ValueError("'class_counts' should contain at least the"
+                                 " number of samples of each class of 'y'."
+                                 " Got {} instead of {} samples for the class"
+                                 " {}.".format(
+                                     self.class_counts.get(target_class, 0),
+                                     n_samples, target_class))
+        return dict(self.class_counts)
 
     def _sample(self, X, y):
         """Resample the dataset.
@@ -114,27 +319,119 @@ RandomUnderSampler # doctest: +NORMALIZE_WHITESPACE
             containing a boolean for each sample to represent whether
             that sample was selected or not.
 
+        sample_weight : ndarray, shape (n_samples,)
+            If `return_weights` is `True`, ``X`` and ``y`` are returned
+            unchanged in place of the resampled data together with the number
+            of times each sample is selected. The weights are returned before
+            `idx_under`.
+
         """
         random_state = check_random_state(self.random_state)
 
-        idx_under = np.empty((0, ), dtype=int)
+        class_index = self._class_index
+        idx_under = []
+        if self.sample_keys_ is not None:
+            target_stats = self._target_stats()
+            hashes = _hash_uniform(self.sample_keys_,
+                                   seed=self.random_state or 0)
 
-        for target_class in np.unique(y):
+        for target_class in class_index.classes:
+            target_class_indices = class_index.indices(target_class)
             if target_class in self.ratio_.keys():
-                n_samples = self.ratio_[target_class]
-                index_target_class = random_state.choice(
-                    range(np.count_nonzero(y == target_class)),
-                    size=n_samples,
-                    replace=self.replacement)
-            else:
-                index_target_class = slice(None)
-
-            idx_under = np.concatenate(
-                (idx_under, np.flatnonzero(y == target_class)[
-                    index_target_class]), axis=0)
+                if self.sample_keys_ is not None:
+                    threshold = (self.ratio_[target_class] /
+                                 target_stats[target_class])
+                    target_class_indices = target_class_indices[
+                        hashes[target_class_indices] < threshold]
+                else:
+                    target_class_indices = target_class_indices[
+                        random_state.choice(target_class_indices.size,
+                                            size=self.ratio_[target_class],
+                                            replace=self.replacement)]
 
+            idx_under.append(target_class_indices)
+        idx_under = np.concatenate(idx_under)
+
+        if self.return_weights:
+            sample_weight = np.bincount(idx_under, minlength=y.shape[0])
+            if self.return_indices:
+                return X, y, sample_weight, idx_under
+            return X, y, sample_weight
         if self.return_indices:
             return (safe_indexing(X, idx_under), safe_indexing(y, idx_under),
                     idx_under)
         else:
             return safe_indexing(X, idx_under), safe_indexing(y, idx_under)
+
+    def fit_sample_chunks(self, chunks):
+        """Fit the statistics and resample a stream of chunks in one pass.
+
+        The data is read once and only the selected samples are kept in
+        memory: a reservoir of ``ratio[target_class]`` samples is drawn
+        uniformly without replacement from each targeted class while all the
+        samples of the other classes are kept. Therefore, ``ratio`` has to be
+        a ``dict`` and ``replacement`` has to be ``False``.
+
+        Parameters
+        ----------
+        chunks : iterable of tuple
+            Iterable yielding the tuples ``(X_chunk, y_chunk)`` where
+            ``X_chunk`` is an ndarray of shape (n_samples_chunk, n_features)
+            and ``y_chunk`` the corresponding labels.
+
+        Returns
+        -------
+        X_resampled : ndarray, shape (n_samples_new, n_features)
+            The array containing the resampled data.
+
+        y_resampled : ndarray, shape (n_samples_new,)
+            The corresponding label of `X_resampled`
+
+        idx_under : ndarray, shape (n_samples_new, )
+            If `return_indices` is `True`, an array will be returned
+            containing the indices of the selected samples in the stream.
+
+        """
+        if not isinstance(self.ratio, dict):
+            raise ValueError("When resampling a stream of chunks, 'ratio' has"
+                             " to be a dictionary. Got {} instead.".format(
+                                 type(self.ratio)))
+        if self.replacement or self.return_weights:
+            raise ValueError("A stream of chunks can only be resampled"
+                             " without replacement and without returning"
+                             " the sample weights.")
+        random_state = check_random_state(self.random_state)
+
+        reservoirs = {}
+        n_samples = 0
+        for X_chunk, y_chunk in chunks:
+            X_chunk, y_chunk = check_X_y(X_chunk, y_chunk)
+            class_index = ClassIndex(y_chunk)
+            for target_class in class_index.classes:
+                if target_class not in reservoirs:
+                    capacity = self.ratio.get(target_class)
+                    reservoirs[target_class] = _ClassReservoir(
+                        None if capacity is None else max(capacity, 0))
+                reservoirs[target_class].update(
+                    X_chunk, y_chunk, class_index.indices(target_class),
+                    n_samples, random_state)
+            n_samples += y_chunk.size
+
+        if len(reservoirs) <= 1:
+            raise ValueError("The target 'y' needs to have more than 1 class."
+                             " Got {} class instead".format(len(reservoirs)))
+        self.ratio_ = _ratio_dict(
+            self.ratio, {target_class: reservoir.n_seen for target_class,
+                         reservoir in reservoirs.items()}, 'under-sampling')
+
+        X_resampled, y_resampled, idx_under = zip(*[
+            reservoirs[target_class].sample()
+            for target_class in sorted(reservoirs)])
+        X_resampled = np.vstack(X_resampled)
+        y_resampled = np.concatenate(y_resampled)
+        idx_under = np.concatenate(idx_under)
+
+        if self.return_indices:
+            return X_resampled, y_resampled, idx_under
+        else:
+            return X_resampled, y_resampled
@@ -6,13 +6,14 @@
 from __future__ import print_function
 
 import numpy as np
+import pytest
 from pytest import raises
 
 from sklearn.utils.testing import assert_allclose, assert_array_equal
 from sklearn.neighbors import NearestNeighbors
 from sklearn.datasets import make_classification
 
-from imblearn.under_sampling import AllKNN
+from imblearn.under_sampling import AllKNN, EditedNearestNeighbours
 from imblearn.utils.testing import warns
 
 
@@ -182,3 +183,26 @@ def test_deprecation_random_state():
     with warns(DeprecationWarning,
                match="'random_state' is deprecated from 0.4"):
         allknn.fit_sample(X, Y)
+
+
+@pytest.mark.parametrize("kind_sel", ['all', 'mode'])
+def test_allknn_equals_enn_of_increasing_size(kind_sel):
+    # the neighbourhoods of all sizes are read from a single search
+    rng = np.random.RandomState(0)
+    X = rng.randn(2000, 2)
+    y = (X[:, 0] + 0.5 * rng.randn(2000) > -1).astype(int)
+    allknn = AllKNN(ratio='majority', n_neighbors=6, kind_sel=kind_sel,
+                    return_indices=True)
+    X_resampled, y_resampled, idx_under = allknn.fit_sample(X, y)
+
+    idx_enn = np.arange(y.size)
+    for n_neighbors in range(1, 7):
+        enn = EditedNearestNeighbours(ratio='majority',
+                                      n_neighbors=n_neighbors,
+                                      kind_sel=kind_sel, return_indices=True)
+        _, _, idx = enn.fit_sample(X[idx_enn], y[idx_enn])
+        idx_enn = idx_enn[idx]
+    assert idx_enn.size < y.size
+    assert_array_equal(idx_under, idx_enn)
+    assert_array_equal(X_resampled, X[idx_enn])
+    assert_array_equal(y_resampled, y[idx_enn])
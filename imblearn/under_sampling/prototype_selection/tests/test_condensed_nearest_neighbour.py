@@ -6,9 +6,12 @@
 from __future__ import print_function
 
 import numpy as np
+import pytest
 from sklearn.utils.testing import assert_array_equal
 from pytest import raises
 
+from sklearn.datasets import make_classification
+from sklearn.metrics import pairwise_distances
 from sklearn.neighbors import KNeighborsClassifier
 
 from imblearn.under_sampling import CondensedNearestNeighbour
@@ -89,3 +92,44 @@ def test_cnn_fit_sample_with_wrong_object():
     cnn = CondensedNearestNeighbour(random_state=RND_SEED, n_neighbors=knn)
     with raises(ValueError, match="has to be a int or an "):
         cnn.fit_sample(X, Y)
+
+
+@pytest.mark.parametrize("n_neighbors", [None,
+                                         KNeighborsClassifier(1, p=1)])
+def test_cnn_condense_equals_refitting_estimator(n_neighbors):
+    X, y = make_classification(n_samples=300, n_classes=3, n_informative=4,
+                               weights=[0.2, 0.3, 0.5], flip_y=0.1,
+                               random_state=0)
+    cnn = CondensedNearestNeighbour(n_neighbors=n_neighbors, n_seeds_S=3,
+                                    random_state=RND_SEED)
+    cnn.fit(X, y)
+    cnn._validate_estimator()
+    # visit the samples in several batches
+    cnn._batch_size = 16
+    idx_min = np.flatnonzero(y == 0)
+    for target_class in (1, 2):
+        idx_maj = np.flatnonzero(y == target_class)
+        idx_maj_sample = idx_maj[[0, 5, 5]]
+        idx_condensed = cnn._condense(X, idx_maj, idx_maj_sample, idx_min)
+        assert idx_condensed.size > idx_maj_sample.size
+        assert_array_equal(idx_condensed, cnn._condense_estimator(
+            X, y, idx_maj, idx_maj_sample, idx_min))
+
+
+def test_cnn_condensed_store_classifies_class():
+    # the samples of a class which are not added to the store are classified
+    # correctly by the store with the 1-NN rule
+    X, y = make_classification(n_samples=300, n_classes=3, n_informative=4,
+                               weights=[0.2, 0.3, 0.5], flip_y=0.1,
+                               random_state=0)
+    cnn = CondensedNearestNeighbour(n_seeds_S=5, random_state=RND_SEED,
+                                    return_indices=True)
+    _, y_res, idx_under = cnn.fit_sample(X, y)
+    idx_min = np.flatnonzero(y == 0)
+    for target_class in (1, 2):
+        idx_store = idx_under[y_res == target_class]
+        idx_class = np.setdiff1d(np.flatnonzero(y == target_class),
+                                 idx_store)
+        dist_store = pairwise_distances(X[idx_class], X[idx_store]).min(1)
+        dist_min = pairwise_distances(X[idx_class], X[idx_min]).min(1)
+        assert np.all(dist_store < dist_min)
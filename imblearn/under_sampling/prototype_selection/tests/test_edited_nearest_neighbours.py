@@ -6,13 +6,17 @@
 from __future__ import print_function
 
 import numpy as np
+import pytest
 from pytest import raises
+from scipy.stats import mode
 
 from sklearn.utils.testing import assert_array_equal
 
 from sklearn.neighbors import NearestNeighbors
 
 from imblearn.under_sampling import EditedNearestNeighbours
+from imblearn.under_sampling.prototype_selection.edited_nearest_neighbours \
+    import _edited_mask
 from imblearn.utils.testing import warns
 
 X = np.array([[2.59928271, 0.93323465], [0.25738379, 0.95564169],
@@ -111,3 +115,18 @@ def test_deprecation_random_state():
     with warns(DeprecationWarning,
                match="'random_state' is deprecated from 0.4"):
         enn.fit_sample(X, Y)
+
+
+@pytest.mark.parametrize("chunk_size", [1, 10, 2 ** 20])
+def test_edited_mask(chunk_size):
+    rng = np.random.RandomState(0)
+    nnhood_label = rng.randint(0, 4, size=(100, 4))
+    y_query = rng.randint(0, 4, size=100)
+    is_kept = _edited_mask(nnhood_label, y_query, 4, 'mode',
+                           chunk_size=chunk_size)
+    assert_array_equal(is_kept, np.ravel(mode(nnhood_label, axis=1)[0]) ==
+                       y_query)
+    is_kept = _edited_mask(nnhood_label, y_query, 4, 'all',
+                           chunk_size=chunk_size)
+    assert_array_equal(is_kept, np.all(nnhood_label == y_query[:, None],
+                                       axis=1))
@@ -8,9 +8,11 @@ from __future__ import print_function
 import numpy as np
 from pytest import raises
 
+from sklearn.datasets import make_classification
 from sklearn.utils.testing import assert_array_equal
 from sklearn.neighbors import NearestNeighbors
 
+from imblearn.neighbors import NeighborGraphCache
 from imblearn.under_sampling import NearMiss
 from imblearn.utils.testing import warns
 
@@ -237,3 +239,28 @@ def test_deprecation_random_state():
     with warns(DeprecationWarning,
                match="'random_state' is deprecated from 0.4"):
         nm.fit_sample(X, Y)
+
+
+def test_nm_selection_dist_based_ties():
+    nm = NearMiss()
+    dist_sum = np.array([2., 1., 3., 1., 2., 0.5, 2.])
+    # the samples at equal distance are selected in their original order
+    assert_array_equal(nm._selection_dist_based(dist_sum, 4), [5, 1, 3, 0])
+    assert_array_equal(nm._selection_dist_based(dist_sum, 3, 'farthest'),
+                       [2, 0, 4])
+    with warns(UserWarning, match="balancing ratio cannot be ensure"):
+        idx_sel = nm._selection_dist_based(dist_sum, 10)
+    assert_array_equal(idx_sel, [5, 1, 3, 0, 4, 6, 2])
+
+
+def test_nm2_chunked_farthest_distances(monkeypatch):
+    X, y = make_classification(n_samples=300, n_classes=3, n_informative=4,
+                               weights=[0.2, 0.3, 0.5], random_state=0)
+    nm = NearMiss(version=2, return_indices=True)
+    _, _, idx_under = nm.fit_sample(X, y)
+    # the neighbours of all the minority samples are searched when the
+    # nearest neighbours graphs are cached
+    with NeighborGraphCache():
+        assert_array_equal(nm.fit_sample(X, y)[2], idx_under)
+    monkeypatch.setattr('imblearn.utils._chunk.WORKING_MEMORY', 1e-4)
+    assert_array_equal(nm.fit_sample(X, y)[2], idx_under)
@@ -7,9 +7,11 @@ import numpy as np
 from pytest import raises
 
 from sklearn.utils.testing import assert_array_equal
+from sklearn.datasets import make_classification
 from sklearn.neighbors import NearestNeighbors
 
-from imblearn.under_sampling import NeighbourhoodCleaningRule
+from imblearn.under_sampling import (EditedNearestNeighbours,
+                                     NeighbourhoodCleaningRule)
 from imblearn.utils.testing import warns
 
 X = np.array([[1.57737838, 0.1997882], [0.8960075, 0.46130762],
@@ -74,6 +76,27 @@ def test_ncr_fit_sample_mode():
     assert_array_equal(y_resampled, y_gt)
 
 
+def test_ncr_kind_sel_all():
+    # a minority sample is misclassified as soon as one of its neighbours
+    # does not belong to the minority class
+    X_clf, y_clf = make_classification(n_samples=300, weights=[0.1, 0.9],
+                                       random_state=0)
+    _, _, idx_enn = EditedNearestNeighbours(
+        kind_sel='mode', return_indices=True).fit_sample(X_clf, y_clf)
+    idx_minority = np.flatnonzero(y_clf == 0)
+    nnhood_idx = NearestNeighbors(n_neighbors=4).fit(X_clf).kneighbors(
+        X_clf[idx_minority], return_distance=False)[:, 1:]
+    index_a2 = nnhood_idx[np.any(y_clf[nnhood_idx] != 0, axis=1)].ravel()
+    index_a2 = index_a2[y_clf[index_a2] == 1]
+    is_kept = np.zeros(y_clf.shape, dtype=bool)
+    is_kept[idx_enn] = True
+    is_kept[index_a2] = False
+
+    ncr = NeighbourhoodCleaningRule(kind_sel='all', return_indices=True)
+    _, _, idx_under = ncr.fit_sample(X_clf, y_clf)
+    assert_array_equal(idx_under, np.flatnonzero(is_kept))
+
+
 def test_ncr_fit_sample_with_indices():
     ncr = NeighbourhoodCleaningRule(return_indices=True)
     X_resampled, y_resampled, idx_under = ncr.fit_sample(X, Y)
@@ -92,3 +92,27 @@ def test_oss_with_wrong_object():
     oss = OneSidedSelection(random_state=RND_SEED, n_neighbors=knn)
     with raises(ValueError, match="has to be a int"):
         oss.fit_sample(X, Y)
+
+
+class ConstantKNeighborsClassifier(KNeighborsClassifier):
+    def predict(self, X):
+        return np.full(X.shape[0], self.classes_[0])
+
+
+def test_oss_estimator():
+    oss = OneSidedSelection(random_state=RND_SEED)
+    oss.fit_sample(X, Y)
+    # the estimator is fitted on the last set C
+    assert oss.estimator_.predict(X).shape == Y.shape
+
+    # the prediction of a subclass of KNeighborsClassifier is used
+    oss = OneSidedSelection(random_state=RND_SEED, return_indices=True,
+                            n_neighbors=ConstantKNeighborsClassifier(1))
+    _, y_resampled, _ = oss.fit_sample(X, Y)
+    assert_array_equal(np.unique(y_resampled), np.unique(Y))
+    # all the samples of the majority class apart from the seed are
+    # misclassified and kept before the cleaning with the Tomek links
+    oss_default = OneSidedSelection(random_state=RND_SEED)
+    _, y_default = oss_default.fit_sample(X, Y)
+    assert np.count_nonzero(y_resampled == 1) > np.count_nonzero(
+        y_default == 1)
@@ -8,7 +8,8 @@ from __future__ import print_function
 from collections import Counter
 
 import numpy as np
-from sklearn.utils.testing import assert_array_equal
+import pytest
+from sklearn.utils.testing import assert_allclose, assert_array_equal
 
 from imblearn.under_sampling import RandomUnderSampler
 
@@ -81,3 +82,127 @@ def test_multiclass_fit_sample():
     assert count_y_res[0] == 2
     assert count_y_res[1] == 2
     assert count_y_res[2] == 2
+
+
+@pytest.mark.parametrize("replacement", [False, True])
+def test_rus_return_weights(replacement):
+    rus = RandomUnderSampler(ratio={0: 3, 1: 6}, random_state=RND_SEED,
+                             replacement=replacement, return_indices=True)
+    _, y_resampled, idx_under = rus.fit_sample(X, Y)
+    rus.set_params(return_weights=True)
+    X_weighted, y_weighted, sample_weight, idx_weighted = rus.fit_sample(X, Y)
+    assert X_weighted is X
+    assert_array_equal(y_weighted, Y)
+    assert_array_equal(idx_weighted, idx_under)
+    assert_array_equal(sample_weight, np.bincount(idx_under, minlength=10))
+    assert sample_weight.sum() == y_resampled.size
+    if not replacement:
+        assert sample_weight.max() == 1
+
+
+def _iter_chunks(X, y, chunk_size):
+    for start in range(0, y.size, chunk_size):
+        yield X[start:start + chunk_size], y[start:start + chunk_size]
+
+
+@pytest.mark.parametrize("chunk_size", [1, 3, 10])
+def test_rus_fit_sample_chunks(chunk_size):
+    rus = RandomUnderSampler(ratio={0: 2, 1: 3}, random_state=RND_SEED,
+                             return_indices=True)
+    X_resampled, y_resampled, idx_under = rus.fit_sample_chunks(
+        _iter_chunks(X, Y, chunk_size))
+    assert rus.ratio_ == {0: 2, 1: 3}
+    assert Counter(y_resampled) == {0: 2, 1: 3}
+    assert_array_equal(X_resampled, X[idx_under])
+    assert_array_equal(y_resampled, Y[idx_under])
+    # same selection for the same seed
+    X_resampled_2, _ = RandomUnderSampler(
+        ratio={0: 2, 1: 3}, random_state=RND_SEED).fit_sample_chunks(
+            _iter_chunks(X, Y, chunk_size))
+    assert_array_equal(X_resampled, X_resampled_2)
+
+
+def test_rus_fit_sample_chunks_uniform():
+    # each sample of a class is kept with the same probability
+    y = np.array([0] * 20 + [1] * 4)
+    X = np.arange(y.size).reshape(-1, 1)
+    n_draws = 2000
+    counts = np.zeros(y.size)
+    for seed in range(n_draws):
+        rus = RandomUnderSampler(ratio={0: 5}, random_state=seed,
+                                 return_indices=True)
+        _, y_resampled, idx_under = rus.fit_sample_chunks(
+            _iter_chunks(X, y, 3))
+        assert Counter(y_resampled) == {0: 5, 1: 4}
+        counts[idx_under] += 1
+    assert_allclose(counts[:20] / n_draws, 0.25, atol=0.04)
+    assert_array_equal(counts[20:], n_draws)
+
+
+def test_rus_fit_sample_chunks_error():
+    with pytest.raises(ValueError, match="has to be a dictionary"):
+        RandomUnderSampler().fit_sample_chunks(_iter_chunks(X, Y, 3))
+    with pytest.raises(ValueError, match="without replacement"):
+        RandomUnderSampler(ratio={0: 2}, replacement=True).fit_sample_chunks(
+            _iter_chunks(X, Y, 3))
+    with pytest.raises(ValueError, match="should be less or equal"):
+        RandomUnderSampler(ratio={0: 4}).fit_sample_chunks(
+            _iter_chunks(X, Y, 3))
+    with pytest.raises(ValueError, match="not present in the data"):
+        RandomUnderSampler(ratio={2: 1}).fit_sample_chunks(
+            _iter_chunks(X, Y, 3))
+    with pytest.raises(ValueError, match="more than 1 class"):
+        RandomUnderSampler(ratio={1: 1}).fit_sample_chunks(
+            _iter_chunks(X[Y == 1], Y[Y == 1], 3))
+
+
+def test_rus_sample_keys_shards():
+    rng = np.random.RandomState(RND_SEED)
+    y = rng.choice(3, size=3000, p=[0.1, 0.3, 0.6])
+    X = rng.randn(y.size, 2)
+    sample_keys = rng.permutation(10 * y.size)[:y.size]
+    rus = RandomUnderSampler(random_state=RND_SEED, return_indices=True)
+    X_resampled, y_resampled, idx_under = rus.fit_sample(
+        X, y, sample_keys=sample_keys)
+    assert_array_equal(X_resampled, X[idx_under])
+    # the number of samples kept is only correct on average
+    n_minority = np.count_nonzero(y == 0)
+    assert all(abs(count - n_minority) < 0.1 * n_minority
+               for count in Counter(y_resampled).values())
+
+    # the shards resampled independently give the same samples
+    class_counts = dict(Counter(y))
+    idx_shards = []
+    for shard in np.array_split(rng.permutation(y.size), 5):
+        rus_shard = RandomUnderSampler(random_state=RND_SEED,
+                                       return_indices=True,
+                                       class_counts=class_counts)
+        _, _, idx_shard = rus_shard.fit_sample(
+            X[shard], y[shard], sample_keys=sample_keys[shard])
+        assert rus_shard.ratio_ == rus.ratio_
+        idx_shards.append(shard[idx_shard])
+    assert_array_equal(np.sort(np.concatenate(idx_shards)), np.sort(idx_under))
+
+    # the selection depends on the keys and on the seed only
+    string_keys = np.array(['row-{}'.format(key) for key in sample_keys])
+    _, _, idx_string = rus.fit_sample(X, y, sample_keys=string_keys)
+    _, _, idx_string_2 = rus.fit_sample(X, y, sample_keys=list(string_keys))
+    assert_array_equal(idx_string, idx_string_2)
+    rus.set_params(random_state=RND_SEED + 1)
+    _, _, idx_seed = rus.fit_sample(X, y, sample_keys=sample_keys)
+    assert not np.array_equal(idx_seed, idx_under)
+
+
+def test_rus_sample_keys_error():
+    sample_keys = np.arange(Y.size)
+    with pytest.raises(ValueError, match="inconsistent numbers of samples"):
+        RandomUnderSampler().fit_sample(X, Y, sample_keys=sample_keys[:5])
+    with pytest.raises(ValueError, match="with replacement"):
+        RandomUnderSampler(replacement=True).fit_sample(
+            X, Y, sample_keys=sample_keys)
+    with pytest.raises(ValueError, match="integer 'random_state'"):
+        RandomUnderSampler(random_state=np.random.RandomState(0)).fit_sample(
+            X, Y, sample_keys=sample_keys)
+    with pytest.raises(ValueError, match="'class_counts' should contain"):
+        RandomUnderSampler(class_counts={0: 3, 1: 2}).fit_sample(
+            X, Y, sample_keys=sample_keys)
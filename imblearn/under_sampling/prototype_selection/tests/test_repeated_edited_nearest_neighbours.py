@@ -6,11 +6,13 @@
 from __future__ import print_function
 
 import numpy as np
+import pytest
 from pytest import raises
 
 from sklearn.utils.testing import assert_array_equal
 from sklearn.neighbors import NearestNeighbors
 
+from imblearn.under_sampling import EditedNearestNeighbours
 from imblearn.under_sampling import RepeatedEditedNearestNeighbours
 from imblearn.utils.testing import warns
 
@@ -183,3 +185,48 @@ def test_deprecation_random_state():
     with warns(DeprecationWarning,
                match="'random_state' is deprecated from 0.4"):
         renn.fit_sample(X, Y)
+
+
+@pytest.mark.parametrize("kind_sel", ['all', 'mode'])
+def test_renn_equals_repeated_enn(kind_sel):
+    # the samples are edited again only when their neighbourhood changed
+    rng = np.random.RandomState(0)
+    X = rng.randn(2000, 2)
+    y = (X[:, 0] + 0.5 * rng.randn(2000) > -1).astype(int)
+    renn = RepeatedEditedNearestNeighbours(ratio='majority',
+                                           kind_sel=kind_sel,
+                                           return_indices=True)
+    X_resampled, y_resampled, idx_under = renn.fit_sample(X, y)
+
+    enn = EditedNearestNeighbours(ratio='majority', kind_sel=kind_sel,
+                                  return_indices=True)
+    idx_enn = np.arange(y.size)
+    for _ in range(renn.max_iter):
+        _, _, idx = enn.fit_sample(X[idx_enn], y[idx_enn])
+        if idx.size == idx_enn.size:
+            break
+        idx_enn = idx_enn[idx]
+    assert idx_enn.size < y.size
+    assert_array_equal(idx_under, idx_enn)
+    assert_array_equal(X_resampled, X[idx_enn])
+    assert_array_equal(y_resampled, y[idx_enn])
+
+
+def test_renn_search_neighbors_once():
+    # the neighbours are read from a single search on the full data set as
+    # long as the samples have enough remaining neighbours
+    class CountingNearestNeighbors(NearestNeighbors):
+        def fit(self, X, y=None):
+            n_samples_fit.append(X.shape[0])
+            return super(CountingNearestNeighbors, self).fit(X)
+
+    n_samples_fit = []
+    rng = np.random.RandomState(0)
+    X = rng.randn(2000, 2)
+    y = (X[:, 0] + 0.5 * rng.randn(2000) > -1).astype(int)
+    renn = RepeatedEditedNearestNeighbours(
+        ratio='majority', kind_sel='mode',
+        n_neighbors=CountingNearestNeighbors(n_neighbors=4))
+    X_resampled, _ = renn.fit_sample(X, y)
+    assert X_resampled.shape[0] < X.shape[0]
+    assert n_samples_fit == [X.shape[0]]
@@ -9,6 +9,7 @@ import numpy as np
 from sklearn.utils.testing import assert_array_equal
 
 from imblearn.under_sampling import TomekLinks
+from imblearn.under_sampling.prototype_selection import tomek_links
 from imblearn.utils.testing import warns
 
 
@@ -74,3 +75,34 @@ def test_deprecation_random_state():
     with warns(DeprecationWarning,
                match="'random_state' is deprecated from 0.4"):
         tl.fit_sample(X, Y)
+
+
+def test_is_tomek():
+    y = np.array(['a', 'a', 'b', 'b', 'c', 'a', 'c'])
+    # 0-2 and 3-4 are mutual neighbours of different classes, 1-5 of the same
+    # class and 6 is not the nearest neighbour of its nearest neighbour
+    nn_index = np.array([2, 5, 0, 4, 3, 1, 3])
+    links_gt = np.array([True, False, True, True, True, False, False])
+    assert_array_equal(TomekLinks.is_tomek(y, nn_index, ['a', 'b', 'c']),
+                       links_gt)
+    assert_array_equal(TomekLinks.is_tomek(y, nn_index, {'b': 2}),
+                       np.logical_and(links_gt, y == 'b'))
+    assert_array_equal(TomekLinks.is_tomek(y, nn_index, 'c'),
+                       np.logical_and(links_gt, y == 'c'))
+
+
+def test_is_tomek_blocks(monkeypatch):
+    monkeypatch.setattr(tomek_links, 'TOMEK_BATCH_SIZE', 3)
+    idx_under = TomekLinks(n_jobs=2, return_indices=True).fit_sample(X, Y)[2]
+    assert_array_equal(idx_under, np.array(
+        [0, 1, 2, 3, 4, 5, 6, 7, 8, 9, 11, 12, 13, 16, 17, 18, 19]))
+
+
+def test_tl_fit_sample_indices_subset():
+    # the samples given by their indices are resampled as if gathered
+    fit_indices = np.array([14, 3, 3, 0, 7, 9, 12, 1, 5, 10, 11])
+    idx_subset = TomekLinks()._fit_sample_indices(X[fit_indices],
+                                                  Y[fit_indices])
+    idx_fit_indices = TomekLinks()._fit_sample_indices(
+        X, Y, fit_indices=fit_indices)
+    assert_array_equal(idx_fit_indices, idx_subset)
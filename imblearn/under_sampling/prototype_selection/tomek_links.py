@@ -8,14 +8,30 @@
 from __future__ import division, print_function
 
 import numpy as np
+from sklearn.externals.joblib import Parallel, delayed
 from sklearn.neighbors import NearestNeighbors
-from sklearn.utils import safe_indexing
+from sklearn.utils import gen_batches
 
 from ..base import BaseCleaningSampler
+from ...base import NeighborsGraphMixin
 from ...utils.deprecation import deprecate_parameter
 
 
-class TomekLinks(BaseCleaningSampler):
+TOMEK_BATCH_SIZE = 2 ** 16
+
+
+def _tomek_links(y, nn_index, is_targeted, rows, links):
+    """Find the Tomek links of a block of samples.
+
+    There is a Tomek link between two samples of different classes if they
+    are both nearest neighbors of each others.
+    """
+    neighbors = nn_index[rows]
+    links[rows] = (is_targeted[rows] & (y[neighbors] != y[rows]) &
+                   (nn_index[neighbors] == np.arange(rows.start, rows.stop)))
+
+
+class TomekLinks(NeighborsGraphMixin, BaseCleaningSampler):
     """Class to perform under-sampling by removing Tomek's links.
 
     Read more in the :ref:`User Guide <tomek_links>`.
@@ -102,7 +118,7 @@ TomekLinks # doctest: +NORMALIZE_WHITESPACE
         self.n_jobs = n_jobs
 
     @staticmethod
-    def is_tomek(y, nn_index, class_type):
+    def is_tomek(y, nn_index, class_type, n_jobs=1):
         """is_tomek uses the target vector and the first neighbour of every
         sample point and looks for Tomek pairs. Returning a boolean vector with
         True for majority Tomek links.
@@ -116,8 +132,11 @@ TomekLinks # doctest: +NORMALIZE_WHITESPACE
         nn_index : ndarray, shape (len(y), )
             The index of the closes nearest neighbour to a sample point.
 
-        class_type : int or str
-            The label of the minority class.
+        class_type : int, str, list or dict
+            The label of the classes which can be part of a Tomek link.
+
+        n_jobs : int, optional (default=1)
+            The number of threads processing the blocks of samples.
 
         Returns
         -------
@@ -126,46 +145,61 @@ TomekLinks # doctest: +NORMALIZE_WHITESPACE
             that are Tomek links.
 
         """
+        y = np.asarray(y)
+        nn_index = np.asarray(nn_index)
+        if isinstance(class_type, dict):
+            class_type = list(class_type)
+        is_targeted = np.in1d(y, class_type)
         links = np.zeros(len(y), dtype=bool)
 
-        # find which class to not consider
-        class_excluded = [c for c in np.unique(y) if c not in class_type]
+        Parallel(n_jobs=n_jobs, backend='threading')(
+            delayed(_tomek_links)(y, nn_index, is_targeted, rows, links)
+            for rows in gen_batches(len(y), TOMEK_BATCH_SIZE))
 
-        # there is a Tomek link between two samples if they are both nearest
-        # neighbors of each others.
-        for index_sample, target_sample in enumerate(y):
-            if target_sample in class_excluded:
-                continue
+        return links
 
-            if y[nn_index[index_sample]] != target_sample:
-                if nn_index[nn_index[index_sample]] == index_sample:
-                    links[index_sample] = True
+    def _fit_sample_indices(self, X, y, neighbors_graph=None,
+                            fit_indices=None):
+        """Fit the statistics and find the samples to keep.
 
-        return links
+        If ``fit_indices`` is given, only these samples of the validated data
+        ``X`` and ``y`` are resampled and the positions in ``fit_indices`` of
+        the samples to keep are returned. The samples are gathered to fit the
+        nearest neighbours but the resampled data are not built. See
+        :meth:`fit` for the other parameters.
+        """
+        if fit_indices is None:
+            return super(TomekLinks, self)._fit_sample_indices(
+                X, y, neighbors_graph=neighbors_graph)
+        if neighbors_graph is not None:
+            raise ValueError("A neighbors graph cannot be given with"
+                             " 'fit_indices'.")
+        self.X_hash_ = self.y_hash_ = None
+        self.neighbors_graph_ = None
+        y = y[fit_indices]
+
+        return self._fit(X, y)._sample_indices(X, y, fit_indices=fit_indices)
 
-    def _sample(self, X, y):
-        """Resample the dataset.
+    def _sample_indices(self, X, y, fit_indices=None):
+        """Find the samples to keep.
 
         Parameters
         ----------
-        X : {array-like, sparse matrix}, shape (n_samples, n_features)
+        X : {ndarray, sparse matrix}, shape (n_samples, n_features)
             Matrix containing the data which have to be sampled.
 
-        y : array-like, shape (n_samples,)
-            Corresponding label for each sample in X.
+        y : ndarray, shape (n_samples,)
+            Corresponding label for each sample in X, or for each sample of
+            ``fit_indices`` if given.
+
+        fit_indices : ndarray, shape (n_samples_fit,), optional (default=None)
+            The indices of the samples of ``X`` to resample. By default, all
+            the samples.
 
         Returns
         -------
-        X_resampled : {ndarray, sparse matrix}, shape \
-(n_samples_new, n_features)
-            The array containing the resampled data.
-
-        y_resampled : ndarray, shape (n_samples_new,)
-            The corresponding label of `X_resampled`
-
-        idx_under : ndarray, shape (n_samples, )
-            If `return_indices` is `True`, a boolean array will be returned
-            containing the which samples have been selected.
+        idx_under : ndarray, shape (n_samples_new,)
+            The indices of the selected samples, in ``fit_indices`` if given.
 
         """
         # check for deprecated random_state
@@ -174,16 +208,10 @@ TomekLinks # doctest: +NORMALIZE_WHITESPACE
 
         # Find the nearest neighbour of every point
         nn = NearestNeighbors(n_neighbors=2, n_jobs=self.n_jobs)
-        nn.fit(X)
-        nns = nn.kneighbors(X, return_distance=False)[:, 1]
+        nns = self._kneighbors(nn, X, fit_indices=fit_indices,
+                               return_distance=False)[:, 1]
 
-        links = self.is_tomek(y, nns, self.ratio_)
+        links = self.is_tomek(y, nns, self.ratio_, n_jobs=self.n_jobs)
         idx_under = np.flatnonzero(np.logical_not(links))
 
-        if self.return_indices:
-            return (safe_indexing(X, idx_under),
-                    safe_indexing(y, idx_under),
-                    idx_under)
-        else:
-            return (safe_indexing(X, idx_under),
-                    safe_indexing(y, idx_under))
+        return idx_under
@@ -0,0 +1,42 @@
+"""Utilities to process arrays by chunks within a bounded memory budget."""
+
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+from __future__ import division
+
+# Default working memory (in MiB) allowed for the temporary arrays created
+# while processing a chunk of rows.
+WORKING_MEMORY = 64
+
+
+def get_chunk_n_rows(row_bytes, max_n_rows=None, working_memory=None):
+    """Compute the number of rows which can be processed within a chunk.
+
+    Parameters
+    ----------
+    row_bytes : int
+        The expected number of bytes of memory consumed when processing one
+        row.
+
+    max_n_rows : int or None, optional (default=None)
+        The maximum number of rows to return.
+
+    working_memory : int or None, optional (default=None)
+        The amount of memory (in MiB) allowed for a chunk. If ``None``,
+        ``WORKING_MEMORY`` is used.
+
+    Returns
+    -------
+    chunk_n_rows : int
+        The number of rows to process at once. At least one row is returned
+        even if it does not fit in ``working_memory``.
+
+    """
+    if working_memory is None:
+        working_memory = WORKING_MEMORY
+
+    chunk_n_rows = int(working_memory * (2 ** 20) // max(row_bytes, 1))
+    if max_n_rows is not None:
+        chunk_n_rows = min(chunk_n_rows, max_n_rows)
+    return max(chunk_n_rows, 1)
@@ -0,0 +1,74 @@
+"""Index of the samples grouped by class."""
+
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+import numpy as np
+
+
+class ClassIndex(object):
+    """Indices of the samples of each class.
+
+    The index is built with a single stable sort of the target such that the
+    samples of a class are contiguous and kept in their original order.
+    Looking up the samples of a class then costs a slice instead of a scan of
+    the whole target, which matters when the number of classes is large.
+
+    Parameters
+    ----------
+    y : ndarray, shape (n_samples,)
+        The target array.
+
+    Attributes
+    ----------
+    classes : ndarray, shape (n_classes,)
+        The sorted classes.
+
+    counts : ndarray, shape (n_classes,)
+        The number of samples in each class.
+
+    order : ndarray, shape (n_samples,)
+        The indices of the samples sorted by class.
+
+    offsets : ndarray, shape (n_classes + 1,)
+        The samples of the class ``classes[i]`` are
+        ``order[offsets[i]:offsets[i + 1]]``.
+
+    """
+
+    def __init__(self, y):
+        y = np.asarray(y)
+        self.order = np.argsort(y, kind='mergesort')
+        y_sorted = y[self.order]
+        is_start = np.ones(y.size, dtype=bool)
+        is_start[1:] = y_sorted[1:] != y_sorted[:-1]
+        starts = np.flatnonzero(is_start)
+        self.classes = y_sorted[starts]
+        self.offsets = np.append(starts, y.size)
+        self.counts = np.diff(self.offsets)
+        self._position = {target_class: position for position, target_class
+                          in enumerate(self.classes)}
+
+    def __len__(self):
+        return self.classes.size
+
+    def indices(self, target_class):
+        """Indices of the samples of a class, in increasing order."""
+        position = self._position[target_class]
+        return self.order[self.offsets[position]:self.offsets[position + 1]]
+
+    def codes(self):
+        """Position in ``classes`` of the class of each sample."""
+        codes = np.empty(self.order.size, dtype=np.intp)
+        codes[self.order] = np.repeat(np.arange(len(self)), self.counts)
+        return codes
+
+    def target_stats(self):
+        """Number of samples of each class.
+
+        The classes are ordered by first appearance in the target, as with
+        ``Counter(y)``.
+        """
+        appearance = np.argsort(self.order[self.offsets[:-1]])
+        return dict(zip(self.classes[appearance].tolist(),
+                        self.counts[appearance].tolist()))
@@ -45,6 +45,8 @@ def _yield_sampler_checks(name, Estimator):
     yield check_samplers_ratio_fit_sample
     yield check_samplers_sparse
     yield check_samplers_pandas
+    yield check_samplers_iter_sample
+    yield check_samplers_preserve_dtype
 
 
 def _yield_all_checks(name, Estimator):
@@ -254,3 +256,45 @@ def check_samplers_pandas(name, Sampler):
         X_res, y_res = sampler.fit_sample(X, y)
         assert_allclose(X_res_pd, X_res)
         assert_allclose(y_res_pd, y_res)
+
+
+def check_samplers_iter_sample(name, Sampler):
+    # check that stacking the batches of over-samplers gives the same data
+    # than the materialized resampling
+    if not issubclass(Sampler, BaseOverSampler):
+        return
+    X, y = make_classification(n_samples=1000, n_classes=3,
+                               n_informative=4, weights=[0.2, 0.3, 0.5],
+                               random_state=0)
+    for X_ in (X, sparse.csr_matrix(X)):
+        sampler = Sampler()
+        set_random_state(sampler)
+        X_res, y_res = sampler.fit_sample(X_, y)
+        batches = list(sampler.fit_sample_batches(X_, y, batch_size=128))
+        assert all(X_batch.shape[0] == 128 for X_batch, _ in batches[:-1])
+        if sparse.issparse(X_):
+            X_batches = sparse.vstack([X_batch for X_batch, _ in batches])
+            X_batches, X_res = X_batches.toarray(), X_res.toarray()
+        else:
+            X_batches = np.vstack([X_batch for X_batch, _ in batches])
+        assert X_batches.dtype == X_res.dtype
+        assert np.array_equal(X_batches, X_res)
+        assert np.array_equal(np.hstack([y_batch for _, y_batch in batches]),
+                              y_res)
+
+
+def check_samplers_preserve_dtype(name, Sampler):
+    # check that the resampled data have the same dtype than the input data
+    X, y = make_classification(n_samples=1000, n_classes=3,
+                               n_informative=4, weights=[0.2, 0.3, 0.5],
+                               random_state=0)
+    for dtype in (np.float32, np.float64):
+        for X_ in (X.astype(dtype), sparse.csr_matrix(X, dtype=dtype)):
+            sampler = Sampler()
+            set_random_state(sampler)
+            X_res, y_res = sampler.fit_sample(X_, y)
+            if isinstance(sampler, BaseEnsembleSampler):
+                assert all(X_subset.dtype == dtype for X_subset in X_res)
+            else:
+                assert X_res.dtype == dtype
+            assert y_res.dtype == y.dtype
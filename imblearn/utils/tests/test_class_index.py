@@ -0,0 +1,29 @@
+"""Test the module class index."""
+# Authors: Guillaume Lemaitre <g.lemaitre58@gmail.com>
+# License: MIT
+
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from sklearn.utils.testing import assert_array_equal
+
+from imblearn.utils._class_index import ClassIndex
+
+
+@pytest.mark.parametrize(
+    "y",
+    [np.array([2, 0, 1, 2, 2, 0, 1, 2]),
+     np.array(['b', 'a', 'c', 'a', 'b', 'b']),
+     np.random.RandomState(0).randint(0, 1000, size=5000)])
+def test_class_index(y):
+    class_index = ClassIndex(y)
+    assert_array_equal(class_index.classes, np.unique(y))
+    assert len(class_index) == np.unique(y).size
+    for target_class, count in zip(class_index.classes, class_index.counts):
+        assert_array_equal(class_index.indices(target_class),
+                           np.flatnonzero(y == target_class))
+        assert count == np.count_nonzero(y == target_class)
+    assert class_index.target_stats() == Counter(y)
+    assert_array_equal(class_index.classes[class_index.codes()], y)
@@ -10,7 +10,9 @@ from sklearn.externals.six.moves import cStringIO as StringIO
 from sklearn.base import BaseEstimator, ClassifierMixin
 from sklearn.utils.validation import check_X_y, check_array
 
+from imblearn.over_sampling.base import BaseOverSampler
 from imblearn.utils.estimator_checks import check_estimator
+from imblearn.utils.estimator_checks import check_samplers_preserve_dtype
 
 
 class CorrectNotFittedError(ValueError):
@@ -94,6 +96,11 @@ class CorrectNotFittedErrorClassifier(BaseBadClassifier):
         return np.ones(X.shape[0])
 
 
+class UpcastSampler(BaseOverSampler):
+    def _sample(self, X, y):
+        return X.astype(np.float64), y
+
+
 def test_check_estimator():
     # tests that the estimator actually fails on "bad" estimators.
     # not a complete test of all checks, which are very extensive.
@@ -151,3 +158,8 @@ def test_check_estimator():
     finally:
         sys.stdout = old_stdout
     assert msg in string_buffer.getvalue()
+
+
+def test_check_samplers_preserve_dtype():
+    with raises(AssertionError):
+        check_samplers_preserve_dtype('UpcastSampler', UpcastSampler)
@@ -7,13 +7,16 @@ from collections import Counter
 
 import numpy as np
 from pytest import raises
+from scipy import sparse
 
 from sklearn.neighbors.base import KNeighborsMixin
 from sklearn.neighbors import NearestNeighbors
 from sklearn.utils import check_random_state
 from sklearn.externals import joblib
 
+import imblearn
 from imblearn.utils.testing import warns
+from imblearn.utils import check_neighbors_graph
 from imblearn.utils import check_neighbors_object
 from imblearn.utils import check_ratio
 from imblearn.utils import hash_X_y
@@ -35,6 +38,18 @@ def test_check_neighbors_object():
         check_neighbors_object(name, n_neighbors)
 
 
+def test_check_neighbors_graph():
+    assert check_neighbors_graph(None, 10) is None
+    graph = check_neighbors_graph(sparse.eye(10, format='coo') * 0.5, 10)
+    assert sparse.isspmatrix_csr(graph)
+    with raises(ValueError, match="should be a sparse matrix"):
+        check_neighbors_graph(np.eye(10), 10)
+    with raises(ValueError, match="should be of shape"):
+        check_neighbors_graph(sparse.eye(10) * 0.5, 5)
+    with raises(ValueError, match="Got a connectivity graph"):
+        check_neighbors_graph(sparse.eye(10), 10)
+
+
 def test_check_ratio_error():
     with raises(ValueError, match="'sampling_type' should be one of"):
         check_ratio('auto', np.array([1, 2, 3]), 'rnd')
@@ -182,3 +197,25 @@ def test_hash_X_y():
     y = np.array([0] * 2 + [1] * 3)
     # all data will be used in this case
     assert hash_X_y(X, y) == (joblib.hash(X), joblib.hash(y))
+
+
+def test_hash_X_y_method():
+    rng = check_random_state(0)
+    X = rng.randn(200, 20)
+    y = np.array([0] * 50 + [1] * 150)
+    for X_ in (X, sparse.csr_matrix(X), sparse.csc_matrix(X)):
+        for method in ('strided', 'address', 'full'):
+            X_hash, y_hash = hash_X_y(X_, y, method=method)
+            assert (X_hash, y_hash) == hash_X_y(X_, y, method=method)
+            X_modified = X_.copy()
+            X_modified[0, 0] += 1
+            assert hash_X_y(X_modified, y, method=method)[0] != X_hash
+    # modifying the data in place is not detected from the address only
+    X_hash = hash_X_y(X, y, method='address')
+    X[0, 0] += 1
+    assert hash_X_y(X, y, method='address') == X_hash
+    assert hash_X_y(X, y, method='full') == (joblib.hash(X), joblib.hash(y))
+    with imblearn.config_context(fingerprint='full'):
+        assert hash_X_y(X, y) == hash_X_y(X, y, method='full')
+    with raises(ValueError, match="'method' should be one of"):
+        hash_X_y(X, y, method='md5')
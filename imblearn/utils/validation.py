@@ -5,17 +5,20 @@
 from __future__ import division
 
 import warnings
-from collections import Counter
 from numbers import Integral
 
 import numpy as np
+from scipy import sparse
 
 from sklearn.neighbors.base import KNeighborsMixin
 from sklearn.neighbors import NearestNeighbors
 from sklearn.externals import six, joblib
+from sklearn.utils import check_array
 from sklearn.utils.multiclass import type_of_target
 
+from .._config import FINGERPRINT_KIND, get_config
 from ..exceptions import raise_isinstance_error
+from ._class_index import ClassIndex
 
 SAMPLING_KIND = ('over-sampling', 'under-sampling', 'clean-sampling',
                  'ensemble')
@@ -54,6 +57,44 @@ def check_neighbors_object(nn_name, nn_object, additional_neighbor=0):
         raise_isinstance_error(nn_name, [int, KNeighborsMixin], nn_object)
 
 
+def check_neighbors_graph(neighbors_graph, n_samples):
+    """Check a precomputed nearest neighbours graph.
+
+    Parameters
+    ----------
+    neighbors_graph : sparse matrix, shape (n_samples, n_samples) or None
+        The graph to be checked. The stored entries of a row are the
+        distances from the sample to its nearest neighbours, i.e. the graph
+        is built with ``mode='distance'``. A connectivity graph, whose
+        entries are all ones, is rejected.
+
+    n_samples : int
+        The number of samples of the data described by the graph.
+
+    Returns
+    -------
+    neighbors_graph : csr_matrix, shape (n_samples, n_samples) or None
+        The graph in CSR format.
+
+    """
+    if neighbors_graph is None:
+        return None
+    if not sparse.issparse(neighbors_graph):
+        raise ValueError("'neighbors_graph' should be a sparse matrix. Got {}"
+                         " instead.".format(type(neighbors_graph)))
+    neighbors_graph = check_array(neighbors_graph, accept_sparse='csr')
+    if neighbors_graph.shape != (n_samples, n_samples):
+        raise ValueError("'neighbors_graph' should be of shape {}. Got {}"
+                         " instead.".format((n_samples, n_samples),
+                                            neighbors_graph.shape))
+    if neighbors_graph.nnz and np.all(neighbors_graph.data == 1):
+        raise ValueError("'neighbors_graph' should contain the distances to"
+                         " the nearest neighbours, e.g. computed with"
+                         " mode='distance'. Got a connectivity graph"
+                         " instead.")
+    return neighbors_graph
+
+
 def check_target_type(y):
     """Check the target types to be conform to the current samplers.
 
@@ -79,22 +120,49 @@ def check_target_type(y):
     return y
 
 
-def hash_X_y(X, y, n_samples=10, n_features=5):
+def _buffer_address(array):
+    """Memory address, shape, strides and type of the buffer of an array."""
+    array = np.asarray(array)
+    return (array.__array_interface__['data'][0], array.shape, array.strides,
+            array.dtype.str)
+
+
+def _is_same_buffer(array, array_input):
+    """Check that validating ``array_input`` did not copy its data."""
+    if sparse.issparse(array):
+        return array is array_input
+    return (isinstance(array_input, np.ndarray) and
+            _buffer_address(array)[0] == _buffer_address(array_input)[0])
+
+
+def hash_X_y(X, y, n_samples=10, n_features=5, method=None):
     """Compute hash of the input arrays.
 
     Parameters
     ----------
-    X : ndarray, shape (n_samples, n_features)
+    X : {ndarray, sparse matrix}, shape (n_samples, n_features)
         The ``X`` array.
 
     y : ndarray, shape (n_samples)
         The ``y`` array.
 
     n_samples : int, optional
-        The number of samples to use to compute the hash. Default is 100.
+        The number of samples to use to compute the hash. Default is 10.
 
     n_features : int, optional
-        The number of features to use to compute the hash. Default is 10.
+        The number of features to use to compute the hash. Default is 5.
+
+    method : str, optional (default=None)
+        The fingerprinting method:
+
+        - If ``'strided'``, hash ``n_samples`` samples and ``n_features``
+          features taken with a stride. For a CSR or CSC matrix, strided
+          subsets of its buffers are hashed instead of a submatrix;
+        - If ``'address'``, use the memory address, shape, strides and type
+          of the buffers without reading them;
+        - If ``'full'``, hash all the data.
+
+        By default, the method set with :func:`imblearn.set_config` is used.
 
     Returns
     -------
@@ -103,15 +171,41 @@ def hash_X_y(X, y, n_samples=10, n_features=5):
     y_hash: str
         Hash identifier of the ``y`` matrix.
     """
+    if method is None:
+        method = get_config()['fingerprint']
+    if method not in FINGERPRINT_KIND:
+        raise ValueError("'method' should be one of {}. Got '{}' instead."
+                         .format(FINGERPRINT_KIND, method))
+
+    if method == 'full':
+        return joblib.hash(X), joblib.hash(y)
+
+    is_compressed = sparse.isspmatrix_csr(X) or sparse.isspmatrix_csc(X)
+    if method == 'address':
+        if is_compressed:
+            X_address = (X.format, X.shape, _buffer_address(X.data),
+                         _buffer_address(X.indices),
+                         _buffer_address(X.indptr))
+        else:
+            X_address = _buffer_address(X)
+        return repr(X_address), repr(_buffer_address(y))
+
     row_idx = slice(None, None, max(1, X.shape[0] // n_samples))
-    col_idx = slice(None, None, max(1, X.shape[1] // n_features))
+    if is_compressed:
+        # avoid building a submatrix by hashing the buffers directly
+        data_idx = slice(None, None, max(1, X.nnz // (n_samples * n_features)))
+        indptr_idx = slice(None, None, max(1, X.indptr.size // n_samples))
+        X_hash = joblib.hash((X.format, X.shape, X.data[data_idx],
+                              X.indices[data_idx], X.indptr[indptr_idx]))
+    else:
+        col_idx = slice(None, None, max(1, X.shape[1] // n_features))
+        X_hash = joblib.hash(X[row_idx, col_idx])
 
-    return joblib.hash(X[row_idx, col_idx]), joblib.hash(y[row_idx])
+    return X_hash, joblib.hash(y[row_idx])
 
 
-def _ratio_all(y, sampling_type):
+def _ratio_all(target_stats, sampling_type):
     """Returns ratio by targeting all classes."""
-    target_stats = Counter(y)
     if sampling_type == 'over-sampling':
         n_sample_majority = max(target_stats.values())
         ratio = {key: n_sample_majority - value
@@ -126,14 +220,13 @@ def _ratio_all(y, sampling_type):
     return ratio
 
 
-def _ratio_majority(y, sampling_type):
+def _ratio_majority(target_stats, sampling_type):
     """Returns ratio by targeting the majority class only."""
     if sampling_type == 'over-sampling':
         raise ValueError("'ratio'='majority' cannot be used with"
                          " over-sampler.")
     elif (sampling_type == 'under-sampling' or
           sampling_type == 'clean-sampling'):
-        target_stats = Counter(y)
         class_majority = max(target_stats, key=target_stats.get)
         n_sample_minority = min(target_stats.values())
         ratio = {key: n_sample_minority
@@ -145,9 +238,8 @@ def _ratio_majority(y, sampling_type):
     return ratio
 
 
-def _ratio_not_minority(y, sampling_type):
+def _ratio_not_minority(target_stats, sampling_type):
     """Returns ratio by targeting all classes but not the minority."""
-    target_stats = Counter(y)
     if sampling_type == 'over-sampling':
         n_sample_majority = max(target_stats.values())
         class_minority = min(target_stats, key=target_stats.get)
@@ -167,9 +259,8 @@ def _ratio_not_minority(y, sampling_type):
     return ratio
 
 
-def _ratio_minority(y, sampling_type):
+def _ratio_minority(target_stats, sampling_type):
     """Returns ratio by targeting the minority class only."""
-    target_stats = Counter(y)
     if sampling_type == 'over-sampling':
         n_sample_majority = max(target_stats.values())
         class_minority = min(target_stats, key=target_stats.get)
@@ -186,19 +277,18 @@ def _ratio_minority(y, sampling_type):
     return ratio
 
 
-def _ratio_auto(y, sampling_type):
+def _ratio_auto(target_stats, sampling_type):
     """Returns ratio auto for over-sampling and not-minority for
     under-sampling."""
     if sampling_type == 'over-sampling':
-        return _ratio_all(y, sampling_type)
+        return _ratio_all(target_stats, sampling_type)
     elif (sampling_type == 'under-sampling' or
           sampling_type == 'clean-sampling'):
-        return _ratio_not_minority(y, sampling_type)
+        return _ratio_not_minority(target_stats, sampling_type)
 
 
-def _ratio_dict(ratio, y, sampling_type):
+def _ratio_dict(ratio, target_stats, sampling_type):
     """Returns ratio by converting the dictionary depending of the sampling."""
-    target_stats = Counter(y)
     # check that all keys in ratio are also in y
     set_diff_ratio_target = set(ratio.keys()) - set(target_stats.keys())
     if len(set_diff_ratio_target) > 0:
@@ -294,13 +384,19 @@ def check_ratio(ratio, y, sampling_type, **kwargs):
         number of samples.
 
     """
+    return _check_ratio(ratio, y, ClassIndex(y).target_stats(), sampling_type,
+                        **kwargs)
+
+
+def _check_ratio(ratio, y, target_stats, sampling_type, **kwargs):
+    """Ratio validation using the number of samples of each class."""
     if sampling_type not in SAMPLING_KIND:
         raise ValueError("'sampling_type' should be one of {}. Got '{}'"
                          " instead.".format(SAMPLING_KIND, sampling_type))
 
-    if np.unique(y).size <= 1:
+    if len(target_stats) <= 1:
         raise ValueError("The target 'y' needs to have more than 1 class."
-                         " Got {} class instead".format(np.unique(y).size))
+                         " Got {} class instead".format(len(target_stats)))
 
     if sampling_type == 'ensemble':
         return ratio
@@ -310,12 +406,12 @@ def check_ratio(ratio, y, sampling_type, **kwargs):
             raise ValueError("When 'ratio' is a string, it needs to be one of"
                              " {}. Got '{}' instead.".format(RATIO_KIND,
                                                              ratio))
-        return RATIO_KIND[ratio](y, sampling_type)
+        return RATIO_KIND[ratio](target_stats, sampling_type)
     elif isinstance(ratio, dict):
-        return _ratio_dict(ratio, y, sampling_type)
+        return _ratio_dict(ratio, target_stats, sampling_type)
     elif callable(ratio):
         ratio_ = ratio(y, **kwargs)
-        return _ratio_dict(ratio_, y, sampling_type)
+        return _ratio_dict(ratio_, target_stats, sampling_type)
 
 
 RATIO_KIND = {'minority': _ratio_minority,